@@ -0,0 +1,338 @@
+"""
+Offline retrieval benchmark for the RAG vector stores and document processor.
+
+Generates a synthetic, seeded corpus of clustered unit vectors, ingests it into
+each vector store and measures ingest throughput, query QPS, latency percentiles,
+resident memory and recall@k against exact (brute-force) search. Results are
+written to a JSON report that can be compared across releases.
+
+Usage:
+    python benchmarks/rag_benchmark.py run --stores faiss --num-vectors 10000 \\
+        --num-vectors 100000 --output report.json
+    python benchmarks/rag_benchmark.py compare old.json new.json
+"""
+
+import asyncio
+import json
+import platform
+import random
+import resource
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import click
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from multimind import __version__
+from multimind.rag.vector_store import BaseVectorStore, ChromaVectorStore, FAISSVectorStore
+
+INGEST_CHUNK = 50_000
+
+class SyntheticCorpus:
+    """Deterministic clustered vectors, generated chunk by chunk.
+
+    Vectors are drawn around ``num_clusters`` random centroids and normalized,
+    so L2 and cosine orderings agree and every store can be scored against the
+    same exact neighbours. Chunks are regenerated from the seed on demand, so
+    corpora larger than memory can be ingested and scored.
+    """
+
+    def __init__(
+        self,
+        num_vectors: int,
+        dimension: int,
+        seed: int = 0,
+        num_clusters: int = 100,
+        spread: float = 0.3
+    ):
+        self.num_vectors = num_vectors
+        self.dimension = dimension
+        self.seed = seed
+        self.spread = spread
+        rng = np.random.default_rng([seed, 0])
+        self.centroids = _normalize(
+            rng.standard_normal((num_clusters, dimension)).astype("float32")
+        )
+
+    def chunks(self, chunk_size: int = INGEST_CHUNK) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (start index, vectors) chunks covering the whole corpus."""
+        for start in range(0, self.num_vectors, chunk_size):
+            count = min(chunk_size, self.num_vectors - start)
+            yield start, self._sample(count, [self.seed, 2, start // chunk_size])
+
+    def queries(self, count: int) -> np.ndarray:
+        """Sample query vectors from the same distribution as the corpus."""
+        return self._sample(count, [self.seed, 1])
+
+    def _sample(self, count: int, seed: List[int]) -> np.ndarray:
+        rng = np.random.default_rng(seed)
+        labels = rng.integers(0, len(self.centroids), count)
+        noise = rng.standard_normal((count, self.dimension)).astype("float32")
+        return _normalize(self.centroids[labels] + self.spread * noise)
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def exact_neighbours(corpus: SyntheticCorpus, queries: np.ndarray, k: int) -> np.ndarray:
+    """Brute-force top-k corpus indices per query by inner product."""
+    best_scores = np.full((len(queries), k), -np.inf, dtype="float32")
+    best_ids = np.zeros((len(queries), k), dtype="int64")
+
+    for start, vectors in corpus.chunks():
+        scores = queries @ vectors.T
+        take = min(k, scores.shape[1])
+        top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+        merged_scores = np.concatenate(
+            [best_scores, np.take_along_axis(scores, top, axis=1)], axis=1
+        )
+        merged_ids = np.concatenate([best_ids, top + start], axis=1)
+        order = np.argsort(-merged_scores, axis=1)[:, :k]
+        best_scores = np.take_along_axis(merged_scores, order, axis=1)
+        best_ids = np.take_along_axis(merged_ids, order, axis=1)
+
+    return best_ids
+
+def create_store(name: str, dimension: int) -> BaseVectorStore:
+    """Create an empty vector store by name."""
+    if name == "faiss":
+        return FAISSVectorStore(dimension=dimension)
+    if name == "chroma":
+        return ChromaVectorStore(collection_name=f"bench-{uuid.uuid4().hex[:8]}")
+    raise click.BadParameter(f"Unsupported vector store: {name}")
+
+def rss_mb() -> Dict[str, float]:
+    """Current and peak resident set size of this process in MiB."""
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_kb /= 1024
+    current = None
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        current = pages * resource.getpagesize() / 2**20
+    except OSError:
+        pass
+    return {"current": current, "peak": peak_kb / 1024}
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    values = np.array(samples) * 1000
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "mean": float(values.mean()),
+        "max": float(values.max())
+    }
+
+async def bench_store(
+    name: str,
+    corpus: SyntheticCorpus,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+    query_batch_size: int
+) -> Dict[str, Any]:
+    """Ingest the corpus into one store and measure query performance."""
+    rss_before = rss_mb()
+    store = create_store(name, corpus.dimension)
+
+    start = time.perf_counter()
+    for offset, vectors in corpus.chunks():
+        documents = [f"doc-{offset + i}" for i in range(len(vectors))]
+        await store.add(vectors=vectors, documents=documents)
+    ingest_seconds = time.perf_counter() - start
+    rss_after_ingest = rss_mb()
+
+    # Sequential single-query latency
+    latencies = []
+    hits = 0
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        results = await store.search(query.tolist(), k=k)
+        latencies.append(time.perf_counter() - start)
+        found = {int(r["document"].split("-", 1)[1]) for r in results}
+        hits += len(found.intersection(truth[i].tolist()))
+
+    # Batched throughput
+    start = time.perf_counter()
+    for i in range(0, len(queries), query_batch_size):
+        await store.search_batch(queries[i:i + query_batch_size].tolist(), k=k)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "store": name,
+        "num_vectors": corpus.num_vectors,
+        "dimension": corpus.dimension,
+        "k": k,
+        "ingest": {
+            "seconds": ingest_seconds,
+            "vectors_per_second": corpus.num_vectors / ingest_seconds
+        },
+        "query": {
+            "count": len(queries),
+            "qps": len(queries) / sum(latencies),
+            "latency_ms": percentiles(latencies),
+            "batch_size": query_batch_size,
+            "batch_qps": len(queries) / batch_seconds
+        },
+        "recall_at_k": hits / (len(queries) * k),
+        "rss_mb": {
+            "before": rss_before["current"],
+            "after_ingest": rss_after_ingest["current"],
+            "peak": rss_mb()["peak"]
+        }
+    }
+
+def bench_documents(
+    num_documents: int,
+    words_per_document: int,
+    chunk_size: int,
+    seed: int
+) -> Dict[str, Any]:
+    """Measure DocumentProcessor chunking throughput on synthetic text."""
+    from multimind.rag.document import DocumentProcessor
+
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(5000)]
+    documents = [
+        "\n".join(
+            " ".join(rng.choices(vocabulary, k=20))
+            for _ in range(words_per_document // 20)
+        )
+        for _ in range(num_documents)
+    ]
+
+    processor = DocumentProcessor(chunk_size=chunk_size)
+    start = time.perf_counter()
+    chunks = sum(len(processor.process_document(doc)) for doc in documents)
+    seconds = time.perf_counter() - start
+
+    return {
+        "documents": num_documents,
+        "words_per_document": words_per_document,
+        "chunk_size": chunk_size,
+        "chunks": chunks,
+        "seconds": seconds,
+        "documents_per_second": num_documents / seconds,
+        "words_per_second": num_documents * words_per_document / seconds
+    }
+
+@click.group()
+def cli():
+    """Offline RAG retrieval benchmarks"""
+    pass
+
+@cli.command()
+@click.option(
+    "--stores", "-s", multiple=True, default=["faiss"],
+    help="Vector stores to benchmark (faiss, chroma)"
+)
+@click.option(
+    "--num-vectors", "-n", multiple=True, type=int, default=[10_000],
+    help="Corpus sizes to benchmark"
+)
+@click.option("--dimension", "-d", default=384, help="Vector dimension")
+@click.option("--num-queries", "-q", default=1000, help="Number of queries per run")
+@click.option("--k", "-k", default=10, help="Neighbours per query")
+@click.option("--query-batch-size", default=64, help="Queries per search_batch call")
+@click.option(
+    "--documents", default=0,
+    help="Synthetic documents for the DocumentProcessor benchmark (0 to skip)"
+)
+@click.option("--words-per-document", default=2000, help="Words per synthetic document")
+@click.option("--chunk-size", default=256, help="DocumentProcessor chunk size in tokens")
+@click.option("--seed", default=0, help="Random seed")
+@click.option(
+    "--output", "-o", type=click.Path(dir_okay=False),
+    help="Write the JSON report to this file"
+)
+def run(
+    stores: List[str],
+    num_vectors: List[int],
+    dimension: int,
+    num_queries: int,
+    k: int,
+    query_batch_size: int,
+    documents: int,
+    words_per_document: int,
+    chunk_size: int,
+    seed: int,
+    output: Optional[str]
+):
+    """Run the benchmark and emit a JSON report"""
+    report: Dict[str, Any] = {
+        "meta": {
+            "multimind_version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(),
+            "seed": seed
+        },
+        "vector_stores": [],
+        "document_processor": None
+    }
+
+    for size in num_vectors:
+        corpus = SyntheticCorpus(size, dimension, seed=seed)
+        queries = corpus.queries(num_queries)
+        truth = exact_neighbours(corpus, queries, k)
+        for store in stores:
+            click.echo(f"Benchmarking {store} with {size} vectors...", err=True)
+            result = asyncio.run(bench_store(store, corpus, queries, truth, k, query_batch_size))
+            report["vector_stores"].append(result)
+            click.echo(
+                f"  ingest {result['ingest']['vectors_per_second']:.0f} vec/s, "
+                f"{result['query']['qps']:.0f} QPS, "
+                f"p99 {result['query']['latency_ms']['p99']:.2f} ms, "
+                f"recall@{k} {result['recall_at_k']:.3f}",
+                err=True
+            )
+
+    if documents:
+        click.echo(f"Benchmarking DocumentProcessor with {documents} documents...", err=True)
+        report["document_processor"] = bench_documents(
+            documents, words_per_document, chunk_size, seed
+        )
+
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(text)
+    else:
+        click.echo(text)
+
+@cli.command()
+@click.argument("baseline", type=click.Path(exists=True, dir_okay=False))
+@click.argument("candidate", type=click.Path(exists=True, dir_okay=False))
+def compare(baseline: str, candidate: str):
+    """Show relative changes between two reports"""
+    def runs(report: str) -> Dict[Any, Dict[str, Any]]:
+        results = json.loads(Path(report).read_text())["vector_stores"]
+        return {(r["store"], r["num_vectors"]): r for r in results}
+
+    old = runs(baseline)
+    new = runs(candidate)
+
+    metrics = [
+        ("ingest vec/s", lambda r: r["ingest"]["vectors_per_second"]),
+        ("QPS", lambda r: r["query"]["qps"]),
+        ("batch QPS", lambda r: r["query"]["batch_qps"]),
+        ("p50 ms", lambda r: r["query"]["latency_ms"]["p50"]),
+        ("p99 ms", lambda r: r["query"]["latency_ms"]["p99"]),
+        ("recall@k", lambda r: r["recall_at_k"])
+    ]
+    for key in sorted(old.keys() & new.keys()):
+        click.echo(f"{key[0]} @ {key[1]} vectors")
+        for label, get in metrics:
+            before, after = get(old[key]), get(new[key])
+            change = (after - before) / before * 100 if before else 0.0
+            click.echo(f"  {label:<14} {before:>12.3f} -> {after:>12.3f} ({change:+.1f}%)")
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,145 @@
+"""
+Micro-benchmark of model routing overhead.
+
+Registers no-op models with a RoutingEngine and measures the time the router
+adds per request: resolving a named model, resolving through the compiled
+routing table, resolving by running the strategy on every request (the
+behaviour without a compiled table), and a full routed ``generate`` compared
+with calling the model directly. Results are written to a JSON report.
+
+Usage:
+    python benchmarks/routing_benchmark.py --models 2 --models 50 \\
+        --requests 100000 --output report.json
+"""
+
+import asyncio
+import json
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import click
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from multimind import __version__
+from multimind.core.circuit_breaker import CircuitBreakerRegistry
+from multimind.models.base import BaseLLM
+from multimind.router.engine import RoutingEngine
+from multimind.router.strategy import LatencyAwareStrategy
+
+class NoopLLM(BaseLLM):
+    """Model answering immediately, so only routing overhead is measured."""
+
+    def __init__(self, model_name: str, avg_latency: float):
+        super().__init__(model_name)
+        self.avg_latency = avg_latency
+
+    async def generate(self, prompt, temperature=0.7, max_tokens=None, **kwargs):
+        return prompt
+
+    async def generate_stream(self, prompt, temperature=0.7, max_tokens=None, **kwargs):
+        yield prompt
+
+    async def chat(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        return messages[-1]["content"]
+
+    async def chat_stream(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        yield messages[-1]["content"]
+
+    async def embeddings(self, text, **kwargs):
+        return [0.0]
+
+def build_engine(num_models: int, refresh_interval: float) -> RoutingEngine:
+    """Engine with ``num_models`` no-op models and its own breakers."""
+    engine = RoutingEngine(
+        LatencyAwareStrategy(),
+        breakers=CircuitBreakerRegistry(),
+        refresh_interval=refresh_interval
+    )
+    names = []
+    for i in range(num_models):
+        name = f"model-{i}"
+        engine.register_model(name, NoopLLM(name, avg_latency=1.0 + i))
+        names.append(name)
+    engine.set_fallback_chain(names)
+    return engine
+
+async def timed(call: Callable[[], Awaitable[Any]], requests: int) -> Dict[str, float]:
+    """Mean time per call in microseconds and calls per second."""
+    for _ in range(min(requests, 1000)):
+        await call()
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call()
+    elapsed = time.perf_counter() - start
+    return {"us_per_request": elapsed / requests * 1e6, "requests_per_second": requests / elapsed}
+
+async def bench(num_models: int, requests: int) -> Dict[str, Any]:
+    """Routing overhead with ``num_models`` registered models."""
+    compiled = build_engine(num_models, refresh_interval=60.0)
+    uncompiled = build_engine(num_models, refresh_interval=0.0)
+    model = compiled.models["model-0"]
+
+    results = {
+        "resolve_named": await timed(lambda: compiled.resolve("model-0"), requests),
+        "resolve_compiled": await timed(lambda: compiled.resolve(), requests),
+        "resolve_per_request": await timed(lambda: uncompiled.resolve(), requests),
+        "generate_direct": await timed(lambda: model.generate("hi"), requests),
+        "generate_routed": await timed(lambda: compiled.generate("hi"), requests)
+    }
+    results["routing_overhead_us"] = (
+        results["generate_routed"]["us_per_request"] - results["generate_direct"]["us_per_request"]
+    )
+    return {
+        "num_models": num_models,
+        "requests": requests,
+        "compilations": compiled.compilations,
+        **results
+    }
+
+@click.command()
+@click.option(
+    "--models", "-m", multiple=True, type=int, default=[2, 10, 50],
+    help="Numbers of registered models"
+)
+@click.option("--requests", "-n", default=20_000, help="Requests per measurement")
+@click.option(
+    "--output", "-o", type=click.Path(dir_okay=False),
+    help="Write the JSON report to this file"
+)
+def run(models: List[int], requests: int, output: Optional[str]):
+    """Run the benchmark and emit a JSON report"""
+    report: Dict[str, Any] = {
+        "meta": {
+            "multimind_version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat()
+        },
+        "routing": []
+    }
+
+    for num_models in models:
+        click.echo(f"Benchmarking routing with {num_models} models...", err=True)
+        result = asyncio.run(bench(num_models, requests))
+        report["routing"].append(result)
+        click.echo(
+            f"  resolve: named {result['resolve_named']['us_per_request']:.2f} us, "
+            f"compiled {result['resolve_compiled']['us_per_request']:.2f} us, "
+            f"per-request strategy {result['resolve_per_request']['us_per_request']:.2f} us; "
+            f"generate overhead {result['routing_overhead_us']:.2f} us",
+            err=True
+        )
+
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(text)
+    else:
+        click.echo(text)
+
+if __name__ == "__main__":
+    run()
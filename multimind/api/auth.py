@@ -3,6 +3,7 @@ Authentication module for the RAG API.
 """
 
 from typing import Optional, Dict, Union, cast
+from functools import lru_cache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from datetime import datetime, timedelta
@@ -36,6 +37,8 @@ class User(BaseModel):
     full_name: Optional[str] = None
     disabled: Optional[bool] = None
     scopes: list[str] = []
+    # RAG namespaces the user may access ("*" for all)
+    namespaces: list[str] = ["default"]
 
 class UserInDB(User):
     hashed_password: str
@@ -64,7 +67,8 @@ class UserDB:
                     "full_name": "Administrator",
                     "disabled": False,
                     "hashed_password": "changeme",  # Use proper password hashing in production
-                    "scopes": ["rag:read", "rag:write"]
+                    "scopes": ["rag:read", "rag:write"],
+                    "namespaces": ["*"]
                 }
             }
             
@@ -101,7 +105,8 @@ async def get_current_user(token: str = Depends(api_key_header)) -> User:
     if token in os.getenv("API_KEYS", "").split(","):
         return User(
             username="api_user",
-            scopes=["rag:read", "rag:write"]
+            scopes=["rag:read", "rag:write"],
+            namespaces=["*"]
         )
 
     # Then try JWT
@@ -126,7 +131,8 @@ async def get_current_user(token: str = Depends(api_key_header)) -> User:
         email=user.email,
         full_name=user.full_name,
         disabled=user.disabled,
-        scopes=user.scopes
+        scopes=user.scopes,
+        namespaces=user.namespaces
     )
 
 async def get_current_active_user(
@@ -137,8 +143,13 @@ async def get_current_active_user(
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+@lru_cache(maxsize=None)
 def check_scope(required_scope: str):
-    """Check if user has required scope."""
+    """Check if user has required scope.
+
+    The checker is cached per scope, so FastAPI resolves it once per request
+    even when several dependencies require the same scope.
+    """
     async def scope_checker(current_user: User = Depends(get_current_active_user)):
         if required_scope not in current_user.scopes:
             raise HTTPException(
@@ -146,4 +157,17 @@ def check_scope(required_scope: str):
                 detail=f"Insufficient permissions. Required scope: {required_scope}"
             )
         return current_user
-    return scope_checker
\ No newline at end of file
+    return scope_checker
+
+
+def check_namespace(user: User, namespace: str) -> None:
+    """Check that a user may access a RAG namespace.
+
+    Raises:
+        HTTPException: 403 if the namespace is not granted to the user
+    """
+    if "*" not in user.namespaces and namespace not in user.namespaces:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Access to namespace {namespace!r} is not granted"
+        )
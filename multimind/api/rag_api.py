@@ -2,24 +2,35 @@
 FastAPI implementation for the RAG system.
 """
 
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, AsyncIterator
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, status
+from fastapi import FastAPI, HTTPException, Form, Depends, Query, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel, Field
+from datetime import datetime
 import asyncio
 import json
+import logging
+import os
 
 from multimind.rag.rag import RAG
+from multimind.rag.registry import RAGRegistry
 from multimind.rag.document import Document
 from multimind.rag.embeddings import get_embedder
 from multimind.models.openai import OpenAIModel
+from multimind.core.health import HealthProber, UptimeWindow
+from multimind.core.openmetrics import (
+    CONTENT_TYPE as OPENMETRICS_CONTENT_TYPE, HTTPMetrics, OpenMetricsWriter
+)
 from multimind.api.auth import (
     User, Token, create_access_token, get_current_active_user,
-    check_scope, ACCESS_TOKEN_EXPIRE_MINUTES, timedelta
+    check_scope, check_namespace, ACCESS_TOKEN_EXPIRE_MINUTES, timedelta
 )
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="MultiMind RAG API")
 
 # Add CORS middleware
@@ -31,8 +42,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global RAG instance
-rag_instance: Optional[RAG] = None
+# HTTP request counts, latency and in-flight requests for /metrics
+http_metrics = HTTPMetrics("multimind_rag")
+app.middleware("http")(http_metrics.middleware)
+
+# Shared generation model; each namespace gets its own embedder and vector store
+default_model: Optional[OpenAIModel] = None
 
 class DocumentRequest(BaseModel):
     text: str
@@ -65,24 +80,109 @@ class GenerateResponse(BaseModel):
     response: str
     documents: List[DocumentResponse]
 
-async def get_rag() -> RAG:
-    """Get or create RAG instance."""
-    global rag_instance
-    if rag_instance is None:
-        # Initialize with default settings
-        model = OpenAIModel(model_name="gpt-3.5-turbo")
-        embedder = get_embedder("openai")
-        rag_instance = RAG(
-            embedder=embedder,
-            vector_store="faiss",
-            model=model
+def create_rag(namespace: str) -> RAG:
+    """Create the RAG instance for a namespace with default settings."""
+    global default_model
+    if default_model is None:
+        default_model = OpenAIModel(model_name="gpt-3.5-turbo")
+    return RAG(
+        embedder=get_embedder("openai"),
+        vector_store="faiss",
+        model=default_model,
+        batch_window=0.005
+    )
+
+# Per-namespace RAG instances, loaded on demand and evicted when idle
+rag_registry = RAGRegistry(
+    create_rag,
+    max_loaded=int(os.getenv("MULTIMIND_RAG_MAX_NAMESPACES", "32")),
+    idle_timeout=float(os.getenv("MULTIMIND_RAG_IDLE_TIMEOUT", "600")),
+    storage_dir=os.getenv("MULTIMIND_RAG_STORAGE_DIR")
+)
+
+def get_rag(scope: str):
+    """Dependency yielding the RAG instance of the requested namespace.
+
+    The user is authenticated and checked for ``scope`` and for access to the
+    namespace before the namespace is loaded.
+    """
+    async def dependency(
+        namespace: str = Query("default", description="Document collection to use"),
+        current_user: User = Depends(check_scope(scope))
+    ) -> AsyncIterator[RAG]:
+        try:
+            RAGRegistry.validate_namespace(namespace)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        check_namespace(current_user, namespace)
+        async with rag_registry.use(namespace) as rag:
+            yield rag
+    return dependency
+
+# Cached model health, keyed by model name and refreshed in the background
+model_health: Dict[str, Dict[str, Any]] = {}
+_model_uptime: Dict[str, UptimeWindow] = {}
+HEALTH_WINDOW = float(os.getenv("MULTIMIND_RAG_HEALTH_WINDOW", "3600"))
+
+def _probe_targets() -> Dict[str, Any]:
+    """One-token generation probe per distinct model of the resident namespaces."""
+    targets = {}
+    for rag in rag_registry.resident().values():
+        if rag.model is not None and rag.model.model_name not in targets:
+            targets[rag.model.model_name] = _model_probe(rag.model)
+    return targets
+
+def _model_probe(model):
+    async def probe():
+        await model.generate("ping", max_tokens=1)
+    return probe
+
+def _record_model_health(name: str, ok: bool, latency_ms: float, error: Optional[str]) -> None:
+    uptime = _model_uptime.get(name)
+    if uptime is None:
+        uptime = _model_uptime[name] = UptimeWindow(HEALTH_WINDOW)
+    uptime.record(ok)
+    model_health[name] = {
+        "status": "healthy" if ok else "error",
+        "error": error,
+        "latency_ms": latency_ms,
+        "uptime_percentage": uptime.uptime_percentage(),
+        "last_check": datetime.now().isoformat()
+    }
+
+health_prober = HealthProber(
+    _probe_targets,
+    _record_model_health,
+    interval=float(os.getenv("MULTIMIND_RAG_HEALTH_INTERVAL", "30")),
+    jitter=float(os.getenv("MULTIMIND_RAG_HEALTH_JITTER", "0.1")),
+    timeout=float(os.getenv("MULTIMIND_RAG_HEALTH_TIMEOUT", "5"))
+)
+
+@app.on_event("startup")
+async def start_health_prober() -> None:
+    """Probe model health in the background so /health serves cached status."""
+    if health_prober.interval > 0:
+        health_prober.start()
+
+@app.on_event("startup")
+async def check_storage_dir() -> None:
+    """Warn that namespaces stay resident when they cannot be persisted."""
+    if rag_registry.storage_dir is None:
+        logger.warning(
+            "MULTIMIND_RAG_STORAGE_DIR is not set: namespaces are never evicted, "
+            "so memory grows with every namespace used"
         )
-    return rag_instance
+
+@app.on_event("shutdown")
+async def shutdown_registry() -> None:
+    """Stop health probing, then persist and unload all namespaces."""
+    await health_prober.stop()
+    await rag_registry.close()
 
 @app.post("/documents")
 async def add_documents(
     request: BatchDocumentRequest,
-    rag: RAG = Depends(get_rag),
+    rag: RAG = Depends(get_rag("rag:write")),
     current_user: User = Depends(check_scope("rag:write"))
 ) -> Dict[str, int]:
     """Add documents to the RAG system."""
@@ -101,7 +201,7 @@ async def add_documents(
 @app.post("/query", response_model=QueryResponse)
 async def query_documents(
     request: QueryRequest,
-    rag: RAG = Depends(get_rag),
+    rag: RAG = Depends(get_rag("rag:read")),
     current_user: User = Depends(check_scope("rag:read"))
 ) -> QueryResponse:
     """Query documents from the RAG system."""
@@ -125,7 +225,7 @@ async def query_documents(
 @app.post("/generate", response_model=GenerateResponse)
 async def generate_response(
     request: GenerateRequest,
-    rag: RAG = Depends(get_rag),
+    rag: RAG = Depends(get_rag("rag:read")),
     current_user: User = Depends(check_scope("rag:read"))
 ) -> GenerateResponse:
     """Generate a response using the RAG system."""
@@ -158,7 +258,7 @@ async def generate_response(
 async def switch_model(
     model_type: str = Form(...),
     model_name: str = Form(...),
-    rag: RAG = Depends(get_rag),
+    rag: RAG = Depends(get_rag("rag:write")),
     current_user: User = Depends(check_scope("rag:write"))
 ):
     """Switch the model used by the RAG system."""
@@ -174,49 +274,61 @@ async def switch_model(
 
 @app.post("/documents/clear")
 async def clear_documents(
-    rag: RAG = Depends(get_rag),
+    rag: RAG = Depends(get_rag("rag:write")),
     current_user: User = Depends(check_scope("rag:write"))
 ):
     """Clear all documents from the RAG system."""
     try:
-        await rag.vector_store.clear()
+        await rag.clear()
         return {"message": "All documents cleared"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/health")
-async def health_check(
-    rag: RAG = Depends(get_rag)
-) -> Dict[str, Union[str, int, Dict]]:
-    """Check the health of the RAG system."""
+async def health_check() -> Dict[str, Union[str, Dict]]:
+    """Check the health of the RAG system.
+
+    Unauthenticated and independent of namespaces: reports the registry and
+    the model status cached by the background prober, without loading or
+    probing anything.
+    """
+    models = dict(model_health)
+    healthy = all(model["status"] == "healthy" for model in models.values())
+    return {
+        "status": "healthy" if healthy else "degraded",
+        "namespaces": {
+            "loaded": len(rag_registry.loaded()),
+            "active": rag_registry.active_count()
+        },
+        "models": models
+    }
+
+@app.get("/health/namespace")
+async def namespace_health(
+    rag: RAG = Depends(get_rag("rag:read"))
+) -> Dict[str, Union[str, int, Dict, None]]:
+    """Check the health of a namespace.
+
+    Model status comes from the background prober; a model that has not
+    been probed yet is probed once, with a one-token request.
+    """
     try:
-        # Check vector store
         doc_count = await rag.vector_store.get_document_count()
-        
-        # Test embeddings generation
-        embedding_test = await rag.embedder.embeddings("test")
-        embedding_dim = len(embedding_test[0]) if isinstance(embedding_test[0], list) else len(embedding_test)
-        
-        # Test model generation (with timeout)
-        model_healthy = True
-        model_error = None
-        try:
-            async with asyncio.timeout(5.0):  # 5 second timeout
-                await rag.model.generate("test", max_tokens=10)
-        except Exception as e:
-            model_healthy = False
-            model_error = str(e)
-        
+
+        model = None
+        if rag.model is not None:
+            name = rag.model.model_name
+            if name not in model_health:
+                await health_prober.probe(name, _model_probe(rag.model))
+            model = {"name": name, **model_health[name]}
+
+        model_healthy = model is None or model["status"] == "healthy"
         return {
             "status": "healthy" if model_healthy else "degraded",
             "document_count": doc_count,
-            "embedding_dimension": embedding_dim,
+            "embedding_dimension": getattr(rag.vector_store, "dimension", None),
             "vector_store_type": rag.vector_store.__class__.__name__,
-            "model": {
-                "name": rag.model.model_name if rag.model else None,
-                "status": "healthy" if model_healthy else "error",
-                "error": model_error
-            }
+            "model": model
         }
     except Exception as e:
         raise HTTPException(
@@ -227,6 +339,44 @@ async def health_check(
             }
         )
 
+async def _document_count(rag: RAG) -> Optional[int]:
+    try:
+        return await rag.vector_store.get_document_count()
+    except Exception:
+        return None
+
+@app.get("/metrics", include_in_schema=False)
+async def openmetrics() -> Response:
+    """Expose RAG metrics in OpenMetrics text format for scraping."""
+    writer = OpenMetricsWriter()
+    http_metrics.write(writer)
+
+    resident = rag_registry.resident()
+    writer.gauge(
+        "multimind_rag_namespaces_loaded",
+        "Namespaces resident in memory",
+        [({}, len(resident))]
+    )
+    writer.gauge(
+        "multimind_rag_namespaces_active",
+        "Resident namespaces currently serving requests",
+        [({}, rag_registry.active_count())]
+    )
+
+    # Only resident namespaces are counted, so scraping never loads a store
+    counts = await asyncio.gather(*(_document_count(rag) for rag in resident.values()))
+    writer.gauge(
+        "multimind_rag_vector_store_documents",
+        "Documents in each resident namespace's vector store",
+        [
+            ({"namespace": namespace, "store": rag.vector_store.__class__.__name__}, count)
+            for (namespace, rag), count in zip(resident.items(), counts)
+            if count is not None
+        ]
+    )
+
+    return Response(content=writer.render(), media_type=OPENMETRICS_CONTENT_TYPE)
+
 # Mock user database for testing purposes
 fake_users_db = {
     "testuser": {
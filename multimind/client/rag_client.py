@@ -10,6 +10,8 @@ from datetime import datetime
 import asyncio
 from pydantic import BaseModel
 
+from multimind.core.http import ManagedSession
+
 class Document(BaseModel):
     text: str
     metadata: Dict[str, Any] = {}
@@ -33,7 +35,11 @@ class RAGClient:
         self,
         base_url: str = "http://localhost:8000",
         api_key: Optional[str] = None,
-        token: Optional[str] = None
+        token: Optional[str] = None,
+        namespace: str = "default",
+        timeout: Optional[float] = 60.0,
+        max_connections: int = 100,
+        session: Optional[ManagedSession] = None
     ):
         """Initialize the RAG client.
 
@@ -41,14 +47,30 @@ class RAGClient:
             base_url: Base URL of the RAG API
             api_key: API key for authentication
             token: JWT token for authentication
+            namespace: Document collection to operate on
+            timeout: Total timeout per request in seconds
+            max_connections: Maximum pooled connections to the API
+            session: Managed session to share with other clients
         """
         self.base_url = base_url.rstrip("/")
+        self.params = {"namespace": namespace}
+        self._http = session or ManagedSession(limit=max_connections, timeout=timeout)
         self.headers = {}
         if api_key:
             self.headers["X-API-Key"] = api_key
         elif token:
             self.headers["Authorization"] = f"Bearer {token}"
 
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections."""
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "RAGClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
     async def login(self, username: str, password: str) -> str:
         """Login and get access token.
 
@@ -59,16 +81,16 @@ class RAGClient:
         Returns:
             Access token
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/token",
-                data={"username": username, "password": password}
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Login failed: {await response.text()}")
-                data = await response.json()
-                self.headers["Authorization"] = f"Bearer {data['access_token']}"
-                return data["access_token"]
+        session = await self._http.get()
+        async with session.post(
+            f"{self.base_url}/token",
+            data={"username": username, "password": password}
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Login failed: {await response.text()}")
+            data = await response.json()
+            self.headers["Authorization"] = f"Bearer {data['access_token']}"
+            return data["access_token"]
 
     async def add_documents(
         self,
@@ -82,15 +104,16 @@ class RAGClient:
         Returns:
             Response from the API
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/documents",
-                json={"documents": [doc.dict() for doc in documents]},
-                headers=self.headers
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to add documents: {await response.text()}")
-                return await response.json()
+        session = await self._http.get()
+        async with session.post(
+            f"{self.base_url}/documents",
+            params=self.params,
+            json={"documents": [doc.dict() for doc in documents]},
+            headers=self.headers
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to add documents: {await response.text()}")
+            return await response.json()
 
     async def add_file(
         self,
@@ -110,24 +133,25 @@ class RAGClient:
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
 
-        async with aiohttp.ClientSession() as session:
-            data = aiohttp.FormData()
-            data.add_field(
-                "file",
-                file_path.open("rb"),
-                filename=file_path.name
-            )
-            if metadata:
-                data.add_field("metadata", json.dumps(metadata))
-
-            async with session.post(
-                f"{self.base_url}/files",
-                data=data,
-                headers=self.headers
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to add file: {await response.text()}")
-                return await response.json()
+        session = await self._http.get()
+        data = aiohttp.FormData()
+        data.add_field(
+            "file",
+            file_path.open("rb"),
+            filename=file_path.name
+        )
+        if metadata:
+            data.add_field("metadata", json.dumps(metadata))
+
+        async with session.post(
+            f"{self.base_url}/files",
+            params=self.params,
+            data=data,
+            headers=self.headers
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to add file: {await response.text()}")
+            return await response.json()
 
     async def query(
         self,
@@ -151,15 +175,16 @@ class RAGClient:
             filter_metadata=filter_metadata
         )
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/query",
-                json=request.dict(),
-                headers=self.headers
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Query failed: {await response.text()}")
-                return await response.json()
+        session = await self._http.get()
+        async with session.post(
+            f"{self.base_url}/query",
+            params=self.params,
+            json=request.dict(),
+            headers=self.headers
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Query failed: {await response.text()}")
+            return await response.json()
 
     async def generate(
         self,
@@ -189,15 +214,16 @@ class RAGClient:
             filter_metadata=filter_metadata
         )
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/generate",
-                json=request.dict(),
-                headers=self.headers
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Generation failed: {await response.text()}")
-                return await response.json()
+        session = await self._http.get()
+        async with session.post(
+            f"{self.base_url}/generate",
+            params=self.params,
+            json=request.dict(),
+            headers=self.headers
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Generation failed: {await response.text()}")
+            return await response.json()
 
     async def clear_documents(self) -> Dict[str, Any]:
         """Clear all documents from the RAG system.
@@ -205,14 +231,15 @@ class RAGClient:
         Returns:
             Response from the API
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.delete(
-                f"{self.base_url}/documents",
-                headers=self.headers
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to clear documents: {await response.text()}")
-                return await response.json()
+        session = await self._http.get()
+        async with session.delete(
+            f"{self.base_url}/documents",
+            params=self.params,
+            headers=self.headers
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to clear documents: {await response.text()}")
+            return await response.json()
 
     async def get_document_count(self) -> int:
         """Get the number of documents in the RAG system.
@@ -220,15 +247,16 @@ class RAGClient:
         Returns:
             Number of documents
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/documents/count",
-                headers=self.headers
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to get document count: {await response.text()}")
-                data = await response.json()
-                return data["count"]
+        session = await self._http.get()
+        async with session.get(
+            f"{self.base_url}/documents/count",
+            params=self.params,
+            headers=self.headers
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to get document count: {await response.text()}")
+            data = await response.json()
+            return data["count"]
 
     async def switch_model(
         self,
@@ -244,19 +272,20 @@ class RAGClient:
         Returns:
             Response from the API
         """
-        async with aiohttp.ClientSession() as session:
-            data = aiohttp.FormData()
-            data.add_field("model_type", model_type)
-            data.add_field("model_name", model_name)
-
-            async with session.post(
-                f"{self.base_url}/models/switch",
-                data=data,
-                headers=self.headers
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to switch model: {await response.text()}")
-                return await response.json()
+        session = await self._http.get()
+        data = aiohttp.FormData()
+        data.add_field("model_type", model_type)
+        data.add_field("model_name", model_name)
+
+        async with session.post(
+            f"{self.base_url}/models/switch",
+            params=self.params,
+            data=data,
+            headers=self.headers
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Failed to switch model: {await response.text()}")
+            return await response.json()
 
     async def health_check(self) -> Dict[str, Any]:
         """Check the health of the RAG system.
@@ -264,53 +293,53 @@ class RAGClient:
         Returns:
             Health status
         """
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/health",
-                headers=self.headers
-            ) as response:
-                if response.status != 200:
-                    raise Exception(f"Health check failed: {await response.text()}")
-                return await response.json()
+        session = await self._http.get()
+        async with session.get(
+            f"{self.base_url}/health",
+            params=self.params,
+            headers=self.headers
+        ) as response:
+            if response.status != 200:
+                raise Exception(f"Health check failed: {await response.text()}")
+            return await response.json()
 
 # Example usage
 async def example():
-    # Initialize clien
-    client = RAGClient(
+    # Initialize client; the context manager closes pooled connections
+    async with RAGClient(
         base_url="http://localhost:8000",
         api_key="your-api-key"  # or use token
-    )
+    ) as client:
+        # Login (if using JWT)
+        # token = await client.login("username", "password")
+
+        # Add documents
+        docs = [
+            Document(
+                text="The RAG system provides powerful document processing.",
+                metadata={"type": "introduction"}
+            )
+        ]
+        await client.add_documents(docs)
 
-    # Login (if using JWT)
-    # token = await client.login("username", "password")
+        # Query
+        results = await client.query("What is the RAG system?")
+        print("Query results:", results)
 
-    # Add documents
-    docs = [
-        Document(
-            text="The RAG system provides powerful document processing.",
-            metadata={"type": "introduction"}
+        # Generate
+        response = await client.generate(
+            "Explain the RAG system",
+            temperature=0.7
         )
-    ]
-    await client.add_documents(docs)
-
-    # Query
-    results = await client.query("What is the RAG system?")
-    print("Query results:", results)
-
-    # Generate
-    response = await client.generate(
-        "Explain the RAG system",
-        temperature=0.7
-    )
-    print("Generated response:", response)
-
-    # Get document coun
-    count = await client.get_document_count()
-    print("Document count:", count)
-
-    # Health check
-    health = await client.health_check()
-    print("Health status:", health)
+        print("Generated response:", response)
+
+        # Get document count
+        count = await client.get_document_count()
+        print("Document count:", count)
+
+        # Health check
+        health = await client.health_check()
+        print("Health status:", health)
 
 if __name__ == "__main__":
     asyncio.run(example())
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Per-model circuit breakers shared by the router and the gateway.
+"""
+
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+class CircuitState(str, Enum):
+    """State of a circuit breaker."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a model whose circuit is open.
+
+    Carries HTTP status 503 and ``retry_after`` so that retry logic and API
+    layers treat it like an unavailable upstream.
+    """
+
+    status_code = 503
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open; retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+def _is_client_error(error: BaseException) -> bool:
+    """Whether an error is the caller's fault (4xx other than 408/429)."""
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    return isinstance(status, int) and 400 <= status < 500 and status not in (408, 429)
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker driven by error rate and latency.
+
+    While closed, the outcomes of the last ``window`` calls are kept. Once at
+    least ``min_calls`` are recorded, the circuit opens if the failure rate
+    reaches ``failure_rate_threshold`` or the share of calls slower than
+    ``slow_call_threshold`` seconds reaches ``slow_call_rate_threshold``.
+    An open circuit rejects calls for ``open_timeout`` seconds, then lets
+    ``half_open_calls`` trial calls through: if they all succeed quickly it
+    closes, otherwise it opens again. Client errors (4xx other than 408 and
+    429) do not count as failures.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_threshold: Optional[float] = None,
+        slow_call_rate_threshold: float = 0.8,
+        window: int = 20,
+        min_calls: int = 10,
+        open_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        on_change: Optional[Callable[[], None]] = None
+    ):
+        """Initialize circuit breaker.
+
+        Args:
+            name: Name of the guarded model or provider
+            failure_rate_threshold: Failure rate (0-1) that opens the circuit
+            slow_call_threshold: Seconds above which a call counts as slow
+                (None to ignore latency)
+            slow_call_rate_threshold: Slow call rate (0-1) that opens the circuit
+            window: Number of recent calls considered
+            min_calls: Calls needed before the circuit can open
+            open_timeout: Seconds the circuit stays open before trial calls
+            half_open_calls: Trial calls allowed while half-open
+            on_change: Called whenever ``available`` may have changed
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_timeout = open_timeout
+        self.half_open_calls = half_open_calls
+        self.on_change = on_change
+        self.opened = 0
+        self.rejected = 0
+        self._calls: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once the timeout passes."""
+        if (
+            self._state is CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.open_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._trials = 0
+            self._trial_successes = 0
+            self._changed()
+        return self._state
+
+    @property
+    def available(self) -> bool:
+        """Whether a call would currently be allowed (without reserving it)."""
+        state = self.state
+        if state is CircuitState.OPEN:
+            return False
+        if state is CircuitState.HALF_OPEN:
+            return self._trials < self.half_open_calls
+        return True
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until an open circuit allows trial calls."""
+        if self.state is not CircuitState.OPEN:
+            return 0.0
+        return max(self.open_timeout - (time.monotonic() - self._opened_at), 0.0)
+
+    def acquire(self) -> None:
+        """Reserve a call, raising CircuitOpenError if it is not allowed."""
+        if not self.available:
+            self.rejected += 1
+            raise CircuitOpenError(self.name, self.retry_after)
+        if self._state is CircuitState.HALF_OPEN:
+            self._trials += 1
+            self._changed()
+
+    def release(self) -> None:
+        """Release a reserved call that ended without an outcome (e.g. cancelled)."""
+        if self._state is CircuitState.HALF_OPEN and self._trials > self._trial_successes:
+            self._trials -= 1
+            self._changed()
+
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
+
+    def record_success(self, latency: float) -> None:
+        """Record a completed call and its latency in seconds."""
+        slow = self.slow_call_threshold is not None and latency > self.slow_call_threshold
+        if self._state is CircuitState.HALF_OPEN:
+            if slow:
+                self._open()
+                return
+            self._trial_successes += 1
+            if self._trial_successes >= self.half_open_calls:
+                self._close()
+            return
+        self._record(False, slow)
+
+    def record_failure(self, error: Optional[BaseException] = None, latency: float = 0.0) -> None:
+        """Record a failed call."""
+        if error is not None and _is_client_error(error):
+            self.record_success(latency)
+            return
+        if self._state is CircuitState.HALF_OPEN:
+            self._open()
+            return
+        slow = self.slow_call_threshold is not None and latency > self.slow_call_threshold
+        self._record(True, slow)
+
+    def _record(self, failed: bool, slow: bool) -> None:
+        if self._state is not CircuitState.CLOSED:
+            return
+        self._calls.append((failed, slow))
+        calls = len(self._calls)
+        if calls < self.min_calls:
+            return
+        failures = sum(1 for f, _ in self._calls if f)
+        slow_calls = sum(1 for _, s in self._calls if s)
+        if (failures / calls >= self.failure_rate_threshold
+                or slow_calls / calls >= self.slow_call_rate_threshold):
+            self._open()
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._calls.clear()
+        self.opened += 1
+        self._changed()
+
+    def _close(self) -> None:
+        self._state = CircuitState.CLOSED
+        self._calls.clear()
+        self._changed()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the state and counters as a dict."""
+        return {
+            "state": self.state.value,
+            "retry_after": self.retry_after,
+            "opened": self.opened,
+            "rejected": self.rejected
+        }
+
+class CircuitBreakerRegistry:
+    """Circuit breakers keyed by model name, created on first use."""
+
+    def __init__(self, **defaults):
+        """Initialize circuit breaker registry.
+
+        Args:
+            **defaults: CircuitBreaker settings for new breakers
+        """
+        self.defaults = defaults
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        # Bumped whenever any breaker's availability may have changed
+        self.version = 0
+
+    def configure(self, **defaults) -> None:
+        """Update the settings used for breakers created from now on."""
+        self.defaults.update(defaults)
+
+    def get(self, name: str) -> CircuitBreaker:
+        """Get the breaker for a model, creating it if needed."""
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, on_change=self._changed, **self.defaults)
+            self.breakers[name] = breaker
+        return breaker
+
+    def _changed(self) -> None:
+        self.version += 1
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Get the state of every breaker."""
+        return {name: breaker.to_dict() for name, breaker in self.breakers.items()}
+
+# Global registry shared by the router and the gateway
+circuit_breakers = CircuitBreakerRegistry()
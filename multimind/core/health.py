@@ -0,0 +1,142 @@
+"""
+Background health probing with rolling-window uptime.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Probe = Callable[[], Awaitable[Any]]
+ProbeCallback = Callable[[str, bool, float, Optional[str]], Any]
+
+class UptimeWindow:
+    """Fraction of successful probes within a rolling time window."""
+
+    def __init__(self, window: float = 3600.0):
+        """Initialize uptime window.
+
+        Args:
+            window: Seconds of probe history used for the uptime percentage
+        """
+        self.window = window
+        self._results: Deque[Tuple[float, bool]] = deque()
+        self._successes = 0
+
+    def record(self, ok: bool, now: Optional[float] = None) -> None:
+        """Record one probe result."""
+        now = time.monotonic() if now is None else now
+        self._results.append((now, ok))
+        self._successes += ok
+        self._expire(now)
+
+    def uptime_percentage(self, now: Optional[float] = None) -> float:
+        """Percentage of successful probes in the window (100 with no probes)."""
+        self._expire(time.monotonic() if now is None else now)
+        if not self._results:
+            return 100.0
+        return 100.0 * self._successes / len(self._results)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._results and self._results[0][0] < cutoff:
+            _, ok = self._results.popleft()
+            self._successes -= ok
+
+class HealthProber:
+    """Periodically run cheap health probes in the background.
+
+    Every ``interval`` seconds (spread by +/- ``jitter`` so replicas do not
+    probe in lockstep) each target returned by ``targets`` is probed
+    concurrently, and ``on_result(name, ok, latency_ms, error)`` is called
+    with the outcome. Probes exceeding ``timeout`` count as failures.
+    Endpoints then serve the recorded status instead of probing per request.
+    """
+
+    def __init__(
+        self,
+        targets: Callable[[], Mapping[str, Probe]],
+        on_result: ProbeCallback,
+        interval: float = 30.0,
+        jitter: float = 0.1,
+        timeout: float = 5.0
+    ):
+        """Initialize health prober.
+
+        Args:
+            targets: Callable returning the probes to run, keyed by name
+            on_result: Called with (name, ok, latency_ms, error) per probe;
+                may be a coroutine function
+            interval: Mean seconds between probe rounds
+            jitter: Fraction of the interval by which rounds are randomized
+            timeout: Seconds before a probe counts as failed
+        """
+        self.targets = targets
+        self.on_result = on_result
+        self.interval = interval
+        self.jitter = jitter
+        self.timeout = timeout
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background task is running."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start probing in the background; the first round runs immediately."""
+        if self.interval <= 0:
+            raise ValueError("interval must be positive")
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def probe_once(self) -> None:
+        """Run one round of probes concurrently."""
+        try:
+            targets = dict(self.targets())
+        except Exception as e:
+            logger.warning(f"Could not list health probe targets: {e}")
+            return
+        await asyncio.gather(*(self.probe(name, probe) for name, probe in targets.items()))
+
+    async def probe(self, name: str, probe: Probe) -> bool:
+        """Run a single probe and report its outcome."""
+        start = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(probe(), self.timeout)
+        except asyncio.TimeoutError:
+            error = f"Health probe timed out after {self.timeout}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        try:
+            result = self.on_result(name, error is None, latency_ms, error)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.warning(f"Error recording health of {name}: {e}")
+        return error is None
+
+    def _delay(self) -> float:
+        return self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self._delay())
@@ -0,0 +1,73 @@
+"""
+Managed aiohttp sessions with connection pooling and keep-alive.
+"""
+
+import asyncio
+from typing import Dict, Optional
+import aiohttp
+
+class ManagedSession:
+    """Lazily created aiohttp session reused across requests.
+
+    The underlying ``aiohttp.ClientSession`` is created on first use and keeps
+    its TCP connections alive between requests, so repeated calls skip DNS
+    lookups and connection setup. A session is bound to the event loop it was
+    created on; if it is used from a different loop (e.g. successive
+    ``asyncio.run`` calls) a new session is created transparently.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        timeout: Optional[float] = 300.0,
+        connect_timeout: Optional[float] = 10.0,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """Initialize managed session.
+
+        Args:
+            limit: Maximum number of simultaneous connections
+            limit_per_host: Maximum connections per host (0 for no limit)
+            keepalive_timeout: Seconds an idle connection is kept open
+            timeout: Total timeout per request in seconds (None for no limit)
+            connect_timeout: Timeout for establishing a connection in seconds
+            headers: Default headers sent with every request
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.headers = headers
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def closed(self) -> bool:
+        """Whether there is currently no open session."""
+        return self._session is None or self._session.closed
+
+    async def get(self) -> aiohttp.ClientSession:
+        """Get the session, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers=self.headers
+            )
+            self._loop = loop
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the session and its pooled connections."""
+        session, self._session = self._session, None
+        if session is not None and not session.closed and self._loop is asyncio.get_running_loop():
+            await session.close()
+        self._loop = None
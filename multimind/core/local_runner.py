@@ -2,11 +2,11 @@
 Local model runner for Ollama and other local model implementations.
 """
 
-import aiohttp
 import json
 from typing import List, Dict, Any, Optional, AsyncGenerator, Union, TypeVar, Awaitable
 
 from .base import BaseLLM
+from .http import ManagedSession
 
 T = TypeVar('T')
 
@@ -17,10 +17,13 @@ class LocalRunner(BaseLLM):
         self,
         model_name: str,
         base_url: str = "http://localhost:11434",
+        session: Optional[ManagedSession] = None,
         **kwargs
     ):
         super().__init__(model_name, **kwargs)
         self.base_url = base_url.rstrip("/")
+        # Pooled keep-alive connections, shareable between instances
+        self._http = session or ManagedSession()
 
     async def _make_request_stream(
         self,
@@ -28,12 +31,12 @@ class LocalRunner(BaseLLM):
         data: Dict[str, Any]
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """Make a streaming request to the Ollama API."""
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}/{endpoint}"
-            async with session.post(url, json=data) as response:
-                async for line in response.content:
-                    if line:
-                        yield json.loads(line)
+        session = await self._http.get()
+        url = f"{self.base_url}/{endpoint}"
+        async with session.post(url, json=data) as response:
+            async for line in response.content:
+                if line.strip():
+                    yield json.loads(line)
 
     async def _make_request(
         self,
@@ -41,10 +44,20 @@ class LocalRunner(BaseLLM):
         data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Make a regular request to the Ollama API."""
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}/{endpoint}"
-            async with session.post(url, json=data) as response:
-                return await response.json()
+        session = await self._http.get()
+        url = f"{self.base_url}/{endpoint}"
+        async with session.post(url, json=data) as response:
+            return await response.json()
+
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections."""
+        await self._http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
 
     async def generate(
         self,
@@ -0,0 +1,140 @@
+"""
+Fixed-memory latency histogram with relative-error quantiles.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+class LatencyHistogram:
+    """DDSketch-style histogram of positive values (e.g. latencies in seconds).
+
+    Values are counted in logarithmically sized buckets, so any quantile is
+    returned within ``relative_accuracy`` of the true value while memory
+    stays bounded by ``max_buckets`` regardless of how many values are added.
+    When the bucket limit is reached the lowest buckets are merged, which
+    only affects accuracy for the smallest values. Values at or below
+    ``min_value`` are counted in a dedicated zero bucket.
+
+    Adding a value does not allocate once its bucket exists, and no locking
+    is needed when used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = 0.01,
+        max_buckets: int = 2048,
+        min_value: float = 1e-6
+    ):
+        """Initialize latency histogram.
+
+        Args:
+            relative_accuracy: Maximum relative error of reported quantiles
+            max_buckets: Maximum number of buckets kept in memory
+            min_value: Values at or below this are counted as zero
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float) -> None:
+        """Record one value."""
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        if value <= self.min_value:
+            self.zero_count += 1
+            return
+
+        index = math.ceil(math.log(value) / self._log_gamma)
+        buckets = self.buckets
+        if index in buckets:
+            buckets[index] += 1
+        else:
+            buckets[index] = 1
+            if len(buckets) > self.max_buckets:
+                self._collapse()
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add all values recorded by another histogram with the same accuracy."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge histograms with different accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Get the value at quantile ``q`` (0-1), or None if empty."""
+        if self.count == 0:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    def percentiles(
+        self,
+        quantiles: Iterable[float] = (0.5, 0.95, 0.99)
+    ) -> Dict[str, Optional[float]]:
+        """Get several quantiles keyed as p50, p95, p99, ..."""
+        return {f"p{q * 100:g}": self.quantile(q) for q in quantiles}
+
+    def cumulative_counts(self, bounds: List[float]) -> List[int]:
+        """Count values at or below each bound, for fixed-bucket exposition.
+
+        Counts are exact up to the histogram's relative accuracy around each
+        bound. ``bounds`` must be sorted in ascending order.
+        """
+        counts = []
+        items = sorted(self.buckets.items())
+        position = 0
+        running = self.zero_count
+        for bound in bounds:
+            while position < len(items) and self._value(items[position][0]) <= bound:
+                running += items[position][1]
+                position += 1
+            counts.append(running)
+        return counts
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean of all recorded values, or None if empty."""
+        return self.sum / self.count if self.count else None
+
+    def _value(self, index: int) -> float:
+        """Representative value of a bucket, within relative accuracy of its range."""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def _collapse(self) -> None:
+        """Merge the two lowest buckets to stay within max_buckets."""
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
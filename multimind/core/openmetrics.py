@@ -0,0 +1,144 @@
+"""
+Minimal OpenMetrics text exposition and HTTP request metrics.
+"""
+
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .metrics import LatencyHistogram
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Latency histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+
+Labels = Dict[str, str]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(labels: Optional[Labels], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list((labels or {}).items())
+    if extra is not None:
+        items.append(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class OpenMetricsWriter:
+    """Accumulate metric families and render them in OpenMetrics text format."""
+
+    def __init__(self):
+        self._lines: List[str] = []
+
+    def _family(self, name: str, kind: str, help: str, unit: Optional[str] = None) -> None:
+        self._lines.append(f"# TYPE {name} {kind}")
+        if unit:
+            self._lines.append(f"# UNIT {name} {unit}")
+        self._lines.append(f"# HELP {name} {_escape(help)}")
+
+    def counter(self, name: str, help: str, samples: Iterable[Tuple[Labels, float]]) -> None:
+        """Add a counter family; sample names get the ``_total`` suffix."""
+        self._family(name, "counter", help)
+        for labels, value in samples:
+            self._lines.append(f"{name}_total{_labels(labels)} {_number(value)}")
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        samples: Iterable[Tuple[Labels, float]],
+        unit: Optional[str] = None
+    ) -> None:
+        """Add a gauge family."""
+        self._family(name, "gauge", help, unit)
+        for labels, value in samples:
+            self._lines.append(f"{name}{_labels(labels)} {_number(value)}")
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        samples: Iterable[Tuple[Labels, LatencyHistogram]],
+        buckets: List[float] = DEFAULT_BUCKETS,
+        unit: Optional[str] = "seconds"
+    ) -> None:
+        """Add a histogram family rendered from LatencyHistograms."""
+        self._family(name, "histogram", help, unit)
+        for labels, histogram in samples:
+            for bound, count in zip(buckets, histogram.cumulative_counts(buckets)):
+                le = _labels(labels, ('le', _number(bound)))
+                self._lines.append(f"{name}_bucket{le} {count}")
+            self._lines.append(f"{name}_bucket{_labels(labels, ('le', '+Inf'))} {histogram.count}")
+            self._lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+            self._lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+
+    def render(self) -> str:
+        """Get the exposition text, terminated by ``# EOF``."""
+        return "\n".join(self._lines + ["# EOF"]) + "\n"
+
+class HTTPMetrics:
+    """Request counts, latency and in-flight gauge for an ASGI app.
+
+    Requests are labelled by route template (e.g. ``/v1/sessions/{session_id}``)
+    rather than raw path, keeping label cardinality bounded.
+    """
+
+    def __init__(self, prefix: str):
+        """Initialize HTTP metrics.
+
+        Args:
+            prefix: Metric name prefix, e.g. ``multimind_gateway``
+        """
+        self.prefix = prefix
+        self.in_flight = 0
+        self.requests: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        self.latency: Dict[Tuple[str, str], LatencyHistogram] = defaultdict(LatencyHistogram)
+
+    async def middleware(self, request, call_next):
+        """FastAPI ``http`` middleware recording every request."""
+        self.in_flight += 1
+        start = time.perf_counter()
+        status = "500"
+        try:
+            response = await call_next(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            self.in_flight -= 1
+            route = request.scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            self.requests[(request.method, path, status)] += 1
+            self.latency[(request.method, path)].add(time.perf_counter() - start)
+
+    def write(self, writer: OpenMetricsWriter) -> None:
+        """Add the HTTP metric families to a writer."""
+        writer.counter(
+            f"{self.prefix}_http_requests",
+            "HTTP requests by method, route and status code",
+            [
+                ({"method": method, "route": route, "status": status}, count)
+                for (method, route, status), count in self.requests.items()
+            ]
+        )
+        writer.histogram(
+            f"{self.prefix}_http_request_duration_seconds",
+            "HTTP request latency by method and route",
+            [
+                ({"method": method, "route": route}, histogram)
+                for (method, route), histogram in self.latency.items()
+            ]
+        )
+        writer.gauge(
+            f"{self.prefix}_http_requests_in_flight",
+            "HTTP requests currently being served",
+            [({}, self.in_flight)]
+        )
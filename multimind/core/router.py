@@ -2,21 +2,45 @@
 Core router for model selection and request routing.
 """
 
-from typing import Dict, Any, Optional, Lis
+from typing import Dict, Any, Optional, List, Tuple
 from ..models.base import BaseLLM
 from ..models.factory import ModelFactory
+from ..models.pool import EndpointPool
+from ..router.engine import RoutingEngine
 
 class ModelRouter:
-    """Routes requests to appropriate models with fallback support."""
+    """Routes requests to appropriate models with fallback support.
 
-    def __init__(self, env_path: Optional[str] = None):
+    A facade over a RoutingEngine: models are created by the ModelFactory
+    on first use and registered as ``provider:model_name``, after which a
+    request resolves with one dict lookup. Requests without a provider go
+    to the first available provider in the fallback chain, and get the
+    engine's stats, circuit breakers and retries along the chain.
+    """
+
+    def __init__(self, env_path: Optional[str] = None, engine: Optional[RoutingEngine] = None):
         self.factory = ModelFactory(env_path=env_path)
+        self.engine = engine or RoutingEngine()
         self.fallback_chain: List[str] = []
 
     def available_models(self) -> List[str]:
         """Get list of available models."""
         return self.factory.available_models()
 
+    def _register(
+        self,
+        provider: str,
+        model_name: Optional[str] = None,
+        alias: Optional[Tuple[Optional[str], Optional[str]]] = None,
+        **kwargs
+    ) -> BaseLLM:
+        """Create a model with the factory and add it to the routing table."""
+        model = self.factory.get_model(provider, model_name, **kwargs)
+        self.engine.register_model(
+            f"{provider}:{model.model_name}", model, aliases=[alias or (provider, model_name)]
+        )
+        return model
+
     def set_fallback_chain(self, providers: List[str]) -> None:
         """Set the fallback chain for model selection."""
         available = self.available_models()
@@ -25,6 +49,37 @@ class ModelRouter:
                 raise ValueError(f"Provider {provider} is not available")
         self.fallback_chain = providers
 
+        names = []
+        for provider in providers:
+            try:
+                model = self._register(provider)
+            except Exception:
+                continue
+            names.append(f"{provider}:{model.model_name}")
+        self.engine.set_fallback_chain(names)
+
+    def set_endpoints(
+        self,
+        provider: str,
+        endpoints: List[Dict[str, Any]],
+        model_name: Optional[str] = None,
+        balancing: str = "least_outstanding"
+    ) -> EndpointPool:
+        """Serve a provider's model from a load-balanced pool of endpoints.
+
+        Args:
+            provider: Model provider (e.g. "ollama")
+            endpoints: Constructor arguments per endpoint (e.g. ``base_url`` or
+                ``api_key``), with optional ``weight`` and ``max_concurrency``
+            model_name: Model served by the endpoints (provider default if None)
+            balancing: "least_outstanding" or "weighted_round_robin"
+        """
+        pool = self.factory.set_pool(provider, endpoints, model_name, balancing)
+        self.engine.register_model(
+            f"{provider}:{pool.model_name}", pool, aliases=[(provider, model_name)]
+        )
+        return pool
+
     async def get_model(
         self,
         provider: Optional[str] = None,
@@ -32,13 +87,21 @@ class ModelRouter:
         **kwargs
     ) -> BaseLLM:
         """Get a model instance, following the fallback chain if needed."""
+        model = self.engine.routes.get((provider, model_name))
+        if model is not None:
+            return model
+
         if provider:
-            return self.factory.get_model(provider, model_name, **kwargs)
+            return self._register(provider, model_name, **kwargs)
+        if model_name is None:
+            return await self.engine.resolve()
 
         # Try fallback chain
         for fallback_provider in self.fallback_chain:
             try:
-                return self.factory.get_model(fallback_provider, model_name, **kwargs)
+                return self._register(
+                    fallback_provider, model_name, alias=(None, model_name), **kwargs
+                )
             except Exception:
                 continue
 
@@ -53,7 +116,7 @@ class ModelRouter:
     ) -> str:
         """Generate text using the appropriate model."""
         model = await self.get_model(provider, model_name)
-        return await model.generate(prompt, **kwargs)
+        return await self.engine.execute(model, lambda target: target.generate(prompt, **kwargs))
 
     async def chat(
         self,
@@ -64,7 +127,7 @@ class ModelRouter:
     ) -> str:
         """Generate chat completion using the appropriate model."""
         model = await self.get_model(provider, model_name)
-        return await model.chat(messages, **kwargs)
+        return await self.engine.execute(model, lambda target: target.chat(messages, **kwargs))
 
     async def embeddings(
         self,
@@ -2,17 +2,32 @@
 FastAPI-based API Gateway for MultiMind
 """
 
+import asyncio
+import json
 import logging
-from typing import Dict, List, Optional, Any
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+import math
+from contextlib import asynccontextmanager
+from dataclasses import asdict, is_dataclass
+from typing import Dict, List, Optional, Any, AsyncIterator
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel, Field
 import time
 from datetime import datetime
 
-from .config import config
-from .models import ModelResponse, get_model_handler
+from .config import MODEL_NAMES, config, get_model_status, refresh_model_status
+from .models import (
+    ModelResponse, StreamChunk, get_model_handler, close_model_handlers, compare_models
+)
 from .monitoring import monitor, ModelHealth
+from .coalescing import request_coalescer
+from ..models.cache import ResponseCache, cache_key, is_deterministic
+from ..core.health import HealthProber
+from ..core.circuit_breaker import CircuitOpenError, CircuitState, circuit_breakers
+from ..core.openmetrics import (
+    CONTENT_TYPE as OPENMETRICS_CONTENT_TYPE, HTTPMetrics, OpenMetricsWriter
+)
 from .chat import chat_manager, ChatSession, ChatMessage
 
 # Configure logging
@@ -29,6 +44,13 @@ app = FastAPI(
     version="0.1.0"
 )
 
+# Response cache for deterministic requests
+response_cache: Optional[ResponseCache] = ResponseCache(
+    max_entries=config.cache_max_entries,
+    ttl=config.cache_ttl,
+    path=config.cache_path
+) if config.cache_enabled else None
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -38,6 +60,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# HTTP request counts, latency and in-flight requests for /metrics
+http_metrics = HTTPMetrics("multimind_gateway")
+app.middleware("http")(http_metrics.middleware)
+
 # Pydantic models for request/response
 class ChatMessage(BaseModel):
     """Model for chat messages"""
@@ -64,6 +90,14 @@ class CompareRequest(BaseModel):
     models: List[str] = Field(default=["openai", "anthropic", "ollama"], description="Models to compare")
     temperature: Optional[float] = Field(default=0.7, description="Sampling temperature")
     max_tokens: Optional[int] = Field(default=None, description="Maximum tokens to generate")
+    timeout: Optional[float] = Field(
+        default=None,
+        description="Per-model timeout in seconds (default: model config timeout)"
+    )
+    stream: bool = Field(
+        default=False,
+        description="Stream each model's response as server-sent events as soon as it completes"
+    )
 
 class ModelResponse(BaseModel):
     content: str
@@ -79,6 +113,8 @@ class MetricsResponse(BaseModel):
     """Response model for metrics endpoint"""
     metrics: Dict[str, Any]
     health: Dict[str, ModelHealth]
+    cache: Optional[Dict[str, Any]] = None
+    circuits: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
 
 class SessionCreate(BaseModel):
     """Request model for creating a chat session"""
@@ -94,15 +130,193 @@ class SessionResponse(BaseModel):
     updated_at: datetime
     message_count: int
 
+# Background health prober, started with the app
+health_prober: Optional[HealthProber] = None
+
+def _probe_targets() -> Dict[str, Any]:
+    """Health probes of every configured model with a handler"""
+    targets = {}
+    for model, available in get_model_status().status.items():
+        if not available:
+            continue
+        try:
+            targets[model] = get_model_handler(model).probe
+        except ValueError:
+            continue
+    return targets
+
+@app.on_event("startup")
+async def load_model_status() -> None:
+    """Evaluate model configuration once for the lifetime of the config"""
+    refresh_model_status()
+
+@app.on_event("startup")
+async def configure_circuit_breakers() -> None:
+    """Apply circuit breaker settings to breakers created from now on"""
+    circuit_breakers.configure(
+        failure_rate_threshold=config.circuit_failure_rate,
+        slow_call_threshold=config.circuit_slow_call_threshold,
+        min_calls=config.circuit_min_calls,
+        open_timeout=config.circuit_open_timeout
+    )
+
+def apply_rate_limits() -> None:
+    """Apply the configured per-model rate limits (models without one are unlimited)"""
+    for model in MODEL_NAMES:
+        model_config = config.get_model_config(model)
+        monitor.set_rate_limits(
+            model,
+            requests_per_minute=model_config.requests_per_minute,
+            tokens_per_minute=model_config.tokens_per_minute
+        )
+
+@app.on_event("startup")
+async def configure_rate_limits() -> None:
+    """Apply per-model rate limits from the configuration"""
+    apply_rate_limits()
+
+@app.on_event("startup")
+async def start_health_prober() -> None:
+    """Probe model health in the background so health endpoints serve cached status"""
+    global health_prober
+    monitor.health_window = config.health_window
+    if config.health_check_interval > 0:
+        health_prober = HealthProber(
+            _probe_targets,
+            monitor.record_health,
+            interval=config.health_check_interval,
+            jitter=config.health_check_jitter,
+            timeout=config.health_check_timeout
+        )
+        health_prober.start()
+
+@app.on_event("shutdown")
+async def shutdown_handlers() -> None:
+    """Stop health probing and close pooled provider clients"""
+    if health_prober is not None:
+        await health_prober.stop()
+    await close_model_handlers()
+    if response_cache is not None:
+        response_cache.close()
+
 # Dependency to validate model configuration
 async def validate_model_config():
-    status = config.validate(value={})
-    if not any(status.values()):
+    snapshot = get_model_status()
+    if not snapshot.any_available:
         raise HTTPException(
             status_code=500,
             detail="No models are properly configured. Please check your API keys."
         )
-    return status
+    return snapshot.status
+
+def _response_dict(response: Any) -> Dict[str, Any]:
+    """Convert a handler or API ModelResponse to a plain dict"""
+    if isinstance(response, dict):
+        return response
+    if is_dataclass(response):
+        return asdict(response)
+    return response.model_dump()
+
+def _sse_event(data: Any) -> str:
+    """Format a server-sent event"""
+    return f"data: {json.dumps(data)}\n\n"
+
+def _total_tokens(usage: Optional[Dict[str, int]]) -> int:
+    """Total tokens from provider usage, whatever its key names"""
+    if not usage:
+        return 0
+    if "total_tokens" in usage:
+        return usage["total_tokens"]
+    return usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+
+async def _tracked_stream(
+    model: str,
+    chunks: AsyncIterator[StreamChunk],
+    estimated_tokens: int = 0,
+    api_key: Optional[str] = None
+) -> AsyncIterator[StreamChunk]:
+    """Pass stream chunks through and track usage at stream end"""
+    start_time = time.time()
+    usage = None
+    try:
+        async for chunk in chunks:
+            if chunk.usage:
+                usage = chunk.usage
+            yield chunk
+    except Exception as e:
+        await monitor.track_request(
+            model=model,
+            tokens=_total_tokens(usage),
+            cost=0.0,
+            response_time=time.time() - start_time,
+            success=False,
+            error=str(e)
+        )
+        raise
+    await monitor.track_request(
+        model=model,
+        tokens=_total_tokens(usage),
+        cost=0.0,  # Implement cost calculation based on model
+        response_time=time.time() - start_time,
+        success=True
+    )
+    if usage:
+        monitor.record_tokens(model, _total_tokens(usage) - estimated_tokens, api_key)
+
+async def _stream_events(model: str, chunks: AsyncIterator[StreamChunk]) -> AsyncIterator[str]:
+    """Relay stream chunks as server-sent events"""
+    try:
+        async for chunk in chunks:
+            yield _sse_event(asdict(chunk))
+    except Exception as e:
+        logger.error(f"Error streaming from {model}: {str(e)}")
+        yield _sse_event({"error": str(e)})
+    yield "data: [DONE]\n\n"
+
+def _cache_key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Optional[str]:
+    """Response cache key, or None if the request must not be cached"""
+    if response_cache is None or not is_deterministic(params):
+        return None
+    # Include the provider model so a config change does not serve stale answers
+    model_name = get_model_status().models[model].model_name
+    return cache_key(f"{model}:{model_name}", "chat", messages, **params)
+
+async def _cache_lookup(key: Optional[str]) -> Optional[Dict[str, Any]]:
+    if key is None:
+        return None
+    return await response_cache.get(key)
+
+async def _cache_store(key: Optional[str], response: Any) -> None:
+    if key is not None:
+        await response_cache.set(key, _response_dict(response))
+
+async def _caching_stream(
+    key: Optional[str],
+    chunks: AsyncIterator[StreamChunk]
+) -> AsyncIterator[StreamChunk]:
+    """Pass stream chunks through and cache the assembled response once complete"""
+    parts = []
+    last = None
+    async for chunk in chunks:
+        parts.append(chunk.content)
+        last = chunk
+        yield chunk
+    if last is not None:
+        await _cache_store(key, {
+            "content": "".join(parts),
+            "model": last.model,
+            "usage": last.usage,
+            "finish_reason": last.finish_reason
+        })
+
+async def _replay_cached(cached: Dict[str, Any]) -> AsyncIterator[StreamChunk]:
+    """Stream a cached response as a single chunk"""
+    yield StreamChunk(
+        content=cached["content"],
+        model=cached["model"],
+        usage=cached.get("usage"),
+        finish_reason=cached.get("finish_reason") or "stop"
+    )
 
 @app.get("/")
 async def root():
@@ -110,45 +324,129 @@ async def root():
     return {
         "name": "MultiMind Gateway API",
         "version": "0.1.0",
-        "models": list(config.validate(value={}).keys())
+        "models": list(get_model_status().status.keys())
     }
 
 @app.get("/v1/models")
 async def list_models(status: Dict = Depends(validate_model_config)):
     """List available models and their status"""
+    models = get_model_status().models
     return {
         "models": {
             model: {
                 "status": "available" if is_valid else "unavailable",
                 "config": {
-                    "model_name": config.get_model_config(model).model_name,
-                    "temperature": config.get_model_config(model).temperature,
-                    "max_tokens": config.get_model_config(model).max_tokens
+                    "model_name": models[model].model_name,
+                    "temperature": models[model].temperature,
+                    "max_tokens": models[model].max_tokens
                 }
             }
             for model, is_valid in status.items()
         }
     }
 
+@app.post("/v1/config/reload")
+async def reload_config():
+    """Reload configuration from the environment and refresh model status"""
+    snapshot = config.reload()
+    apply_rate_limits()
+    return {"models": dict(snapshot.status)}
+
+async def get_api_key(
+    x_api_key: Optional[str] = Header(default=None),
+    authorization: Optional[str] = Header(default=None)
+) -> Optional[str]:
+    """Client API key from X-API-Key or a bearer Authorization header"""
+    if x_api_key:
+        return x_api_key
+    if authorization and authorization.lower().startswith("bearer "):
+        return authorization[7:].strip()
+    return None
+
+def _estimate_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int]) -> int:
+    """Rough token estimate (4 characters per token) used for rate limiting"""
+    return sum(len(m["content"]) for m in messages) // 4 + 1 + (max_tokens or 0)
+
+async def _admit(model: Optional[str], tokens: int, api_key: Optional[str]) -> None:
+    """Wait for rate limit capacity, raising 429 if none frees up in time"""
+    admitted = await monitor.acquire_rate_limit(
+        model, tokens, api_key, timeout=config.rate_limit_timeout
+    )
+    if not admitted:
+        retry_after = min(monitor.rate_limit_wait_time(model, tokens, api_key), 3600)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded for {'model ' + model if model else 'API key'}",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+@asynccontextmanager
+async def _refund_on_rejection(tokens: int, api_key: Optional[str]) -> AsyncIterator[None]:
+    """Return the API key's capacity if a model-level limit rejects the request"""
+    try:
+        yield
+    except HTTPException as e:
+        if e.status_code == 429:
+            monitor.refund_rate_limit(None, tokens, api_key)
+        raise
+
+def _circuit_open(model: str, retry_after: float) -> HTTPException:
+    """503 response for a model whose circuit breaker is open"""
+    return HTTPException(
+        status_code=503,
+        detail=f"Model {model} is temporarily unavailable",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+def _require_model(model: str, status: Dict) -> None:
+    if model not in status or not status[model]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Model {model} is not available"
+        )
+    # Fail fast instead of queueing requests for a degraded provider
+    breaker = circuit_breakers.get(model)
+    if not breaker.available:
+        raise _circuit_open(model, breaker.retry_after)
+
 @app.post("/v1/chat", response_model=ModelResponse)
-async def chat(request: ChatRequest, status: Dict = Depends(validate_model_config)):
+async def chat(
+    request: ChatRequest,
+    status: Dict = Depends(validate_model_config),
+    api_key: Optional[str] = Depends(get_api_key)
+):
     """Chat with a model"""
     try:
-        if request.model not in status or not status[request.model]:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Model {request.model} is not available"
-            )
+        _require_model(request.model, status)
 
         handler = get_model_handler(request.model)
-        start_time = time.time()
-
-        try:
-            response = await handler.chat(
-                [{"role": msg.role, "content": msg.content} for msg in request.messages],
-                temperature=request.temperature,
-                max_tokens=request.max_tokens
-            )
+        messages = [{"role": msg.role, "content": msg.content} for msg in request.messages]
+        params = {"temperature": request.temperature, "max_tokens": request.max_tokens}
+        estimate = _estimate_tokens(messages, request.max_tokens)
+        await _admit(None, estimate, api_key)
+
+        response_key = _cache_key(request.model, messages, params)
+        cached = await _cache_lookup(response_key)
+        if cached is not None:
+            return ModelResponse(**cached)
+
+        async def call() -> ModelResponse:
+            # Provider limits apply only to requests that reach the provider
+            await _admit(request.model, estimate, None)
+            start_time = time.time()
+            try:
+                response = await handler.chat(messages, **params)
+            except Exception as e:
+                # Track failed reques
+                await monitor.track_request(
+                    model=request.model,
+                    tokens=0,
+                    cost=0.0,
+                    response_time=time.time() - start_time,
+                    success=False,
+                    error=str(e)
+                )
+                raise
 
             # Track successful reques
             await monitor.track_request(
@@ -158,79 +456,205 @@ async def chat(request: ChatRequest, status: Dict = Depends(validate_model_confi
                 response_time=time.time() - start_time,
                 success=True
             )
-
+            if response.usage:
+                used = _total_tokens(response.usage)
+                monitor.record_tokens(request.model, used - estimate, api_key)
+            await _cache_store(response_key, response)
             return response
 
-        except Exception as e:
-            # Track failed reques
-            await monitor.track_request(
-                model=request.model,
-                tokens=0,
-                cost=0.0,
-                response_time=time.time() - start_time,
-                success=False,
-                error=str(e)
-            )
-            raise
+        # Identical concurrent requests share one upstream call
+        key = request_coalescer.key("chat", request.model, messages, **params)
+        async with _refund_on_rejection(estimate, api_key):
+            return await request_coalescer.run(key, call)
 
+    except HTTPException:
+        raise
+    except CircuitOpenError as e:
+        raise _circuit_open(request.model, e.retry_after)
     except Exception as e:
         logger.error(f"Error in chat endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/v1/generate", response_model=ModelResponse)
-async def generate(request: GenerateRequest, status: Dict = Depends(validate_model_config)):
+async def generate(
+    request: GenerateRequest,
+    status: Dict = Depends(validate_model_config),
+    api_key: Optional[str] = Depends(get_api_key)
+):
     """Generate text from a prompt"""
     try:
-        if request.model not in status or not status[request.model]:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Model {request.model} is not available"
-            )
+        _require_model(request.model, status)
 
         handler = get_model_handler(request.model)
-        response = await handler.generate(
-            request.prompt,
-            temperature=request.temperature,
-            max_tokens=request.max_tokens
-        )
+        messages = [{"role": "user", "content": request.prompt}]
+        params = {"temperature": request.temperature, "max_tokens": request.max_tokens}
+        estimate = _estimate_tokens(messages, request.max_tokens)
+        await _admit(None, estimate, api_key)
+
+        response_key = _cache_key(request.model, messages, params)
+        cached = await _cache_lookup(response_key)
+        if cached is not None:
+            return ModelResponse(**cached)
+
+        async def call() -> ModelResponse:
+            await _admit(request.model, estimate, None)
+            response = await handler.generate(request.prompt, **params)
+            if response.usage:
+                used = _total_tokens(response.usage)
+                monitor.record_tokens(request.model, used - estimate, api_key)
+            await _cache_store(response_key, response)
+            return response
 
-        return response
+        key = request_coalescer.key("generate", request.model, messages, **params)
+        async with _refund_on_rejection(estimate, api_key):
+            return await request_coalescer.run(key, call)
 
+    except HTTPException:
+        raise
+    except CircuitOpenError as e:
+        raise _circuit_open(request.model, e.retry_after)
     except Exception as e:
         logger.error(f"Error in generate endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/v1/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    status: Dict = Depends(validate_model_config),
+    api_key: Optional[str] = Depends(get_api_key)
+):
+    """Chat with a model, streaming the response as server-sent events"""
+    _require_model(request.model, status)
+    handler = get_model_handler(request.model)
+    messages = [{"role": msg.role, "content": msg.content} for msg in request.messages]
+    params = {"temperature": request.temperature, "max_tokens": request.max_tokens}
+    estimate = _estimate_tokens(messages, request.max_tokens)
+    await _admit(None, estimate, api_key)
+
+    response_key = _cache_key(request.model, messages, params)
+    cached = await _cache_lookup(response_key)
+    if cached is not None:
+        return StreamingResponse(
+            _stream_events(request.model, _replay_cached(cached)),
+            media_type="text/event-stream"
+        )
+
+    # Admit before the response starts, while a 429 can still be returned
+    async with _refund_on_rejection(estimate, api_key):
+        await _admit(request.model, estimate, None)
+    key = request_coalescer.key("chat", request.model, messages, **params)
+    chunks = request_coalescer.stream(
+        key, lambda: _caching_stream(
+            response_key,
+            _tracked_stream(
+                request.model, handler.chat_stream(messages, **params), estimate, api_key
+            )
+        )
+    )
+    return StreamingResponse(_stream_events(request.model, chunks), media_type="text/event-stream")
+
+@app.post("/v1/generate/stream")
+async def generate_stream(
+    request: GenerateRequest,
+    status: Dict = Depends(validate_model_config),
+    api_key: Optional[str] = Depends(get_api_key)
+):
+    """Generate text from a prompt, streaming the response as server-sent events"""
+    _require_model(request.model, status)
+    handler = get_model_handler(request.model)
+    messages = [{"role": "user", "content": request.prompt}]
+    params = {"temperature": request.temperature, "max_tokens": request.max_tokens}
+    estimate = _estimate_tokens(messages, request.max_tokens)
+    await _admit(None, estimate, api_key)
+
+    response_key = _cache_key(request.model, messages, params)
+    cached = await _cache_lookup(response_key)
+    if cached is not None:
+        return StreamingResponse(
+            _stream_events(request.model, _replay_cached(cached)),
+            media_type="text/event-stream"
+        )
+
+    async with _refund_on_rejection(estimate, api_key):
+        await _admit(request.model, estimate, None)
+    key = request_coalescer.key("generate", request.model, messages, **params)
+    chunks = request_coalescer.stream(
+        key, lambda: _caching_stream(
+            response_key,
+            _tracked_stream(
+                request.model, handler.generate_stream(request.prompt, **params), estimate, api_key
+            )
+        )
+    )
+    return StreamingResponse(_stream_events(request.model, chunks), media_type="text/event-stream")
+
 @app.post("/v1/compare", response_model=CompareResponse)
-async def compare(request: CompareRequest, status: Dict = Depends(validate_model_config)):
-    """Compare responses from multiple models"""
+async def compare(
+    request: CompareRequest,
+    status: Dict = Depends(validate_model_config),
+    api_key: Optional[str] = Depends(get_api_key)
+):
+    """Compare responses from multiple models, querying them concurrently"""
     try:
-        responses = {}
-
-        for model in request.models:
-            if model not in status or not status[model]:
-                responses[model] = ModelResponse(
-                    content=f"Error: Model {model} is not available",
-                    model=model
+        unavailable = {
+            model: ModelResponse(
+                content=f"Error: Model {model} is not available",
+                model=model
+            )
+            for model in request.models
+            if model not in status or not status[model]
+        }
+        candidates = [model for model in request.models if model not in unavailable]
+
+        estimate = _estimate_tokens([{"content": request.prompt}], request.max_tokens)
+        await _admit(None, estimate * len(candidates), api_key)
+        admitted = await asyncio.gather(*[
+            monitor.acquire_rate_limit(model, estimate, timeout=config.rate_limit_timeout)
+            for model in candidates
+        ])
+        rejected = admitted.count(False)
+        if rejected:
+            # The key is charged only for models that accepted the request
+            monitor.refund_rate_limit(
+                None, estimate * rejected, api_key, requests=int(rejected == len(candidates))
+            )
+        for model, ok in zip(candidates, admitted):
+            if not ok:
+                unavailable[model] = ModelResponse(
+                    content=f"Error: Rate limit exceeded for model {model}",
+                    model=model,
+                    finish_reason="rate_limited"
                 )
-                continue
+        available = [model for model in candidates if model not in unavailable]
+        results = compare_models(
+            available,
+            request.prompt,
+            timeout=request.timeout,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens
+        )
 
-            try:
-                handler = get_model_handler(model)
-                response = await handler.generate(
-                    request.prompt,
-                    temperature=request.temperature,
-                    max_tokens=request.max_tokens
-                )
-                responses[model] = response
-            except Exception as e:
-                logger.error(f"Error with {model}: {str(e)}")
-                responses[model] = ModelResponse(
-                    content=f"Error: {str(e)}",
-                    model=model
-                )
+        if request.stream:
+            async def events() -> AsyncIterator[str]:
+                for model, response in unavailable.items():
+                    yield _sse_event({"model": model, "response": _response_dict(response)})
+                async for model, response in results:
+                    yield _sse_event({"model": model, "response": _response_dict(response)})
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
 
-        return CompareResponse(responses=responses)
+        responses = dict(unavailable)
+        async for model, response in results:
+            responses[model] = response
 
+        # Keep the requested model order
+        return CompareResponse(responses={
+            model: _response_dict(responses[model]) for model in request.models
+        })
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in compare endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -240,11 +664,88 @@ async def get_metrics(model: Optional[str] = None):
     """Get metrics and health status for models"""
     try:
         metrics = await monitor.get_metrics(model)
-        return MetricsResponse(metrics=metrics, health=monitor.health)
+        return MetricsResponse(
+            metrics=metrics,
+            health=monitor.health,
+            cache=response_cache.stats.to_dict() if response_cache is not None else None,
+            circuits=circuit_breakers.to_dict()
+        )
     except Exception as e:
         logger.error(f"Error getting metrics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/metrics", include_in_schema=False)
+async def openmetrics():
+    """Expose gateway metrics in OpenMetrics text format for scraping"""
+    writer = OpenMetricsWriter()
+    http_metrics.write(writer)
+    monitor.write_openmetrics(writer)
+
+    snapshot = get_model_status()
+    writer.gauge(
+        "multimind_gateway_model_available",
+        "Whether a model is configured",
+        [({"model": model}, int(available)) for model, available in snapshot.status.items()]
+    )
+
+    if response_cache is not None:
+        stats = response_cache.stats
+        writer.counter(
+            "multimind_gateway_cache_lookups",
+            "Response cache lookups by result",
+            [
+                ({"result": "memory_hit"}, stats.memory_hits),
+                ({"result": "disk_hit"}, stats.disk_hits),
+                ({"result": "miss"}, stats.misses)
+            ]
+        )
+        writer.gauge(
+            "multimind_gateway_cache_hit_ratio",
+            "Fraction of response cache lookups served from the cache",
+            [({}, stats.hit_rate)],
+            unit="ratio"
+        )
+        writer.gauge(
+            "multimind_gateway_cache_entries",
+            "Entries in the in-memory response cache",
+            [({}, len(response_cache.memory))]
+        )
+
+    breakers = circuit_breakers.breakers
+    writer.gauge(
+        "multimind_gateway_circuit_state",
+        "Circuit breaker state per model (1 for the current state)",
+        [
+            ({"model": model, "state": state.value}, int(breaker.state is state))
+            for model, breaker in breakers.items()
+            for state in CircuitState
+        ]
+    )
+    writer.counter(
+        "multimind_gateway_circuit_rejected",
+        "Requests rejected by an open circuit breaker",
+        [({"model": model}, breaker.rejected) for model, breaker in breakers.items()]
+    )
+
+    coalescing = request_coalescer.stats
+    writer.counter(
+        "multimind_gateway_upstream_calls",
+        "Calls made to model providers after coalescing",
+        [({}, coalescing.upstream_calls)]
+    )
+    writer.counter(
+        "multimind_gateway_coalesced_requests",
+        "Requests that joined an identical in-flight call",
+        [({}, coalescing.coalesced_requests)]
+    )
+    writer.gauge(
+        "multimind_gateway_upstream_in_flight",
+        "Coalesced upstream calls currently in flight",
+        [({}, request_coalescer.in_flight)]
+    )
+
+    return Response(content=writer.render(), media_type=OPENMETRICS_CONTENT_TYPE)
+
 @app.post("/v1/sessions", response_model=SessionResponse)
 async def create_session(request: SessionCreate):
     """Create a new chat session"""
@@ -340,23 +841,29 @@ async def delete_session(session_id: str):
         logger.error(f"Error deleting session: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/v1/health")
+async def get_health(model: Optional[str] = None):
+    """Get the cached health status recorded by the background prober"""
+    if model:
+        return {model: monitor.health.get(model)}
+    return dict(monitor.health)
+
 @app.post("/v1/health/check")
-async def check_health(model: Optional[str] = None):
-    """Check health of models"""
+async def check_health(model: Optional[str] = None, refresh: bool = False):
+    """Check health of models.
+
+    Serves the cached status from the background prober. Models that have
+    not been probed yet, or all requested models when ``refresh`` is set, are
+    probed now with their cheap health probe.
+    """
     try:
-        if model:
-            handler = get_model_handler(model)
-            health = await monitor.check_health(model, handler)
-            return {model: health}
-
-        # Check all configured models
-        health_status = {}
-        for model_name in config.validate(value={}).keys():
-            if config.validate(value={})[model_name]:
-                handler = get_model_handler(model_name)
-                health = await monitor.check_health(model_name, handler)
-                health_status[model_name] = health
-        return health_status
+        models = [model] if model else list(_probe_targets())
+        stale = [name for name in models if refresh or name not in monitor.health]
+        await asyncio.gather(*(
+            monitor.check_health(name, get_model_handler(name), timeout=config.health_check_timeout)
+            for name in stale
+        ))
+        return {name: monitor.health[name] for name in models}
     except Exception as e:
         logger.error(f"Error checking health: {e}")
         raise HTTPException(status_code=500, detail=str(e))
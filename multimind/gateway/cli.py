@@ -16,8 +16,8 @@ from rich.panel import Panel
 from rich.table import Table
 from rich.progress import Progress
 
-from .config import config
-from .models import ModelResponse, get_model_handler
+from .config import config, get_model_status
+from .models import get_model_handler, compare_models
 from .monitoring import monitor
 from .chat import chat_manager, ChatSession
 
@@ -40,7 +40,7 @@ class MultiMindCLI:
 
     def validate_config(self) -> None:
         """Validate the configuration and show status"""
-        status = config.validate()
+        status = get_model_status().status
 
         table = Table(title="Model Configuration Status")
         table.add_column("Model", style="cyan")
@@ -120,40 +120,36 @@ class MultiMindCLI:
             logger.error(f"Error initializing chat: {str(e)}")
             self.console.print(f"[red]Error: {str(e)}[/red]")
 
-    async def compare(self, prompt: str, models: List[str]) -> None:
-        """Compare responses from multiple models"""
+    async def compare(
+        self,
+        prompt: str,
+        models: List[str],
+        timeout: Optional[float] = None
+    ) -> None:
+        """Compare responses from multiple models.
+
+        Models are queried concurrently and each answer is shown as soon as
+        it arrives; slow or failing models do not hold back the others.
+        """
         try:
-            responses: Dict[str, ModelResponse] = {}
-
-            with Progress() as progress:
+            with Progress(console=self.console, transient=True) as progress:
                 task = progress.add_task("[cyan]Comparing models...", total=len(models))
 
-                for model in models:
-                    try:
-                        handler = get_model_handler(model)
-                        response = await handler.generate(prompt)
-                        responses[model] = response
-                    except Exception as e:
-                        logger.error(f"Error with {model}: {str(e)}")
-                        responses[model] = ModelResponse(
-                            content=f"Error: {str(e)}",
-                            model=model
-                        )
-                    progress.update(task, advance=1)
+                async for model, response in compare_models(models, prompt, timeout=timeout):
+                    failed = response.finish_reason in ("error", "timeout")
+                    progress.console.print(Panel(
+                        response.content,
+                        title=f"{model} Response",
+                        border_style="red" if failed else "green"
+                    ))
 
-            # Display results
-            for model, response in responses.items():
-                self.console.print(Panel(
-                    response.content,
-                    title=f"{model} Response",
-                    border_style="green"
-                ))
+                    if response.usage:
+                        usage_table = Table(title=f"{model} Usage")
+                        for key, value in response.usage.items():
+                            usage_table.add_row(key, str(value))
+                        progress.console.print(usage_table)
 
-                if response.usage:
-                    usage_table = Table(title=f"{model} Usage")
-                    for key, value in response.usage.items():
-                        usage_table.add_row(key, str(value))
-                    self.console.print(usage_table)
+                    progress.update(task, advance=1)
 
         except Exception as e:
             logger.error(f"Error during comparison: {str(e)}")
@@ -170,6 +166,8 @@ class MultiMindCLI:
             metrics_table.add_column("Requests", style="green")
             metrics_table.add_column("Success Rate", style="green")
             metrics_table.add_column("Avg Response Time", style="yellow")
+            metrics_table.add_column("p95", style="yellow")
+            metrics_table.add_column("p99", style="yellow")
             metrics_table.add_column("Total Tokens", style="blue")
             metrics_table.add_column("Total Cost", style="red")
 
@@ -183,6 +181,8 @@ class MultiMindCLI:
                     str(m.total_requests),
                     f"{success_rate:.1f}%",
                     f"{m.avg_response_time:.2f}s",
+                    f"{m.latency_p95:.2f}s" if m.latency_p95 is not None else "N/A",
+                    f"{m.latency_p99:.2f}s" if m.latency_p99 is not None else "N/A",
                     str(m.total_tokens),
                     f"${m.total_cost:.4f}"
                 )
@@ -226,8 +226,8 @@ class MultiMindCLI:
                 else:
                     # Check all configured models
                     status = {}
-                    for model_name in config.validate().keys():
-                        if config.validate()[model_name]:
+                    for model_name, is_valid in get_model_status().status.items():
+                        if is_valid:
                             handler = get_model_handler(model_name)
                             health = await monitor.check_health(model_name, handler)
                             status[model_name] = health
@@ -362,14 +362,15 @@ def chat(model: str, prompt: Optional[str]):
 @cli.command()
 @click.argument("prompt")
 @click.option("--models", "-m", multiple=True, help="Models to compare")
-def compare(prompt: str, models: List[str]):
+@click.option("--timeout", "-t", type=float, help="Per-model timeout in seconds")
+def compare(prompt: str, models: List[str], timeout: Optional[float]):
     """Compare responses from multiple models"""
     if not models:
         models = ["openai", "anthropic", "ollama"]
 
     cli = MultiMindCLI()
     cli.validate_config()
-    asyncio.run(cli.compare(prompt, models))
+    asyncio.run(cli.compare(prompt, models, timeout))
 
 @cli.command()
 def status():
@@ -0,0 +1,188 @@
+"""
+Single-flight coalescing of identical in-flight gateway requests
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+@dataclass
+class CoalescingStats:
+    """Counts of upstream calls and of requests that joined one"""
+    upstream_calls: int = 0
+    coalesced_requests: int = 0
+
+@dataclass
+class _Flight:
+    """A pending upstream call and the number of requests awaiting it"""
+    task: asyncio.Future
+    waiters: int = 0
+
+@dataclass
+class _StreamFlight:
+    """A pending upstream stream, buffered so late subscribers can replay it"""
+    chunks: List[Any] = field(default_factory=list)
+    done: bool = False
+    error: Optional[BaseException] = None
+    subscribers: int = 0
+    task: Optional[asyncio.Future] = None
+    condition: asyncio.Condition = field(default_factory=asyncio.Condition)
+
+class RequestCoalescer:
+    """Deduplicate identical concurrent requests into one upstream call.
+
+    Requests are keyed on the operation, model, normalized messages and
+    sampling parameters. While a call for a key is in flight, further requests
+    with the same key await it and share its result (or its exception) instead
+    of calling the provider again. Streams are fanned out to every subscriber,
+    with chunks produced before a subscriber joined replayed to it.
+
+    Nothing is cached: once a call completes the key is released, so results
+    are only shared between requests that overlap in time. By default only
+    deterministic requests (temperature 0) are coalesced, since sampled
+    completions are expected to differ between requests.
+    """
+
+    def __init__(self, deterministic_only: bool = True):
+        """Initialize request coalescer.
+
+        Args:
+            deterministic_only: Only coalesce requests with temperature 0
+        """
+        self.deterministic_only = deterministic_only
+        self.stats = CoalescingStats()
+        self._flights: Dict[str, _Flight] = {}
+        self._streams: Dict[str, _StreamFlight] = {}
+
+    def key(
+        self,
+        operation: str,
+        model: str,
+        messages: List[Dict[str, str]],
+        **params
+    ) -> Optional[str]:
+        """Build the coalescing key for a request.
+
+        Returns:
+            The key, or None if the request must not be coalesced
+        """
+        if self.deterministic_only and params.get("temperature") != 0:
+            return None
+
+        payload = {
+            "operation": operation,
+            "model": model.lower(),
+            "messages": [
+                {"role": m["role"].lower(), "content": m["content"]}
+                for m in messages
+            ],
+            "params": {k: v for k, v in params.items() if v is not None}
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of coalesced upstream calls and streams currently in flight"""
+        return len(self._flights) + len(self._streams)
+
+    async def run(self, key: Optional[str], call: Callable[[], Awaitable[T]]) -> T:
+        """Run ``call`` once for all concurrent requests with the same key.
+
+        The upstream call is cancelled only when every request awaiting it
+        has been cancelled.
+        """
+        if key is None:
+            return await call()
+
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(task=asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._release(self._flights, key, flight))
+            self.stats.upstream_calls += 1
+        else:
+            self.stats.coalesced_requests += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    async def stream(
+        self,
+        key: Optional[str],
+        call: Callable[[], AsyncIterator[T]]
+    ) -> AsyncIterator[T]:
+        """Stream ``call`` once, fanning its chunks out to every subscriber."""
+        if key is None:
+            async for chunk in call():
+                yield chunk
+            return
+
+        flight = self._streams.get(key)
+        if flight is None:
+            flight = _StreamFlight()
+            flight.task = asyncio.ensure_future(self._pump(flight, call()))
+            self._streams[key] = flight
+            flight.task.add_done_callback(lambda _: self._release(self._streams, key, flight))
+            self.stats.upstream_calls += 1
+        else:
+            self.stats.coalesced_requests += 1
+
+        flight.subscribers += 1
+        try:
+            position = 0
+            while True:
+                async with flight.condition:
+                    await flight.condition.wait_for(
+                        lambda: position < len(flight.chunks) or flight.done
+                    )
+                    chunks = flight.chunks[position:]
+                    finished = flight.done
+
+                for chunk in chunks:
+                    yield chunk
+                position += len(chunks)
+
+                if finished and position >= len(flight.chunks):
+                    if flight.error is not None:
+                        raise flight.error
+                    return
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    async def _pump(self, flight: _StreamFlight, source: AsyncIterator[Any]) -> None:
+        """Read the upstream stream into the flight's replay buffer"""
+        try:
+            async for chunk in source:
+                async with flight.condition:
+                    flight.chunks.append(chunk)
+                    flight.condition.notify_all()
+        except Exception as e:
+            flight.error = e
+
+        async with flight.condition:
+            flight.done = True
+            flight.condition.notify_all()
+
+    @staticmethod
+    def _release(flights: Dict[str, Any], key: str, flight: Any) -> None:
+        """Forget a completed flight so later requests start a new call"""
+        if flights.get(key) is flight:
+            del flights[key]
+
+# Global request coalescer
+request_coalescer = RequestCoalescer()
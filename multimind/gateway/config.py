@@ -3,7 +3,10 @@ Configuration module for the MultiMind Gateway
 """
 
 import os
-from typing import Dict, Optional
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 from dotenv import load_dotenv
@@ -11,6 +14,32 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+MODEL_NAMES = ("openai", "anthropic", "ollama", "groq", "huggingface")
+
+# Models served locally need an API base instead of an API key
+LOCAL_MODELS = ("ollama",)
+
+def _env(
+    name: str,
+    default: Optional[str] = None,
+    cast: Callable[[str], Any] = str
+) -> Callable[[], Any]:
+    """Default factory reading an environment variable each time a config is created"""
+    def factory():
+        value = os.getenv(name, default)
+        return cast(value) if value else None
+    return factory
+
+def _flag(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
+
+def _rate_limits(prefix: str) -> Dict[str, Optional[int]]:
+    """Model rate limits from <PREFIX>_REQUESTS_PER_MINUTE and <PREFIX>_TOKENS_PER_MINUTE"""
+    return {
+        "requests_per_minute": _env(f"{prefix}_REQUESTS_PER_MINUTE", cast=int)(),
+        "tokens_per_minute": _env(f"{prefix}_TOKENS_PER_MINUTE", cast=int)()
+    }
+
 class ModelConfig(BaseSettings):
     """Configuration for individual models"""
     api_key: Optional[str] = None
@@ -19,6 +48,9 @@ class ModelConfig(BaseSettings):
     temperature: float = 0.7
     max_tokens: Optional[int] = None
     timeout: int = 30
+    # Provider rate limits enforced by the gateway (None for no limit)
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
 
 class GatewayConfig(BaseSettings):
     """Main configuration for the MultiMind Gateway"""
@@ -27,7 +59,8 @@ class GatewayConfig(BaseSettings):
     openai: ModelConfig = Field(
         default_factory=lambda: ModelConfig(
             api_key=os.getenv("OPENAI_API_KEY"),
-            model_name=os.getenv("OPENAI_MODEL_NAME", "gpt-3.5-turbo")
+            model_name=os.getenv("OPENAI_MODEL_NAME", "gpt-3.5-turbo"),
+            **_rate_limits("OPENAI")
         )
     )
 
@@ -35,7 +68,8 @@ class GatewayConfig(BaseSettings):
     anthropic: ModelConfig = Field(
         default_factory=lambda: ModelConfig(
             api_key=os.getenv("ANTHROPIC_API_KEY"),
-            model_name=os.getenv("ANTHROPIC_MODEL_NAME", "claude-3-opus-20240229")
+            model_name=os.getenv("ANTHROPIC_MODEL_NAME", "claude-3-opus-20240229"),
+            **_rate_limits("ANTHROPIC")
         )
     )
 
@@ -43,7 +77,8 @@ class GatewayConfig(BaseSettings):
     ollama: ModelConfig = Field(
         default_factory=lambda: ModelConfig(
             api_base=os.getenv("OLLAMA_API_BASE", "http://localhost:11434"),
-            model_name=os.getenv("OLLAMA_MODEL_NAME", "mistral")
+            model_name=os.getenv("OLLAMA_MODEL_NAME", "mistral"),
+            **_rate_limits("OLLAMA")
         )
     )
 
@@ -51,7 +86,8 @@ class GatewayConfig(BaseSettings):
     groq: ModelConfig = Field(
         default_factory=lambda: ModelConfig(
             api_key=os.getenv("GROQ_API_KEY"),
-            model_name=os.getenv("GROQ_MODEL_NAME", "mixtral-8x7b-32768")
+            model_name=os.getenv("GROQ_MODEL_NAME", "mixtral-8x7b-32768"),
+            **_rate_limits("GROQ")
         )
     )
 
@@ -59,21 +95,90 @@ class GatewayConfig(BaseSettings):
     huggingface: ModelConfig = Field(
         default_factory=lambda: ModelConfig(
             api_key=os.getenv("HUGGINGFACE_API_KEY"),
-            model_name=os.getenv("HUGGINGFACE_MODEL_NAME", "mistralai/Mistral-7B-Instruct-v0.2")
+            model_name=os.getenv("HUGGINGFACE_MODEL_NAME", "mistralai/Mistral-7B-Instruct-v0.2"),
+            **_rate_limits("HUGGINGFACE")
         )
     )
 
     # General Settings
     default_model: str = Field(
-        default=os.getenv("DEFAULT_MODEL", "openai"),
+        default_factory=_env("DEFAULT_MODEL", "openai"),
         description="Default model to use when none specified"
     )
 
     log_level: str = Field(
-        default=os.getenv("LOG_LEVEL", "INFO"),
+        default_factory=_env("LOG_LEVEL", "INFO"),
         description="Logging level for the gateway"
     )
 
+    rate_limit_timeout: float = Field(
+        default_factory=_env("RATE_LIMIT_TIMEOUT", "10", float),
+        description="Seconds a request may queue for rate limit capacity before a 429"
+    )
+
+    # Health Probe Settings
+    health_check_interval: float = Field(
+        default_factory=_env("HEALTH_CHECK_INTERVAL", "30", float),
+        description="Seconds between background health probes (0 disables probing)"
+    )
+
+    health_check_jitter: float = Field(
+        default_factory=_env("HEALTH_CHECK_JITTER", "0.1", float),
+        description="Fraction of the interval by which probe rounds are randomized"
+    )
+
+    health_check_timeout: float = Field(
+        default_factory=_env("HEALTH_CHECK_TIMEOUT", "5", float),
+        description="Seconds before a health probe counts as failed"
+    )
+
+    health_window: float = Field(
+        default_factory=_env("HEALTH_WINDOW", "3600", float),
+        description="Seconds of probe history used for uptime percentage"
+    )
+
+    # Circuit Breaker Settings
+    circuit_failure_rate: float = Field(
+        default_factory=_env("CIRCUIT_FAILURE_RATE", "0.5", float),
+        description="Failure rate of recent calls that opens a model's circuit"
+    )
+
+    circuit_slow_call_threshold: Optional[float] = Field(
+        default_factory=_env("CIRCUIT_SLOW_CALL_SECONDS", cast=float),
+        description="Seconds after which a call counts as slow (unset to ignore latency)"
+    )
+
+    circuit_min_calls: int = Field(
+        default_factory=_env("CIRCUIT_MIN_CALLS", "10", int),
+        description="Recent calls needed before a circuit can open"
+    )
+
+    circuit_open_timeout: float = Field(
+        default_factory=_env("CIRCUIT_OPEN_SECONDS", "30", float),
+        description="Seconds a circuit stays open before a trial call"
+    )
+
+    # Response Cache Settings
+    cache_enabled: bool = Field(
+        default_factory=_env("CACHE_ENABLED", "true", _flag),
+        description="Cache responses to deterministic (temperature 0) requests"
+    )
+
+    cache_max_entries: int = Field(
+        default_factory=_env("CACHE_MAX_ENTRIES", "1024", int),
+        description="Maximum responses kept in the in-memory cache"
+    )
+
+    cache_ttl: Optional[float] = Field(
+        default_factory=_env("CACHE_TTL", cast=float),
+        description="Seconds a cached response stays valid (unset for no expiry)"
+    )
+
+    cache_path: Optional[str] = Field(
+        default_factory=_env("CACHE_PATH"),
+        description="SQLite file for the on-disk response cache (unset for memory only)"
+    )
+
     class Config:
         env_prefix = "MULTIMIND_"
         case_sensitive = False
@@ -89,10 +194,78 @@ class GatewayConfig(BaseSettings):
         }
         return model_map.get(model_name.lower(), self.openai)
 
+    def is_model_configured(self, model_name: str) -> bool:
+        """Whether a model has the credentials or endpoint it needs"""
+        model_config = self.get_model_config(model_name)
+        if model_name.lower() in LOCAL_MODELS:
+            return bool(model_config.api_base)
+        return bool(model_config.api_key)
+
+    def reload(self) -> "ConfigSnapshot":
+        """Re-read the environment and .env file and refresh the model status snapshot"""
+        load_dotenv(override=True)
+        fresh = type(self)()
+        for name in type(self).model_fields:
+            setattr(self, name, getattr(fresh, name))
+        return refresh_model_status()
+
     @classmethod
     def validate(cls, value):
         # Add appropriate validation logic here
         return value
 
+@dataclass(frozen=True)
+class ModelStatus:
+    """Availability and public settings of one model"""
+    available: bool
+    model_name: str
+    temperature: float
+    max_tokens: Optional[int]
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Immutable view of model availability.
+
+    Built once at startup and on every config reload so request handlers can
+    read model status without re-validating the configuration.
+    """
+    models: Mapping[str, ModelStatus]
+    status: Mapping[str, bool]
+    created_at: float = field(default_factory=time.time)
+
+    @property
+    def any_available(self) -> bool:
+        """Whether at least one model is configured"""
+        return any(self.status.values())
+
+    @classmethod
+    def build(cls, gateway_config: "GatewayConfig") -> "ConfigSnapshot":
+        """Evaluate the configuration of every model"""
+        models = {}
+        for name in MODEL_NAMES:
+            model_config = gateway_config.get_model_config(name)
+            models[name] = ModelStatus(
+                available=gateway_config.is_model_configured(name),
+                model_name=model_config.model_name,
+                temperature=model_config.temperature,
+                max_tokens=model_config.max_tokens
+            )
+        return cls(
+            models=MappingProxyType(models),
+            status=MappingProxyType({name: m.available for name, m in models.items()})
+        )
+
 # Create a global config instance
-config = GatewayConfig()
\ No newline at end of file
+config = GatewayConfig()
+
+_model_status = ConfigSnapshot.build(config)
+
+def get_model_status() -> ConfigSnapshot:
+    """Get the current model status snapshot"""
+    return _model_status
+
+def refresh_model_status() -> ConfigSnapshot:
+    """Rebuild the model status snapshot from the global config"""
+    global _model_status
+    _model_status = ConfigSnapshot.build(config)
+    return _model_status
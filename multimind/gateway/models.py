@@ -2,18 +2,22 @@
 Model handlers for different AI providers
 """
 
+import asyncio
 import json
 import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Union
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, Type
 from dataclasses import dataclass
 from datetime import datetime
 
 import openai
 import anthropic
-import requests
-from huggingface_hub import InferenceClient
+from huggingface_hub import AsyncInferenceClient
 
+from ..core.http import ManagedSession
+from ..core.circuit_breaker import CircuitBreaker, circuit_breakers
 from .config import ModelConfig, config
 
 logger = logging.getLogger(__name__)
@@ -27,6 +31,18 @@ class ModelResponse:
     finish_reason: Optional[str] = None
     timestamp: str = datetime.now().isoformat()
 
+@dataclass
+class StreamChunk:
+    """Incremental piece of a streamed response.
+
+    The last chunk of a stream has ``finish_reason`` set and carries the
+    token usage of the whole response when the provider reports it.
+    """
+    content: str
+    model: str
+    usage: Optional[Dict[str, int]] = None
+    finish_reason: Optional[str] = None
+
 class ModelHandler(ABC):
     """Abstract base class for model handlers"""
 
@@ -44,6 +60,41 @@ class ModelHandler(ABC):
         """Generate text from a prompt"""
         pass
 
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        """Stream a chat response as it is generated.
+
+        Handlers without native streaming yield the full response as a
+        single chunk.
+        """
+        response = await self.chat(messages, **kwargs)
+        yield StreamChunk(
+            content=response.content,
+            model=response.model,
+            usage=response.usage,
+            finish_reason=response.finish_reason or "stop"
+        )
+
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[StreamChunk]:
+        """Stream text generated from a prompt"""
+        async for chunk in self.chat_stream([{"role": "user", "content": prompt}], **kwargs):
+            yield chunk
+
+    async def probe(self) -> None:
+        """Cheaply check that the model is reachable, raising on failure.
+
+        The default sends a one-token generation; handlers override this
+        where the provider has an endpoint that uses no tokens.
+        """
+        await self.generate("ping", temperature=0, max_tokens=1)
+
+    async def aclose(self) -> None:
+        """Release network resources held by the handler"""
+        pass
+
 class OpenAIHandler(ModelHandler):
     """Handler for OpenAI models"""
 
@@ -92,6 +143,55 @@ class OpenAIHandler(ModelHandler):
         messages = [{"role": "user", "content": prompt}]
         return await self.chat(messages, **kwargs)
 
+    async def probe(self) -> None:
+        # Model lookup is free and checks both credentials and model access
+        await self._client.models.retrieve(self.config.model_name)
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        try:
+            stream = await self._client.chat.completions.create(
+                model=self.config.model_name,
+                messages=messages,
+                temperature=kwargs.get("temperature", self.config.temperature),
+                max_tokens=kwargs.get("max_tokens", self.config.max_tokens),
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+
+            finish_reason = None
+            usage = None
+            async for chunk in stream:
+                # The usage chunk arrives last, with no choices
+                if chunk.usage:
+                    usage = {
+                        "prompt_tokens": chunk.usage.prompt_tokens or 0,
+                        "completion_tokens": chunk.usage.completion_tokens or 0,
+                        "total_tokens": chunk.usage.total_tokens or 0
+                    }
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                if choice.delta and choice.delta.content:
+                    yield StreamChunk(content=choice.delta.content, model=self.config.model_name)
+
+            yield StreamChunk(
+                content="",
+                model=self.config.model_name,
+                usage=usage,
+                finish_reason=finish_reason or "stop"
+            )
+        except Exception as e:
+            logger.error(f"OpenAI API error: {str(e)}")
+            raise
+
+    async def aclose(self) -> None:
+        await self._client.close()
+
 class AnthropicHandler(ModelHandler):
     """Handler for Anthropic models"""
 
@@ -128,31 +228,97 @@ class AnthropicHandler(ModelHandler):
         messages = [{"role": "user", "content": prompt}]
         return await self.chat(messages, **kwargs)
 
-class OllamaHandler(ModelHandler):
-    """Handler for Ollama models"""
+    async def probe(self) -> None:
+        await self._client.models.retrieve(self.config.model_name)
 
-    async def chat(self, messages: List[Dict[str, str]], **kwargs) -> ModelResponse:
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
         try:
-            # Convert messages to Ollama forma
             prompt = "\n".join([f"{m['role']}: {m['content']}" for m in messages])
 
-            response = requests.post(
-                f"{self.config.api_base}/api/generate",
-                json={
-                    "model": self.config.model_name,
-                    "prompt": prompt,
-                    "temperature": kwargs.get("temperature", self.config.temperature),
-                    "max_tokens": kwargs.get("max_tokens", self.config.max_tokens)
+            stream = await self._client.messages.create(
+                model=self.config.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=kwargs.get("temperature", self.config.temperature),
+                max_tokens=kwargs.get("max_tokens", self.config.max_tokens),
+                stream=True
+            )
+
+            input_tokens = output_tokens = 0
+            finish_reason = None
+            async for event in stream:
+                if event.type == "message_start":
+                    input_tokens = event.message.usage.input_tokens
+                elif event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                    yield StreamChunk(content=event.delta.text, model=self.config.model_name)
+                elif event.type == "message_delta":
+                    output_tokens = event.usage.output_tokens
+                    finish_reason = event.delta.stop_reason or finish_reason
+
+            yield StreamChunk(
+                content="",
+                model=self.config.model_name,
+                usage={
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens
                 },
-                timeout=self.config.timeout if hasattr(self.config, 'timeout') else 30
+                finish_reason=finish_reason or "end_turn"
             )
-            response.raise_for_status()
+        except Exception as e:
+            logger.error(f"Anthropic API error: {str(e)}")
+            raise
+
+    async def aclose(self) -> None:
+        await self._client.close()
 
-            result = response.json()
+class OllamaHandler(ModelHandler):
+    """Handler for Ollama models"""
+
+    def __init__(self, model_config: ModelConfig):
+        super().__init__(model_config)
+        self._client = ManagedSession(timeout=self.config.timeout)
+
+    def _payload(self, messages: List[Dict[str, str]], stream: bool, **kwargs) -> Dict:
+        options = {"temperature": kwargs.get("temperature", self.config.temperature)}
+        max_tokens = kwargs.get("max_tokens", self.config.max_tokens)
+        if max_tokens:
+            options["num_predict"] = max_tokens
+        return {
+            "model": self.config.model_name,
+            "messages": [{"role": m["role"], "content": m["content"]} for m in messages],
+            "options": options,
+            "stream": stream
+        }
+
+    @staticmethod
+    def _usage(result: Dict) -> Dict[str, int]:
+        prompt_tokens = result.get("prompt_eval_count", 0)
+        completion_tokens = result.get("eval_count", 0)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+
+    async def chat(self, messages: List[Dict[str, str]], **kwargs) -> ModelResponse:
+        try:
+            session = await self._client.get()
+            async with session.post(
+                f"{self.config.api_base.rstrip('/')}/api/chat",
+                json=self._payload(messages, stream=False, **kwargs)
+            ) as response:
+                response.raise_for_status()
+                result = await response.json()
+
+            default_reason = "stop" if result.get("done", True) else None
             return ModelResponse(
-                content=result["response"],
+                content=result["message"]["content"],
                 model=self.config.model_name,
-                finish_reason=result.get("done", True) and "stop" or None
+                usage=self._usage(result),
+                finish_reason=result.get("done_reason", default_reason)
             )
         except Exception as e:
             logger.error(f"Ollama API error: {str(e)}")
@@ -162,6 +328,51 @@ class OllamaHandler(ModelHandler):
         messages = [{"role": "user", "content": prompt}]
         return await self.chat(messages, **kwargs)
 
+    async def probe(self) -> None:
+        # Listing local models checks the server without loading the model
+        session = await self._client.get()
+        async with session.get(f"{self.config.api_base.rstrip('/')}/api/tags") as response:
+            response.raise_for_status()
+            result = await response.json()
+        names = {m.get("name", "") for m in result.get("models", [])}
+        model = self.config.model_name
+        if model not in names and f"{model}:latest" not in names:
+            raise ValueError(f"Model {model} is not available on the Ollama server")
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        try:
+            session = await self._client.get()
+            async with session.post(
+                f"{self.config.api_base.rstrip('/')}/api/chat",
+                json=self._payload(messages, stream=True, **kwargs)
+            ) as response:
+                response.raise_for_status()
+                # Ollama streams one JSON object per line; the last has done=true
+                async for line in response.content:
+                    if not line.strip():
+                        continue
+                    result = json.loads(line)
+                    content = result.get("message", {}).get("content", "")
+                    if result.get("done"):
+                        yield StreamChunk(
+                            content=content,
+                            model=self.config.model_name,
+                            usage=self._usage(result),
+                            finish_reason=result.get("done_reason", "stop")
+                        )
+                    elif content:
+                        yield StreamChunk(content=content, model=self.config.model_name)
+        except Exception as e:
+            logger.error(f"Ollama API error: {str(e)}")
+            raise
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
 # Commented out GroqHandler and related usages
 # class GroqHandler(ModelHandler):
 #     """Handler for Groq models"""
@@ -200,7 +411,7 @@ class HuggingFaceHandler(ModelHandler):
 
     def __init__(self, model_config: ModelConfig):
         super().__init__(model_config)
-        self._client = InferenceClient(
+        self._client = AsyncInferenceClient(
             model=self.config.model_name,
             token=self.config.api_key
         )
@@ -229,18 +440,267 @@ class HuggingFaceHandler(ModelHandler):
         messages = [{"role": "user", "content": prompt}]
         return await self.chat(messages, **kwargs)
 
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        try:
+            prompt = "\n".join([f"{m['role']}: {m['content']}" for m in messages])
+
+            stream = await self._client.text_generation(
+                prompt,
+                temperature=kwargs.get("temperature", self.config.temperature),
+                max_new_tokens=kwargs.get("max_tokens", self.config.max_tokens),
+                return_full_text=False,
+                stream=True,
+                details=True
+            )
+
+            usage = None
+            finish_reason = None
+            async for output in stream:
+                if output.details:
+                    usage = {"completion_tokens": output.details.generated_tokens}
+                    finish_reason = output.details.finish_reason
+                if output.token and not output.token.special:
+                    yield StreamChunk(content=output.token.text, model=self.config.model_name)
+
+            yield StreamChunk(
+                content="",
+                model=self.config.model_name,
+                usage=usage,
+                finish_reason=finish_reason or "stop"
+            )
+        except Exception as e:
+            logger.error(f"HuggingFace API error: {str(e)}")
+            raise
+
+    async def aclose(self) -> None:
+        close = getattr(self._client, "close", None)
+        if close is not None:
+            await close()
+
+class GuardedHandler(ModelHandler):
+    """Model handler wrapper routing calls through the model's circuit breaker.
+
+    While the circuit is open, calls fail fast with CircuitOpenError instead
+    of waiting on a degraded provider. Health probes bypass the breaker.
+    """
+
+    def __init__(self, handler: ModelHandler, breaker: CircuitBreaker):
+        super().__init__(handler.config)
+        self.handler = handler
+        self.breaker = breaker
+        # Calls in progress, and the callback run when the last one finishes
+        self.in_flight = 0
+        self.on_idle: Optional[Callable[["GuardedHandler"], None]] = None
+
+    @contextmanager
+    def _tracked(self):
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight and self.on_idle is not None:
+                self.on_idle(self)
+
+    async def _guarded(self, call):
+        with self._tracked():
+            self.breaker.acquire()
+            start = time.perf_counter()
+            try:
+                result = await call()
+            except Exception as e:
+                self.breaker.record_failure(e, time.perf_counter() - start)
+                raise
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            self.breaker.record_success(time.perf_counter() - start)
+            return result
+
+    async def _guarded_stream(
+        self,
+        stream: AsyncIterator[StreamChunk]
+    ) -> AsyncIterator[StreamChunk]:
+        with self._tracked():
+            self.breaker.acquire()
+            start = time.perf_counter()
+            first_chunk = None
+            finished = False
+            try:
+                async for chunk in stream:
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - start
+                    yield chunk
+                finished = True
+            except Exception as e:
+                self.breaker.record_failure(e, time.perf_counter() - start)
+                finished = True
+                raise
+            finally:
+                if not finished:
+                    self.breaker.release()
+            # Streams are judged slow by their time to first chunk
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            self.breaker.record_success(first_chunk)
+
+    async def chat(self, messages: List[Dict[str, str]], **kwargs) -> ModelResponse:
+        return await self._guarded(lambda: self.handler.chat(messages, **kwargs))
+
+    async def generate(self, prompt: str, **kwargs) -> ModelResponse:
+        return await self._guarded(lambda: self.handler.generate(prompt, **kwargs))
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> AsyncIterator[StreamChunk]:
+        async for chunk in self._guarded_stream(self.handler.chat_stream(messages, **kwargs)):
+            yield chunk
+
+    async def generate_stream(self, prompt: str, **kwargs) -> AsyncIterator[StreamChunk]:
+        async for chunk in self._guarded_stream(self.handler.generate_stream(prompt, **kwargs)):
+            yield chunk
+
+    async def probe(self) -> None:
+        with self._tracked():
+            await self.handler.probe()
+
+    async def aclose(self) -> None:
+        await self.handler.aclose()
+
+HANDLER_CLASSES: Dict[str, Type[ModelHandler]] = {
+    "openai": OpenAIHandler,
+    "anthropic": AnthropicHandler,
+    "ollama": OllamaHandler,
+    "huggingface": HuggingFaceHandler
+}
+
+class HandlerRegistry:
+    """Cache of long-lived model handlers keyed by model name.
+
+    Handlers own provider clients with connection pools, so they are reused
+    across requests. A handler is rebuilt only when its model configuration
+    changes; a replaced handler is closed as soon as its in-flight requests
+    have finished.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, Tuple[str, GuardedHandler]] = {}
+        # Replaced handlers still serving requests, and their pending closes
+        self._retired: List[GuardedHandler] = []
+        self._closing: Set[asyncio.Task] = set()
+
+    def get(self, model_name: str) -> ModelHandler:
+        """Get the handler for a model, creating it if needed"""
+        key = model_name.lower()
+        handler_class = HANDLER_CLASSES.get(key)
+        if not handler_class:
+            raise ValueError(f"Unsupported model: {model_name}")
+
+        model_config = config.get_model_config(key)
+        fingerprint = model_config.model_dump_json()
+
+        cached = self._handlers.get(key)
+        if cached is not None:
+            if cached[0] == fingerprint:
+                return cached[1]
+            self._retire(cached[1])
+
+        # Breakers are shared with the router and survive handler rebuilds
+        handler = GuardedHandler(handler_class(model_config), circuit_breakers.get(key))
+        self._handlers[key] = (fingerprint, handler)
+        return handler
+
+    def _retire(self, handler: GuardedHandler) -> None:
+        self._retired.append(handler)
+        handler.on_idle = self._close_retired
+        if not handler.in_flight:
+            self._close_retired(handler)
+
+    def _close_retired(self, handler: GuardedHandler) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Nothing to close it on outside an event loop; closed on shutdown
+            return
+        handler.on_idle = None
+        self._retired.remove(handler)
+        task = loop.create_task(self._close(handler))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close(handler: ModelHandler) -> None:
+        try:
+            await handler.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing {type(handler).__name__}: {e}")
+
+    async def aclose(self) -> None:
+        """Close all handlers and their clients"""
+        handlers = [handler for _, handler in self._handlers.values()] + self._retired
+        self._handlers = {}
+        self._retired = []
+        for handler in handlers:
+            handler.on_idle = None
+            await self._close(handler)
+        if self._closing:
+            await asyncio.gather(*self._closing)
+
+# Global handler registry
+handler_registry = HandlerRegistry()
+
 def get_model_handler(model_name: str) -> ModelHandler:
     """Factory function to get the appropriate model handler"""
-    model_map = {
-        "openai": OpenAIHandler,
-        "anthropic": AnthropicHandler,
-        "ollama": OllamaHandler,
-        "huggingface": HuggingFaceHandler
-    }
-
-    handler_class = model_map.get(model_name.lower())
-    if not handler_class:
-        raise ValueError(f"Unsupported model: {model_name}")
-
-    model_config = config.get_model_config(model_name)
-    return handler_class(model_config)
\ No newline at end of file
+    return handler_registry.get(model_name)
+
+async def close_model_handlers() -> None:
+    """Close all cached model handlers"""
+    await handler_registry.aclose()
+
+async def compare_models(
+    models: List[str],
+    prompt: str,
+    timeout: Optional[float] = None,
+    **kwargs
+) -> AsyncIterator[Tuple[str, ModelResponse]]:
+    """Generate from several models concurrently.
+
+    Yields (model, response) pairs in completion order, so callers can show
+    each answer as soon as it arrives. Failures and timeouts are reported as
+    error responses rather than raised, so one slow or broken provider never
+    hides the others. Each model is bounded by ``timeout`` seconds, or by its
+    configured timeout when not given.
+    """
+    async def run(model: str) -> Tuple[str, ModelResponse]:
+        try:
+            handler = get_model_handler(model)
+            limit = timeout if timeout is not None else handler.config.timeout
+            response = await asyncio.wait_for(handler.generate(prompt, **kwargs), limit)
+            return model, response
+        except asyncio.TimeoutError as e:
+            logger.error(f"Timeout with {model}")
+            # wait_for cancels the call, which only releases the breaker; a
+            # timeout is the provider's failure and counts toward opening it
+            circuit_breakers.get(model.lower()).record_failure(e, limit)
+            return model, ModelResponse(
+                content="Error: Request timed out", model=model, finish_reason="timeout"
+            )
+        except Exception as e:
+            logger.error(f"Error with {model}: {str(e)}")
+            return model, ModelResponse(
+                content=f"Error: {str(e)}", model=model, finish_reason="error"
+            )
+
+    tasks = [asyncio.ensure_future(run(model)) for model in models]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
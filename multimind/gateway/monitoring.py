@@ -5,13 +5,17 @@ Monitoring and metrics module for the MultiMind Gateway
 import time
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional
-from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field, replace
 from collections import defaultdict
 import asyncio
 import aiohttp
 from pydantic import BaseModel
 
+from ..core.health import UptimeWindow
+from ..core.metrics import LatencyHistogram
+from ..core.openmetrics import OpenMetricsWriter
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -25,6 +29,9 @@ class ModelMetrics:
     avg_response_time: float = 0.0
     last_used: Optional[datetime] = None
     error_count: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    latency_p50: Optional[float] = None
+    latency_p95: Optional[float] = None
+    latency_p99: Optional[float] = None
 
 class ModelHealth(BaseModel):
     """Health status of a model"""
@@ -34,19 +41,61 @@ class ModelHealth(BaseModel):
     latency_ms: Optional[float] = None
     uptime_percentage: float = 100.0
 
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate.
+
+    The bucket holds at most ``capacity`` tokens (by default one minute's
+    worth), so short bursts are allowed while the long-run rate is capped.
+    The level may go negative when actual usage exceeds an earlier estimate;
+    later acquisitions then wait until the debt is repaid.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(rate_per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if available now)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Take tokens, allowing the level to go negative"""
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        """Return tokens, up to capacity"""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
 class ModelMonitor:
     """Monitor model health, usage, and performance"""
 
-    def __init__(self):
+    def __init__(self, health_window: float = 3600.0):
         self.metrics: Dict[str, ModelMetrics] = defaultdict(ModelMetrics)
         self.health: Dict[str, ModelHealth] = {}
-        self.rate_limits: Dict[str, Dict[str, int]] = defaultdict(
-            lambda: {
-                "requests_per_minute": 60,
-                "tokens_per_minute": 100000
-            }
-        )
-        self._lock = asyncio.Lock()
+        self.health_window = health_window
+        self._uptime: Dict[str, UptimeWindow] = {}
+        # Models without configured limits are not rate limited
+        self.rate_limits: Dict[str, Dict[str, Optional[int]]] = {}
+        self.latency: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.api_key_rate_limits: Dict[str, Dict[str, int]] = {}
+        self.default_api_key_rate_limits: Optional[Dict[str, int]] = None
+        self._buckets: Dict[Tuple[str, str, str], TokenBucket] = {}
+        self._queues: Dict[Tuple[str, str], asyncio.Lock] = {}
 
     async def track_request(
         self,
@@ -57,48 +106,89 @@ class ModelMonitor:
         success: bool,
         error: Optional[str] = None
     ) -> None:
-        """Track a model request and its metrics"""
-        async with self._lock:
-            metrics = self.metrics[model]
-            metrics.total_requests += 1
-            metrics.total_tokens += tokens
-            metrics.total_cost += cost
-            metrics.last_used = datetime.now()
-
-            # Update response time (moving average)
-            if metrics.avg_response_time == 0:
-                metrics.avg_response_time = response_time
-            else:
-                metrics.avg_response_time = (metrics.avg_response_time * 0.9 +
-                                          response_time * 0.1)
-
-            if success:
-                metrics.successful_requests += 1
-            else:
-                metrics.failed_requests += 1
-                if error:
-                    metrics.error_count[error] += 1
-
-    async def check_health(self, model: str, handler) -> ModelHealth:
-        """Check the health of a model"""
+        """Track a model request and its metrics.
+
+        Counters and latency histograms are kept per model and updated without
+        awaiting, so concurrent requests on the event loop never contend for a
+        lock.
+        """
+        metrics = self.metrics[model]
+        metrics.total_requests += 1
+        metrics.total_tokens += tokens
+        metrics.total_cost += cost
+        metrics.last_used = datetime.now()
+        self.latency[model].add(response_time)
+
+        # Update response time (moving average)
+        if metrics.avg_response_time == 0:
+            metrics.avg_response_time = response_time
+        else:
+            metrics.avg_response_time = (metrics.avg_response_time * 0.9 +
+                                      response_time * 0.1)
+
+        if success:
+            metrics.successful_requests += 1
+        else:
+            metrics.failed_requests += 1
+            if error:
+                metrics.error_count[error] += 1
+
+    def snapshot(self, model: str) -> ModelMetrics:
+        """Get a point-in-time copy of a model's metrics with latency percentiles"""
+        metrics = self.metrics.get(model)
+        if metrics is None:
+            return ModelMetrics()
+        latency = self.latency[model]
+        return replace(
+            metrics,
+            error_count=dict(metrics.error_count),
+            latency_p50=latency.quantile(0.5),
+            latency_p95=latency.quantile(0.95),
+            latency_p99=latency.quantile(0.99)
+        )
+
+    async def check_health(
+        self,
+        model: str,
+        handler,
+        timeout: Optional[float] = None
+    ) -> ModelHealth:
+        """Probe a model with its handler's cheap health probe and record the result"""
+        start_time = time.perf_counter()
         try:
-            start_time = time.time()
-            # Simple health check with a test promp
-            response = await handler.generate("test")
-            latency = (time.time() - start_time) * 1000  # Convert to ms
-
-            health = ModelHealth(
-                is_healthy=True,
-                last_check=datetime.now(),
-                latency_ms=latency
+            await asyncio.wait_for(handler.probe(), timeout)
+        except asyncio.TimeoutError:
+            return self.record_health(
+                model, False, (time.perf_counter() - start_time) * 1000,
+                f"Health probe timed out after {timeout}s"
             )
         except Exception as e:
-            health = ModelHealth(
-                is_healthy=False,
-                last_check=datetime.now(),
-                error_message=str(e)
+            return self.record_health(
+                model, False, (time.perf_counter() - start_time) * 1000, str(e)
             )
+        return self.record_health(model, True, (time.perf_counter() - start_time) * 1000)
 
+    def record_health(
+        self,
+        model: str,
+        healthy: bool,
+        latency_ms: Optional[float] = None,
+        error: Optional[str] = None
+    ) -> ModelHealth:
+        """Record a health probe result, updating the rolling uptime"""
+        uptime = self._uptime.get(model)
+        if uptime is None:
+            uptime = self._uptime[model] = UptimeWindow(self.health_window)
+        uptime.window = self.health_window
+        uptime.record(healthy)
+
+        health = ModelHealth(
+            is_healthy=healthy,
+            last_check=datetime.now(),
+            error_message=error,
+            latency_ms=latency_ms,
+            uptime_percentage=uptime.uptime_percentage()
+        )
         self.health[model] = health
         return health
 
@@ -106,29 +196,250 @@ class ModelMonitor:
         """Get metrics for a specific model or all models"""
         if model:
             return {
-                "metrics": self.metrics[model],
+                "metrics": self.snapshot(model),
                 "health": self.health.get(model)
             }
         return {
             model: {
-                "metrics": metrics,
+                "metrics": self.snapshot(model),
                 "health": self.health.get(model)
             }
-            for model, metrics in self.metrics.items()
+            for model in list(self.metrics.keys())
         }
 
-    def set_rate_limits(self, model: str, *, requests_per_minute: int, tokens_per_minute: int) -> None:
-        """Set rate limits for a specific model"""
-        self.rate_limits[model] = {
+    def write_openmetrics(
+        self,
+        writer: OpenMetricsWriter,
+        prefix: str = "multimind_gateway"
+    ) -> None:
+        """Add per-model request, token, cost, latency and health families to a writer.
+
+        Reads the counters and histograms as they are, without copying or
+        recomputing quantiles, so a scrape costs O(models x buckets).
+        """
+        models = list(self.metrics.items())
+        writer.counter(
+            f"{prefix}_model_requests",
+            "Model requests by outcome",
+            [
+                sample
+                for model, metrics in models
+                for sample in (
+                    ({"model": model, "outcome": "success"}, metrics.successful_requests),
+                    ({"model": model, "outcome": "error"}, metrics.failed_requests)
+                )
+            ]
+        )
+        writer.counter(
+            f"{prefix}_model_tokens",
+            "Tokens used by model",
+            [({"model": model}, metrics.total_tokens) for model, metrics in models]
+        )
+        writer.counter(
+            f"{prefix}_model_cost_dollars",
+            "Estimated cost by model in dollars",
+            [({"model": model}, metrics.total_cost) for model, metrics in models]
+        )
+        writer.histogram(
+            f"{prefix}_model_request_duration_seconds",
+            "Model request latency",
+            [({"model": model}, histogram) for model, histogram in list(self.latency.items())]
+        )
+        writer.gauge(
+            f"{prefix}_model_healthy",
+            "Whether the last health check of a model succeeded",
+            [
+                ({"model": model}, int(health.is_healthy))
+                for model, health in list(self.health.items())
+            ]
+        )
+        writer.gauge(
+            f"{prefix}_model_uptime_percent",
+            "Percentage of successful health probes in the rolling window",
+            [
+                ({"model": model}, health.uptime_percentage)
+                for model, health in list(self.health.items())
+            ]
+        )
+
+    def set_rate_limits(
+        self,
+        model: str,
+        *,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None
+    ) -> None:
+        """Set rate limits for a specific model (None leaves that dimension unlimited)"""
+        if requests_per_minute is None and tokens_per_minute is None:
+            self.rate_limits.pop(model, None)
+        else:
+            self.rate_limits[model] = {
+                "requests_per_minute": requests_per_minute,
+                "tokens_per_minute": tokens_per_minute
+            }
+        self._reset_buckets("model", model)
+
+    def set_api_key_rate_limits(
+        self,
+        api_key: Optional[str],
+        *,
+        requests_per_minute: int,
+        tokens_per_minute: int
+    ) -> None:
+        """Set rate limits for an API key, or the default for all keys if None"""
+        limits = {
             "requests_per_minute": requests_per_minute,
             "tokens_per_minute": tokens_per_minute
         }
+        if api_key is None:
+            self.default_api_key_rate_limits = limits
+            self._reset_buckets("api_key")
+        else:
+            self.api_key_rate_limits[api_key] = limits
+            self._reset_buckets("api_key", api_key)
 
-    async def check_rate_limit(self, model: str, tokens: int) -> bool:
-        """Check if a request would exceed rate limits"""
-        # Implement rate limiting logic here
-        # This is a placeholder for actual rate limiting implementation
+    async def check_rate_limit(
+        self,
+        model: Optional[str],
+        tokens: int,
+        api_key: Optional[str] = None
+    ) -> bool:
+        """Check if a request fits the rate limits, consuming it if so.
+
+        Never waits; use ``acquire_rate_limit`` to queue until capacity frees up.
+        """
+        buckets = self._buckets_for(model, api_key)
+        if self._wait_time(buckets, tokens) > 0:
+            return False
+        self._consume(buckets, tokens)
         return True
 
+    async def acquire_rate_limit(
+        self,
+        model: Optional[str],
+        tokens: int,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> bool:
+        """Wait until a request fits the rate limits and consume it.
+
+        Requests for the same model and API key are served in arrival order.
+
+        Args:
+            model: Model to charge (None to only apply API key limits)
+            tokens: Estimated tokens for the request
+            api_key: API key to charge (None to only apply model limits)
+            timeout: Maximum seconds to wait (None to wait indefinitely)
+
+        Returns:
+            False if the request could not be admitted within the timeout
+        """
+        buckets = self._buckets_for(model, api_key)
+        if not buckets:
+            return True
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        queue = self._queues.setdefault((model or "", api_key or ""), asyncio.Lock())
+        if queue.locked():
+            try:
+                await asyncio.wait_for(queue.acquire(), timeout)
+            except asyncio.TimeoutError:
+                return False
+        else:
+            await queue.acquire()
+
+        try:
+            while True:
+                wait = self._wait_time(buckets, tokens)
+                if wait <= 0:
+                    self._consume(buckets, tokens)
+                    return True
+                if wait == float("inf"):
+                    return False
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    return False
+                await asyncio.sleep(wait)
+        finally:
+            queue.release()
+
+    def record_tokens(
+        self,
+        model: Optional[str],
+        tokens: int,
+        api_key: Optional[str] = None
+    ) -> None:
+        """Adjust token buckets by the difference between actual and estimated usage"""
+        for kind, bucket in self._buckets_for(model, api_key):
+            if kind != "tokens":
+                continue
+            if tokens > 0:
+                bucket.consume(tokens)
+            elif tokens < 0:
+                bucket.refund(-tokens)
+
+    def refund_rate_limit(
+        self,
+        model: Optional[str],
+        tokens: int,
+        api_key: Optional[str] = None,
+        requests: int = 1
+    ) -> None:
+        """Return capacity consumed by a request that was rejected further on"""
+        for kind, bucket in self._buckets_for(model, api_key):
+            bucket.refund(requests if kind == "requests" else tokens)
+
+    def rate_limit_wait_time(
+        self,
+        model: Optional[str],
+        tokens: int,
+        api_key: Optional[str] = None
+    ) -> float:
+        """Seconds until a request would fit the rate limits"""
+        return self._wait_time(self._buckets_for(model, api_key), tokens)
+
+    def _buckets_for(
+        self,
+        model: Optional[str],
+        api_key: Optional[str]
+    ) -> List[Tuple[str, TokenBucket]]:
+        buckets = []
+        scopes = []
+        if model is not None and model in self.rate_limits:
+            scopes.append(("model", model, self.rate_limits[model]))
+        if api_key is not None:
+            limits = self.api_key_rate_limits.get(api_key, self.default_api_key_rate_limits)
+            if limits is not None:
+                scopes.append(("api_key", api_key, limits))
+
+        for scope, name, limits in scopes:
+            for kind, limit_name in (
+                ("requests", "requests_per_minute"),
+                ("tokens", "tokens_per_minute")
+            ):
+                if limits[limit_name] is None:
+                    continue
+                key = (scope, name, kind)
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(limits[limit_name])
+                buckets.append((kind, bucket))
+        return buckets
+
+    @staticmethod
+    def _wait_time(buckets: List[Tuple[str, TokenBucket]], tokens: int) -> float:
+        return max(
+            (bucket.wait_time(1 if kind == "requests" else tokens) for kind, bucket in buckets),
+            default=0.0
+        )
+
+    @staticmethod
+    def _consume(buckets: List[Tuple[str, TokenBucket]], tokens: int) -> None:
+        for kind, bucket in buckets:
+            bucket.consume(1 if kind == "requests" else tokens)
+
+    def _reset_buckets(self, scope: str, name: Optional[str] = None) -> None:
+        for key in [k for k in self._buckets if k[0] == scope and (name is None or k[1] == name)]:
+            del self._buckets[key]
+
 # Global monitor instance
 monitor = ModelMonitor()
\ No newline at end of file
@@ -0,0 +1,376 @@
+"""
+Exact-match response cache for deterministic LLM calls.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
+
+from .base import BaseLLM
+
+def cache_key(model: str, operation: str, payload: Any, **params) -> str:
+    """Build a cache key from the model, operation, input and sampling params.
+
+    Parameters set to None are ignored, so omitting a parameter and passing
+    its default as None produce the same key.
+    """
+    data = {
+        "model": model,
+        "operation": operation,
+        "payload": payload,
+        "params": {k: v for k, v in params.items() if v is not None}
+    }
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+def is_deterministic(params: Dict[str, Any]) -> bool:
+    """Whether sampling params make a completion reproducible (temperature 0)."""
+    return params.get("temperature") == 0
+
+@dataclass
+class CacheStats:
+    """Hit and miss counters of a response cache."""
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the counters and hit rate as a dict."""
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+class MemoryCache:
+    """In-memory LRU tier with optional TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        """Initialize memory cache.
+
+        Args:
+            max_entries: Maximum number of entries before LRU eviction
+            ttl: Seconds an entry stays valid (None for no expiry)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+class SQLiteCache:
+    """On-disk tier backed by SQLite, shared across processes and restarts."""
+
+    def __init__(self, path: Union[str, Path], ttl: Optional[float] = None):
+        """Initialize SQLite cache.
+
+        Args:
+            path: Database file, created if missing
+            ttl: Seconds an entry stays valid (None for no expiry)
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._conn.commit()
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get a value, or None if missing or expired."""
+        row = await self._run(self._get, key)
+        return json.loads(row) if row is not None else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        await self._run(self._set, key, json.dumps(value), expires_at)
+
+    async def clear(self) -> None:
+        """Remove all entries."""
+        await self._run(self._execute, "DELETE FROM responses")
+
+    async def purge_expired(self) -> None:
+        """Delete expired entries from disk."""
+        await self._run(
+            self._execute, "DELETE FROM responses WHERE expires_at <= ?", time.time()
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        self._execute(
+            "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+            key, value, expires_at
+        )
+
+    def _execute(self, sql: str, *args) -> None:
+        with self._lock:
+            self._conn.execute(sql, args)
+            self._conn.commit()
+
+class ResponseCache:
+    """Two-tier exact-match cache: in-memory LRU in front of optional SQLite.
+
+    Values must be JSON-serializable. Disk hits are promoted to memory, and
+    hit-rate statistics are kept in ``stats``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        path: Optional[Union[str, Path]] = None
+    ):
+        """Initialize response cache.
+
+        Args:
+            max_entries: Maximum entries kept in memory
+            ttl: Seconds an entry stays valid in both tiers (None for no expiry)
+            path: SQLite file for the on-disk tier (None for memory only)
+        """
+        self.memory = MemoryCache(max_entries=max_entries, ttl=ttl)
+        self.disk = SQLiteCache(path, ttl=ttl) if path else None
+        self._stats = CacheStats()
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hit and miss counters."""
+        self._stats.evictions = self.memory.evictions
+        return self._stats
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Look up a value in memory, then on disk."""
+        value = self.memory.get(key)
+        if value is not None:
+            self._stats.hits += 1
+            self._stats.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            value = await self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                self._stats.hits += 1
+                self._stats.disk_hits += 1
+                return value
+
+        self._stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value in every tier."""
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            await self.disk.set(key, value, ttl)
+        self._stats.writes += 1
+
+    async def clear(self) -> None:
+        """Remove all entries from every tier."""
+        self.memory.clear()
+        if self.disk is not None:
+            await self.disk.clear()
+
+    def close(self) -> None:
+        """Close the on-disk tier."""
+        if self.disk is not None:
+            self.disk.close()
+
+class CachedLLM(BaseLLM):
+    """LLM wrapper serving repeated deterministic calls from a ResponseCache.
+
+    Completions are cached only for deterministic settings (temperature 0,
+    unless ``cache_nondeterministic`` is set); embeddings are always cached.
+    Streams are replayed from the cache as a single chunk and stored once
+    they complete.
+    """
+
+    def __init__(
+        self,
+        llm: BaseLLM,
+        cache: Optional[ResponseCache] = None,
+        cache_nondeterministic: bool = False,
+        **kwargs
+    ):
+        """Initialize cached LLM.
+
+        Args:
+            llm: Model to wrap
+            cache: Cache to use (default: a new in-memory cache)
+            cache_nondeterministic: Also cache sampled completions
+        """
+        super().__init__(llm.model_name, **kwargs)
+        self.llm = llm
+        self.cache = cache or ResponseCache()
+        self.cache_nondeterministic = cache_nondeterministic
+        self.cost_per_token = getattr(llm, "cost_per_token", None)
+        self.avg_latency = getattr(llm, "avg_latency", None)
+
+    def _key(self, operation: str, payload: Any, params: Dict[str, Any]) -> Optional[str]:
+        if not self.cache_nondeterministic and not is_deterministic(params):
+            return None
+        return cache_key(self.model_name, operation, payload, **params)
+
+    async def _cached(self, key: Optional[str], call) -> Any:
+        if key is None:
+            return await call()
+        value = await self.cache.get(key)
+        if value is None:
+            value = await call()
+            await self.cache.set(key, value)
+        return value
+
+    async def _cached_stream(self, key: Optional[str], stream) -> AsyncGenerator[str, None]:
+        if key is not None:
+            value = await self.cache.get(key)
+            if value is not None:
+                yield value
+                return
+
+        parts: List[str] = []
+        async for chunk in stream():
+            parts.append(chunk)
+            yield chunk
+        if key is not None:
+            await self.cache.set(key, "".join(parts))
+
+    async def generate(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> str:
+        """Generate text, served from the cache when possible."""
+        params = {"temperature": temperature, "max_tokens": max_tokens, **kwargs}
+        return await self._cached(
+            self._key("generate", prompt, params),
+            lambda: self.llm.generate(prompt, **params)
+        )
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Generate a text stream, replayed from the cache when possible."""
+        params = {"temperature": temperature, "max_tokens": max_tokens, **kwargs}
+        async for chunk in self._cached_stream(
+            self._key("generate", prompt, params),
+            lambda: self.llm.generate_stream(prompt, **params)
+        ):
+            yield chunk
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> str:
+        """Generate a chat completion, served from the cache when possible."""
+        params = {"temperature": temperature, "max_tokens": max_tokens, **kwargs}
+        return await self._cached(
+            self._key("chat", messages, params),
+            lambda: self.llm.chat(messages, **params)
+        )
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Generate a chat stream, replayed from the cache when possible."""
+        params = {"temperature": temperature, "max_tokens": max_tokens, **kwargs}
+        async for chunk in self._cached_stream(
+            self._key("chat", messages, params),
+            lambda: self.llm.chat_stream(messages, **params)
+        ):
+            yield chunk
+
+    async def embeddings(
+        self,
+        text: Union[str, List[str]],
+        **kwargs
+    ) -> Union[List[float], List[List[float]]]:
+        """Generate embeddings, served from the cache when possible."""
+        key = cache_key(self.model_name, "embeddings", text, **kwargs)
+        return await self._cached(key, lambda: self.llm.embeddings(text, **kwargs))
+
+    async def get_cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        """Calculate the cost of a request on the wrapped model."""
+        if hasattr(self.llm, "get_cost"):
+            return await self.llm.get_cost(prompt_tokens, completion_tokens)
+        return await super().get_cost(prompt_tokens, completion_tokens)
+
+    async def get_latency(self) -> Optional[float]:
+        """Get the average latency of the wrapped model."""
+        if hasattr(self.llm, "get_latency"):
+            return await self.llm.get_latency()
+        return await super().get_latency()
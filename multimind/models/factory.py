@@ -3,13 +3,14 @@ Factory for creating and managing model instances.
 """
 
 import os
-from typing import Dict, Optional, List, Type
+from typing import Any, Dict, Optional, List, Type
 from dotenv import load_dotenv
 
 from .base import BaseLLM
 from .openai import OpenAIModel
 from .claude import ClaudeModel
 from .ollama import OllamaModel
+from .pool import Endpoint, EndpointPool
 
 class ModelFactory:
     """Factory for creating and managing model instances."""
@@ -35,14 +36,26 @@ class ModelFactory:
         self.openai_key = os.getenv('OPENAI_API_KEY')
         self.claude_key = os.getenv('CLAUDE_API_KEY')
 
+        # Optional endpoint pools, as comma-separated lists
+        self.default_endpoints: Dict[str, List[Dict[str, Any]]] = {
+            provider: [
+                {key: value.strip()} for value in os.getenv(env, "").split(",") if value.strip()
+            ]
+            for provider, env, key in (
+                ("openai", "OPENAI_API_KEYS", "api_key"),
+                ("claude", "CLAUDE_API_KEYS", "api_key"),
+                ("ollama", "OLLAMA_HOSTS", "base_url")
+            )
+        }
+
     def available_models(self) -> List[str]:
         """Get list of available model providers based on API keys."""
         available = []
 
-        # Check API keys
-        if self.openai_key:
+        # Check API keys, single or pooled
+        if self.openai_key or self.default_endpoints["openai"]:
             available.append("openai")
-        if self.claude_key:
+        if self.claude_key or self.default_endpoints["claude"]:
             available.append("claude")
 
         # Check Ollama availability
@@ -58,9 +71,48 @@ class ModelFactory:
         self,
         provider: str,
         model_name: Optional[str] = None,
+        endpoints: Optional[List[Dict[str, Any]]] = None,
+        balancing: str = "least_outstanding",
         **kwargs
     ) -> BaseLLM:
-        """Get or create a model instance."""
+        """Get or create a model instance.
+
+        With ``endpoints`` given, or several endpoints configured through
+        OPENAI_API_KEYS, CLAUDE_API_KEYS or OLLAMA_HOSTS, an EndpointPool
+        balancing over them is returned. Each endpoint is a dict of constructor
+        arguments (e.g. ``base_url`` or ``api_key``) plus optional ``weight``
+        and ``max_concurrency``.
+
+        Raises:
+            ValueError: If ``endpoints`` is given for a model that already has
+                an instance; use ``set_pool`` to replace it
+        """
+        model_name = self._resolve_name(provider, model_name)
+
+        # Create instance key
+        instance_key = f"{provider}:{model_name}"
+
+        # Return existing instance if available
+        if instance_key in self._instances:
+            if endpoints is not None:
+                raise ValueError(
+                    f"Model {instance_key} already exists; use set_pool to change its endpoints"
+                )
+            return self._instances[instance_key]
+
+        if endpoints is not None:
+            instance = self.create_pool(provider, model_name, endpoints, balancing, **kwargs)
+        else:
+            defaults = self.default_endpoints.get(provider) or [{}]
+            if len(defaults) > 1:
+                instance = self.create_pool(provider, model_name, defaults, balancing, **kwargs)
+            else:
+                instance = self._create(provider, model_name, **{**defaults[0], **kwargs})
+        self._instances[instance_key] = instance
+
+        return instance
+
+    def _resolve_name(self, provider: str, model_name: Optional[str]) -> str:
         if provider not in self._model_classes:
             raise ValueError(f"Unsupported model provider: {provider}")
 
@@ -71,15 +123,9 @@ class ModelFactory:
                 "claude": "claude-3-opus-20240229",
                 "ollama": "mistral"
             }.get(provider)
+        return model_name
 
-        # Create instance key
-        instance_key = f"{provider}:{model_name}"
-
-        # Return existing instance if available
-        if instance_key in self._instances:
-            return self._instances[instance_key]
-
-        # Create new instance
+    def _create(self, provider: str, model_name: str, **kwargs) -> BaseLLM:
         model_class = self._model_classes[provider]
 
         # Add API keys if needed
@@ -88,11 +134,39 @@ class ModelFactory:
         elif provider == "claude":
             kwargs["api_key"] = kwargs.get("api_key", self.claude_key)
 
-        # Create and store instance
-        instance = model_class(model_name=model_name, **kwargs)
-        self._instances[instance_key] = instance
+        return model_class(model_name=model_name, **kwargs)
 
-        return instance
+    def create_pool(
+        self,
+        provider: str,
+        model_name: Optional[str],
+        endpoints: List[Dict[str, Any]],
+        balancing: str = "least_outstanding",
+        **kwargs
+    ) -> EndpointPool:
+        """Create a pool of endpoints serving the same model."""
+        model_name = self._resolve_name(provider, model_name)
+        members = []
+        for spec in endpoints:
+            spec = dict(spec)
+            weight = spec.pop("weight", 1.0)
+            max_concurrency = spec.pop("max_concurrency", None)
+            llm = self._create(provider, model_name, **{**kwargs, **spec})
+            members.append(Endpoint(llm, weight=weight, max_concurrency=max_concurrency))
+        return EndpointPool(members, balancing=balancing, model_name=model_name)
+
+    def set_pool(
+        self,
+        provider: str,
+        endpoints: List[Dict[str, Any]],
+        model_name: Optional[str] = None,
+        balancing: str = "least_outstanding",
+        **kwargs
+    ) -> EndpointPool:
+        """Serve a model from a pool of endpoints, replacing any existing instance."""
+        pool = self.create_pool(provider, model_name, endpoints, balancing, **kwargs)
+        self._instances[f"{provider}:{pool.model_name}"] = pool
+        return pool
 
     def register_model_class(self, provider: str, model_class: Type[BaseLLM]) -> None:
         """Register a new model class."""
@@ -3,9 +3,9 @@ Ollama model implementation for local model running.
 """
 
 import json
-import aiohttp
 from typing import List, Dict, Any, Optional, AsyncGenerator, Union
 from ..core.base import BaseLLM
+from ..core.http import ManagedSession
 
 class OllamaModel(BaseLLM):
     """Runner for local models using Ollama."""
@@ -14,10 +14,13 @@ class OllamaModel(BaseLLM):
         self,
         model_name: str,
         base_url: str = "http://localhost:11434",
+        session: Optional[ManagedSession] = None,
         **kwargs
     ):
         super().__init__(model_name, **kwargs)
         self.base_url = base_url.rstrip("/")
+        # Pooled keep-alive connections, shareable between instances
+        self._http = session or ManagedSession()
         # Set default cost and latency for local models
         self.cost_per_token = 0.0
         self.avg_latency = 0.1  # 100ms default latency
@@ -28,12 +31,12 @@ class OllamaModel(BaseLLM):
         data: Dict[str, Any]
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """Make a streaming request to the Ollama API."""
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}/{endpoint}"
-            async with session.post(url, json=data) as response:
-                async for line in response.content:
-                    if line:
-                        yield json.loads(line)
+        session = await self._http.get()
+        url = f"{self.base_url}/{endpoint}"
+        async with session.post(url, json=data) as response:
+            async for line in response.content:
+                if line.strip():
+                    yield json.loads(line)
 
     async def _make_request(
         self,
@@ -41,10 +44,20 @@ class OllamaModel(BaseLLM):
         data: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Make a regular request to the Ollama API."""
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}/{endpoint}"
-            async with session.post(url, json=data) as response:
-                return await response.json()
+        session = await self._http.get()
+        url = f"{self.base_url}/{endpoint}"
+        async with session.post(url, json=data) as response:
+            return await response.json()
+
+    async def aclose(self) -> None:
+        """Close pooled HTTP connections."""
+        await self._http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
 
     async def generate(
         self,
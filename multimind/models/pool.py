@@ -0,0 +1,237 @@
+"""
+Load-balanced pools of endpoints serving the same model.
+"""
+
+import asyncio
+from typing import (
+    Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar, Union
+)
+from .base import BaseLLM
+
+T = TypeVar("T")
+
+BALANCING = ("least_outstanding", "weighted_round_robin")
+
+class Endpoint:
+    """One endpoint (host or API key) of a pooled model."""
+
+    def __init__(
+        self,
+        llm: BaseLLM,
+        weight: float = 1.0,
+        max_concurrency: Optional[int] = None,
+        name: Optional[str] = None
+    ):
+        """Initialize endpoint.
+
+        Args:
+            llm: Model instance bound to the endpoint
+            weight: Relative share of traffic (e.g. by GPU count or key quota)
+            max_concurrency: Maximum requests in flight (None for no cap)
+            name: Name used in stats (default: base_url or model name)
+        """
+        if weight <= 0:
+            raise ValueError("Endpoint weight must be positive")
+        self.llm = llm
+        self.weight = weight
+        self.max_concurrency = max_concurrency
+        self.name = name or getattr(llm, "base_url", None) or llm.model_name
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self._current = 0.0
+
+    @property
+    def saturated(self) -> bool:
+        """Whether the endpoint is at its concurrency cap."""
+        return self.max_concurrency is not None and self.outstanding >= self.max_concurrency
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the endpoint's load and counters as a dict."""
+        return {
+            "weight": self.weight,
+            "max_concurrency": self.max_concurrency,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors
+        }
+
+class EndpointPool(BaseLLM):
+    """Model spreading requests over several endpoints of the same model.
+
+    With ``least_outstanding`` balancing, each request goes to the endpoint
+    with the fewest requests in flight relative to its weight, which adapts
+    to endpoints of different speed. With ``weighted_round_robin``, requests
+    are spread in proportion to the weights (smooth weighted round-robin).
+    Endpoints at their concurrency cap are skipped; when every endpoint is
+    saturated, requests wait until one frees up.
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[Union[BaseLLM, Endpoint]],
+        balancing: str = "least_outstanding",
+        model_name: Optional[str] = None,
+        **kwargs
+    ):
+        """Initialize endpoint pool.
+
+        Args:
+            endpoints: Endpoints, or model instances to pool with weight 1
+            balancing: "least_outstanding" or "weighted_round_robin"
+            model_name: Name of the pooled model (default: the first endpoint's)
+            **kwargs: Additional arguments for BaseLLM
+        """
+        if not endpoints:
+            raise ValueError("An endpoint pool needs at least one endpoint")
+        if balancing not in BALANCING:
+            raise ValueError(f"Unsupported balancing: {balancing}")
+        self.endpoints = [e if isinstance(e, Endpoint) else Endpoint(e) for e in endpoints]
+        names = set()
+        for index, endpoint in enumerate(self.endpoints):
+            # e.g. several API keys of one hosted model
+            if endpoint.name in names:
+                endpoint.name = f"{endpoint.name}#{index}"
+            names.add(endpoint.name)
+        first = self.endpoints[0].llm
+        super().__init__(model_name or first.model_name, **kwargs)
+        self.balancing = balancing
+        self.cost_per_token = getattr(first, "cost_per_token", None)
+        self.avg_latency = getattr(first, "avg_latency", None)
+        self._waiters: List[asyncio.Future] = []
+        self._next = 0
+
+    def _pick(self) -> Optional[Endpoint]:
+        candidates = [e for e in self.endpoints if not e.saturated]
+        if not candidates:
+            return None
+        if self.balancing == "weighted_round_robin":
+            total = sum(e.weight for e in candidates)
+            for endpoint in candidates:
+                endpoint._current += endpoint.weight
+            chosen = max(candidates, key=lambda e: e._current)
+            chosen._current -= total
+            return chosen
+        # Rotate the starting point so ties don't always go to the first endpoint
+        start = self._next % len(candidates)
+        self._next += 1
+        rotated = candidates[start:] + candidates[:start]
+        return min(rotated, key=lambda e: e.outstanding / e.weight)
+
+    async def acquire(self) -> Endpoint:
+        """Reserve the next endpoint, waiting while all are saturated."""
+        while (endpoint := self._pick()) is None:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        return endpoint
+
+    def release(self, endpoint: Endpoint) -> None:
+        """Release an endpoint reserved with ``acquire``."""
+        endpoint.outstanding -= 1
+        # Wake every waiter: a single wakeup would be lost if its waiter were
+        # cancelled before running. Waiters finding no free endpoint wait again.
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def _call(self, call: Callable[[BaseLLM], Awaitable[T]]) -> T:
+        endpoint = await self.acquire()
+        try:
+            return await call(endpoint.llm)
+        except Exception:
+            endpoint.errors += 1
+            raise
+        finally:
+            self.release(endpoint)
+
+    async def _stream(
+        self,
+        stream: Callable[[BaseLLM], AsyncGenerator[str, None]]
+    ) -> AsyncGenerator[str, None]:
+        endpoint = await self.acquire()
+        try:
+            async for chunk in stream(endpoint.llm):
+                yield chunk
+        except Exception:
+            endpoint.errors += 1
+            raise
+        finally:
+            self.release(endpoint)
+
+    async def generate(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> str:
+        """Generate text on the next endpoint."""
+        return await self._call(lambda llm: llm.generate(prompt, temperature, max_tokens, **kwargs))
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Generate a text stream on the next endpoint."""
+        async for chunk in self._stream(
+            lambda llm: llm.generate_stream(prompt, temperature, max_tokens, **kwargs)
+        ):
+            yield chunk
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> str:
+        """Generate a chat completion on the next endpoint."""
+        return await self._call(lambda llm: llm.chat(messages, temperature, max_tokens, **kwargs))
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Generate a chat stream on the next endpoint."""
+        async for chunk in self._stream(
+            lambda llm: llm.chat_stream(messages, temperature, max_tokens, **kwargs)
+        ):
+            yield chunk
+
+    async def embeddings(
+        self,
+        text: Union[str, List[str]],
+        **kwargs
+    ) -> Union[List[float], List[List[float]]]:
+        """Generate embeddings on the next endpoint."""
+        return await self._call(lambda llm: llm.embeddings(text, **kwargs))
+
+    @property
+    def in_flight(self) -> int:
+        """Requests currently in flight across all endpoints."""
+        return sum(e.outstanding for e in self.endpoints)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Get the load and counters of every endpoint."""
+        return {e.name: e.to_dict() for e in self.endpoints}
+
+    async def aclose(self) -> None:
+        """Close the endpoints' network resources."""
+        for endpoint in self.endpoints:
+            close = getattr(endpoint.llm, "aclose", None)
+            if close is not None:
+                await close()
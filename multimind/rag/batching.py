@@ -0,0 +1,108 @@
+"""
+Micro-batching of concurrent RAG searches.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple, Union, cast
+import asyncio
+from ..models.base import BaseLLM
+from .vector_store import BaseVectorStore
+
+class SearchBatcher:
+    """Coalesce concurrent searches into one embedding call and one batched search.
+
+    Queries that arrive within ``window`` seconds of the first pending query are
+    embedded together and searched as a single batch. Results are dispatched back
+    to the awaiting coroutines.
+    """
+
+    def __init__(
+        self,
+        embedder: BaseLLM,
+        vector_store: BaseVectorStore,
+        window: float = 0.005,
+        max_batch_size: int = 64
+    ):
+        """Initialize search batcher.
+
+        Args:
+            embedder: Model used to embed queries
+            vector_store: Vector store to search
+            window: Time in seconds to wait for more queries before flushing
+            max_batch_size: Flush immediately once this many queries are pending
+        """
+        self.embedder = embedder
+        self.vector_store = vector_store
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[str, int, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    async def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """Queue a query for the next batch and wait for its results.
+
+        Args:
+            query: Query text
+            k: Number of results to return
+
+        Returns:
+            Search results for the query
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, k, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Dispatch all pending queries as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, int, asyncio.Future]]) -> None:
+        """Embed and search a batch, then resolve the waiting futures."""
+        try:
+            # Embed each distinct query text once
+            unique_queries = list(dict.fromkeys(query for query, _, _ in batch))
+            raw_embeddings = await self.embedder.embeddings(unique_queries)
+            vectors = _as_vector_list(raw_embeddings, len(unique_queries))
+
+            max_k = max(k for _, k, _ in batch)
+            results = await self.vector_store.search_batch(vectors, k=max_k)
+            by_query = dict(zip(unique_queries, results))
+
+            for query, k, future in batch:
+                if not future.done():
+                    future.set_result(by_query[query][:k])
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+def _as_vector_list(
+    embeddings: Union[List[float], List[List[float]]],
+    count: int
+) -> List[List[float]]:
+    """Normalize embedder output to one vector per input text."""
+    if count == 1 and embeddings and not isinstance(embeddings[0], (list, tuple)):
+        return [cast(List[float], list(embeddings))]
+    vectors = [list(vector) for vector in cast(List[List[float]], embeddings)]
+    if len(vectors) != count:
+        raise ValueError(
+            f"Embedder returned {len(vectors)} vectors for {count} queries"
+        )
+    return vectors
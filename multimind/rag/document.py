@@ -2,8 +2,9 @@
 Document processing utilities for RAG system.
 """
 
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Tuple
 import re
+import uuid
 from dataclasses import dataclass
 import tiktoken
 from pathlib import Path
@@ -49,9 +50,12 @@ class DocumentProcessor:
     def _split_text(
         self,
         text: str,
-        separator: str = "\n"
+        separator: str = "\n",
+        chunk_size: Optional[int] = None
     ) -> List[str]:
         """Split text into chunks based on separator."""
+        chunk_size = chunk_size or self.chunk_size
+
         # Split by separator
         segments = text.split(separator)
 
@@ -68,7 +72,7 @@ class DocumentProcessor:
             segment_size = self._count_tokens(segment)
 
             # If segment is too large, split it further
-            if segment_size > self.chunk_size:
+            if segment_size > chunk_size:
                 if current_chunk:
                     chunks.append(separator.join(current_chunk))
                     current_chunk = []
@@ -81,7 +85,7 @@ class DocumentProcessor:
 
                 for word in words:
                     word_size = self._count_tokens(word + " ")
-                    if temp_size + word_size > self.chunk_size:
+                    if temp_size + word_size > chunk_size:
                         if temp_chunk:
                             chunks.append(" ".join(temp_chunk))
                         temp_chunk = [word]
@@ -95,7 +99,7 @@ class DocumentProcessor:
                 continue
 
             # Add segment to current chunk if it fits
-            if current_size + segment_size <= self.chunk_size:
+            if current_size + segment_size <= chunk_size:
                 current_chunk.append(segment)
                 current_size += segment_size
             else:
@@ -119,22 +123,13 @@ class DocumentProcessor:
         """Process a document into chunks.
 
         Args:
-            document: Document text or Document objec
+            document: Document text or Document object
             metadata: Optional metadata to add to chunks
 
         Returns:
             List of Document chunks
         """
-        # Handle input types
-        if isinstance(document, str):
-            text = documen
-            doc_metadata = metadata or {}
-        else:
-            text = document.tex
-            doc_metadata = {**document.metadata, **(metadata or {})}
-
-        # Clean tex
-        text = self._clean_text(text)
+        text, doc_metadata = self._prepare(document, metadata)
 
         # Split into chunks
         chunks = self._split_text(text)
@@ -151,6 +146,81 @@ class DocumentProcessor:
 
         return documents
 
+    def process_document_hierarchical(
+        self,
+        document: Union[str, Document],
+        metadata: Optional[Dict[str, Any]] = None,
+        parent_chunk_size: Optional[int] = None,
+        child_chunk_size: Optional[int] = None
+    ) -> Tuple[List[Document], List[Document]]:
+        """Process a document into parent chunks and smaller child chunks.
+
+        Child chunks are meant to be embedded for precise retrieval; each one
+        carries a ``parent_id`` referencing the larger parent chunk it was cut
+        from, which is returned as context at query time.
+
+        Args:
+            document: Document text or Document object
+            metadata: Optional metadata to add to chunks
+            parent_chunk_size: Maximum parent chunk size in tokens
+                (default: 4 * child_chunk_size)
+            child_chunk_size: Maximum child chunk size in tokens
+                (default: chunk_size)
+
+        Returns:
+            Tuple of (parent chunks, child chunks)
+        """
+        child_chunk_size = child_chunk_size or self.chunk_size
+        parent_chunk_size = parent_chunk_size or child_chunk_size * 4
+        if parent_chunk_size < child_chunk_size:
+            raise ValueError("parent_chunk_size must be at least child_chunk_size")
+
+        text, doc_metadata = self._prepare(document, metadata)
+        parent_chunks = self._split_text(text, chunk_size=parent_chunk_size)
+
+        parents = []
+        children = []
+        for i, parent_chunk in enumerate(parent_chunks):
+            parent_id = uuid.uuid4().hex
+            parents.append(Document(
+                text=parent_chunk,
+                metadata={
+                    **doc_metadata,
+                    "parent_id": parent_id,
+                    "chunk_index": i,
+                    "total_chunks": len(parent_chunks)
+                }
+            ))
+
+            child_chunks = self._split_text(parent_chunk, chunk_size=child_chunk_size)
+            for j, child_chunk in enumerate(child_chunks):
+                children.append(Document(
+                    text=child_chunk,
+                    metadata={
+                        **doc_metadata,
+                        "parent_id": parent_id,
+                        "chunk_index": j,
+                        "total_chunks": len(child_chunks)
+                    }
+                ))
+
+        return parents, children
+
+    def _prepare(
+        self,
+        document: Union[str, Document],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Extract cleaned text and merged metadata from a document."""
+        if isinstance(document, str):
+            text = document
+            doc_metadata = metadata or {}
+        else:
+            text = document.text
+            doc_metadata = {**document.metadata, **(metadata or {})}
+
+        return self._clean_text(text), doc_metadata
+
     def process_file(
         self,
         file_path: Union[str, Path],
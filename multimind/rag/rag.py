@@ -5,10 +5,12 @@ Concrete RAG implementation.
 from typing import List, Dict, Any, Optional, Union, Tuple, cast, Sequence
 from pathlib import Path
 import asyncio
+import json
 from .base import BaseRAG
 from .vector_store import BaseVectorStore, FAISSVectorStore, ChromaVectorStore
 from .embeddings import get_embedder, BaseLLM
 from .document import Document, DocumentProcessor
+from .batching import SearchBatcher
 from ..models.base import BaseLLM as BaseModel
 
 class RAG(BaseRAG):
@@ -22,9 +24,24 @@ class RAG(BaseRAG):
         chunk_size: int = 1000,
         chunk_overlap: int = 200,
         top_k: int = 3,
+        batch_window: Optional[float] = None,
+        max_batch_size: int = 64,
+        parent_chunk_size: Optional[int] = None,
+        child_fetch_factor: int = 4,
         **kwargs
     ):
-        """Initialize RAG system."""
+        """Initialize RAG system.
+
+        Args:
+            batch_window: If set, concurrent searches arriving within this many
+                seconds are embedded and searched together as one batch
+            max_batch_size: Maximum number of queries per search batch
+            parent_chunk_size: If set, documents are split into parent chunks of
+                this many tokens and child chunks of chunk_size tokens. Only
+                children are embedded; searches return their parents.
+            child_fetch_factor: Children fetched per requested parent, so that
+                k distinct parents survive deduplication
+        """
         # Initialize embedder
         if isinstance(embedder, str):
             self.embedder = get_embedder(embedder, **kwargs)
@@ -51,10 +68,21 @@ class RAG(BaseRAG):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.top_k = top_k
+        self.parent_chunk_size = parent_chunk_size
+        self.child_fetch_factor = child_fetch_factor
+        self.parents: Dict[str, Document] = {}
         self.processor = DocumentProcessor(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap
         )
+        self._batcher: Optional[SearchBatcher] = None
+        if batch_window is not None:
+            self._batcher = SearchBatcher(
+                self.embedder,
+                self.vector_store,
+                window=batch_window,
+                max_batch_size=max_batch_size
+            )
         super().__init__(embedder=self.embedder, vector_store=self.vector_store, **kwargs)
 
     def _ensure_list_of_vectors(self, embeddings: Union[List[float], List[List[float]]]) -> List[List[float]]:
@@ -78,7 +106,18 @@ class RAG(BaseRAG):
         processed_texts = []
         for i, doc in enumerate(documents):
             doc_metadata = metadata[i] if metadata else {}
-            chunks = self.processor.process_document(doc, doc_metadata)
+            if self.parent_chunk_size:
+                parents, chunks = self.processor.process_document_hierarchical(
+                    doc,
+                    doc_metadata,
+                    parent_chunk_size=self.parent_chunk_size,
+                    child_chunk_size=self.chunk_size
+                )
+                self.parents.update(
+                    (parent.metadata["parent_id"], parent) for parent in parents
+                )
+            else:
+                chunks = self.processor.process_document(doc, doc_metadata)
             processed_docs.extend(chunks)
             processed_texts.extend([chunk.text for chunk in chunks])
 
@@ -100,6 +139,20 @@ class RAG(BaseRAG):
         **kwargs
     ) -> List[Dict[str, Any]]:
         """Search for relevant documents."""
+        if self.parent_chunk_size:
+            children = await self._search_chunks(query, k * self.child_fetch_factor, **kwargs)
+            return self._expand_parents(children, k)
+        return await self._search_chunks(query, k, **kwargs)
+
+    async def _search_chunks(self, query: str, k: int, **kwargs) -> List[Dict[str, Any]]:
+        """Search the vector store for the chunks closest to the query.
+
+        Searches with extra arguments (e.g. filters) bypass the batcher, which
+        only coalesces plain searches.
+        """
+        if self._batcher is not None and not kwargs:
+            return await self._batcher.search(query, k=k)
+
         # Generate query embedding
         raw_query_embedding = await self.embedder.embeddings(query)
         if isinstance(raw_query_embedding[0], list):
@@ -108,7 +161,41 @@ class RAG(BaseRAG):
             query_embedding = cast(List[float], raw_query_embedding)
 
         # Search vector store
-        results = await self.vector_store.search(query_vector=query_embedding, k=k)
+        results = await self.vector_store.search(query_vector=query_embedding, k=k, **kwargs)
+        return results
+
+    def _expand_parents(
+        self,
+        children: List[Dict[str, Any]],
+        k: int
+    ) -> List[Dict[str, Any]]:
+        """Replace child hits by their parent chunks, deduplicating parents.
+
+        Results keep the order of the best-ranked child of each parent;
+        ``child_hits`` counts how many retrieved children matched the parent.
+        """
+        results: List[Dict[str, Any]] = []
+        by_parent: Dict[str, Dict[str, Any]] = {}
+
+        for child in children:
+            parent_id = child["metadata"].get("parent_id")
+            parent = self.parents.get(parent_id) if parent_id else None
+            if parent is None:
+                if len(results) < k:
+                    results.append(child)
+                continue
+
+            if parent_id in by_parent:
+                by_parent[parent_id]["child_hits"] += 1
+            elif len(results) < k:
+                by_parent[parent_id] = {
+                    "document": parent.text,
+                    "metadata": parent.metadata,
+                    "distance": child["distance"],
+                    "child_hits": 1
+                }
+                results.append(by_parent[parent_id])
+
         return results
 
     async def query(
@@ -137,4 +224,31 @@ class RAG(BaseRAG):
     async def clear(self) -> None:
         """Clear all documents from the vector store."""
         # Forward to the underlying vector store's clear method
-        await self.vector_store.clear()
\ No newline at end of file
+        await self.vector_store.clear()
+        self.parents = {}
+
+    async def save(self, path: Union[str, Path]) -> None:
+        """Persist the vector store (if supported) and parent chunks to a directory."""
+        path = Path(path)
+        if hasattr(self.vector_store, "save"):
+            await self.vector_store.save(path)
+        path.mkdir(parents=True, exist_ok=True)
+        with open(path / "parents.json", "w", encoding="utf-8") as f:
+            parents = {
+                pid: {"text": doc.text, "metadata": doc.metadata}
+                for pid, doc in self.parents.items()
+            }
+            json.dump(parents, f)
+
+    async def load(self, path: Union[str, Path]) -> None:
+        """Restore state previously written by save()."""
+        path = Path(path)
+        if hasattr(self.vector_store, "load"):
+            await self.vector_store.load(path)
+        parents_path = path / "parents.json"
+        if parents_path.exists():
+            with open(parents_path, "r", encoding="utf-8") as f:
+                self.parents = {
+                    pid: Document(text=doc["text"], metadata=doc["metadata"])
+                    for pid, doc in json.load(f).items()
+                }
@@ -0,0 +1,237 @@
+"""
+Namespace-aware registry of RAG instances.
+"""
+
+from typing import Dict, List, Optional, Tuple, Union, Callable, Awaitable, AsyncIterator
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+import asyncio
+import logging
+import re
+import time
+from .rag import RAG
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+RAGFactory = Callable[[str], Union[RAG, Awaitable[RAG]]]
+
+@dataclass
+class _Entry:
+    """A resident RAG instance and its bookkeeping."""
+
+    rag: RAG
+    last_used: float = field(default_factory=time.monotonic)
+    active: int = 0
+
+class RAGRegistry:
+    """Lazily load per-namespace RAG instances and evict idle ones.
+
+    Each namespace (tenant, collection) gets its own RAG instance with its own
+    embedder and vector store, created on first use by ``factory``. At most
+    ``max_loaded`` namespaces stay resident; the least recently used idle
+    namespace is evicted when the limit is exceeded, and namespaces unused for
+    ``idle_timeout`` seconds are evicted on the next access. RAG instances (or
+    their vector stores) that implement ``save``/``load`` are persisted under
+    ``storage_dir`` on eviction and restored when the namespace is loaded again.
+    Namespaces that cannot be persisted (no ``storage_dir``, or a vector store
+    without ``save``) are never evicted, since unloading them would lose their
+    documents.
+    """
+
+    def __init__(
+        self,
+        factory: RAGFactory,
+        max_loaded: int = 32,
+        idle_timeout: Optional[float] = 600.0,
+        storage_dir: Optional[Union[str, Path]] = None
+    ):
+        """Initialize RAG registry.
+
+        Args:
+            factory: Callable (sync or async) building a RAG for a namespace
+            max_loaded: Maximum number of namespaces kept in memory
+            idle_timeout: Seconds of inactivity before a namespace is evicted
+            storage_dir: Directory used to persist evicted vector stores
+        """
+        if max_loaded < 1:
+            raise ValueError("max_loaded must be at least 1")
+
+        self.factory = factory
+        self.max_loaded = max_loaded
+        self.idle_timeout = idle_timeout
+        self.storage_dir = Path(storage_dir) if storage_dir else None
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Per-namespace locks and the number of coroutines using each
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+    @staticmethod
+    def validate_namespace(namespace: str) -> str:
+        """Validate a namespace name.
+
+        Raises:
+            ValueError: If the name is empty, too long or contains characters
+                other than letters, digits, '-' and '_'
+        """
+        if not NAMESPACE_PATTERN.match(namespace):
+            raise ValueError(
+                f"Invalid namespace: {namespace!r}. Use 1-64 letters, digits, '-' or '_'"
+            )
+        return namespace
+
+    def loaded(self) -> List[str]:
+        """Get the resident namespaces, least recently used first."""
+        return list(self._entries.keys())
+
+    def resident(self) -> Dict[str, RAG]:
+        """Get the resident RAG instances keyed by namespace."""
+        return {namespace: entry.rag for namespace, entry in self._entries.items()}
+
+    def active_count(self) -> int:
+        """Get the number of resident namespaces currently held by requests."""
+        return sum(1 for entry in self._entries.values() if entry.active)
+
+    async def get(self, namespace: str) -> RAG:
+        """Get the RAG instance for a namespace, loading it if needed."""
+        entry = await self._acquire(namespace)
+        entry.active -= 1
+        return entry.rag
+
+    @asynccontextmanager
+    async def use(self, namespace: str) -> AsyncIterator[RAG]:
+        """Hold a namespace for the duration of a request.
+
+        Namespaces in use are never evicted, so writes cannot race with
+        persistence.
+        """
+        entry = await self._acquire(namespace)
+        try:
+            yield entry.rag
+        finally:
+            entry.active -= 1
+            entry.last_used = time.monotonic()
+
+    async def evict(self, namespace: str, force: bool = False) -> bool:
+        """Persist and unload a namespace.
+
+        Args:
+            namespace: Namespace to evict
+            force: Unload the namespace even if it cannot be persisted, losing
+                its documents
+
+        Returns:
+            True if the namespace was resident and has been evicted
+        """
+        async with self._locked(namespace):
+            entry = self._entries.get(namespace)
+            if entry is None or entry.active:
+                return False
+            if not force and not self._can_persist(entry.rag):
+                return False
+            # Unregister before persisting, so that a request arriving meanwhile
+            # waits for the lock and reloads the saved state
+            del self._entries[namespace]
+            try:
+                await self._persist(namespace, entry.rag)
+            except Exception:
+                self._entries[namespace] = entry
+                raise
+            logger.info(f"Evicted RAG namespace {namespace}")
+            return True
+
+    async def evict_idle(self) -> List[str]:
+        """Evict every namespace idle for longer than idle_timeout."""
+        if self.idle_timeout is None:
+            return []
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [
+            namespace for namespace, entry in self._entries.items()
+            if not entry.active and entry.last_used < cutoff
+        ]
+        return [namespace for namespace in idle if await self.evict(namespace)]
+
+    async def close(self) -> None:
+        """Persist and unload all namespaces."""
+        for namespace in list(self._entries.keys()):
+            await self.evict(namespace, force=True)
+
+    @asynccontextmanager
+    async def _locked(self, namespace: str) -> AsyncIterator[None]:
+        """Hold the namespace's lock; the lock is dropped once nobody uses it."""
+        lock, users = self._locks.get(namespace, (None, 0))
+        if lock is None:
+            lock = asyncio.Lock()
+        self._locks[namespace] = (lock, users + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, users = self._locks[namespace]
+            if users == 1:
+                del self._locks[namespace]
+            else:
+                self._locks[namespace] = (lock, users - 1)
+
+    async def _acquire(self, namespace: str) -> _Entry:
+        """Load a namespace and mark it active; the caller must release it."""
+        self.validate_namespace(namespace)
+
+        entry = self._entries.get(namespace)
+        if entry is None:
+            async with self._locked(namespace):
+                entry = self._entries.get(namespace)
+                if entry is None:
+                    entry = _Entry(rag=await self._load(namespace))
+                    self._entries[namespace] = entry
+
+        entry.active += 1
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(namespace)
+
+        try:
+            await self.evict_idle()
+            await self._enforce_capacity()
+        except Exception:
+            entry.active -= 1
+            raise
+        return entry
+
+    async def _enforce_capacity(self) -> None:
+        """Evict least recently used idle namespaces above max_loaded."""
+        for namespace in list(self._entries.keys()):
+            if len(self._entries) <= self.max_loaded:
+                break
+            await self.evict(namespace)
+
+    async def _load(self, namespace: str) -> RAG:
+        rag = self.factory(namespace)
+        if asyncio.iscoroutine(rag):
+            rag = await rag
+
+        path = self._storage_path(namespace)
+        target = rag if hasattr(rag, "load") else rag.vector_store
+        if path is not None and path.exists() and hasattr(target, "load"):
+            await target.load(path)
+            logger.info(f"Restored RAG namespace {namespace} from {path}")
+        return rag
+
+    def _can_persist(self, rag: RAG) -> bool:
+        """Whether the namespace's documents survive eviction."""
+        if self.storage_dir is None:
+            return False
+        store = getattr(rag, "vector_store", None)
+        return hasattr(store if store is not None else rag, "save")
+
+    async def _persist(self, namespace: str, rag: RAG) -> None:
+        path = self._storage_path(namespace)
+        target = rag if hasattr(rag, "save") else rag.vector_store
+        if path is not None and hasattr(target, "save"):
+            await target.save(path)
+
+    def _storage_path(self, namespace: str) -> Optional[Path]:
+        if self.storage_dir is None:
+            return None
+        return self.storage_dir / namespace
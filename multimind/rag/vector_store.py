@@ -4,6 +4,11 @@ Vector store implementations using FAISS and Chroma.
 
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional, Union
+from pathlib import Path
+from functools import partial
+import asyncio
+import json
+import uuid
 import numpy as np
 
 class BaseVectorStore(ABC):
@@ -30,6 +35,18 @@ class BaseVectorStore(ABC):
         """Search for similar vectors."""
         pass
 
+    async def search_batch(
+        self,
+        query_vectors: List[List[float]],
+        k: int = 3,
+        **kwargs
+    ) -> List[List[Dict[str, Any]]]:
+        """Search for similar vectors for several queries at once."""
+        return [
+            await self.search(query_vector, k=k, **kwargs)
+            for query_vector in query_vectors
+        ]
+
     @abstractmethod
     async def clear(self) -> None:
         """Clear the vector store."""
@@ -51,6 +68,7 @@ class FAISSVectorStore(BaseVectorStore):
                 "FAISS is required. Install with: pip install faiss-cpu"
             )
 
+        self._faiss = faiss
         self.dimension = dimension
         self.index = faiss.IndexFlatL2(dimension)
         self.documents: List[str] = []
@@ -85,27 +103,40 @@ class FAISSVectorStore(BaseVectorStore):
         **kwargs
     ) -> List[Dict[str, Any]]:
         """Search for similar vectors in FAISS."""
-        # Convert query to numpy array
-        query_np = np.array([query_vector]).astype('float32')
+        results = await self.search_batch([query_vector], k=k, **kwargs)
+        return results[0]
+
+    async def search_batch(
+        self,
+        query_vectors: List[List[float]],
+        k: int = 3,
+        **kwargs
+    ) -> List[List[Dict[str, Any]]]:
+        """Search FAISS for several query vectors in a single index call."""
+        # Convert queries to numpy array
+        query_np = np.array(query_vectors).astype('float32')
 
         # Search the index
         distances, indices = self.index.search(query_np, k)
 
-        # Prepare results
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.documents):
-                results.append({
-                    "document": self.documents[idx],
-                    "metadata": self.metadata[idx],
-                    "distance": float(distances[0][i])
-                })
+        # Prepare results per query
+        batch_results = []
+        for row, row_indices in enumerate(indices):
+            results = []
+            for i, idx in enumerate(row_indices):
+                if 0 <= idx < len(self.documents):
+                    results.append({
+                        "document": self.documents[idx],
+                        "metadata": self.metadata[idx],
+                        "distance": float(distances[row][i])
+                    })
+            batch_results.append(results)
 
-        return results
+        return batch_results
 
     async def clear(self) -> None:
         """Clear the FAISS index and stored data."""
-        self.index = faiss.IndexFlatL2(self.dimension)
+        self.index = self._faiss.IndexFlatL2(self.dimension)
         self.documents = []
         self.metadata = []
 
@@ -113,10 +144,77 @@ class FAISSVectorStore(BaseVectorStore):
         """Get the total number of documents in the store."""
         return len(self.documents)
 
+    async def save(self, path: Union[str, Path]) -> None:
+        """Persist the index, documents and metadata to a directory.
+
+        Args:
+            path: Directory to write the store to
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._save_sync, Path(path))
+
+    async def load(self, path: Union[str, Path]) -> None:
+        """Replace the store contents with data previously written by save().
+
+        Args:
+            path: Directory the store was saved to
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._load_sync, Path(path))
+
+    def _save_sync(self, path: Path) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        self._faiss.write_index(self.index, str(path / "index.faiss"))
+        with open(path / "store.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "dimension": self.dimension,
+                "documents": self.documents,
+                "metadata": self.metadata
+            }, f)
+
+    def _load_sync(self, path: Path) -> None:
+        with open(path / "store.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.index = self._faiss.read_index(str(path / "index.faiss"))
+        self.dimension = data["dimension"]
+        self.documents = data["documents"]
+        self.metadata = data["metadata"]
+
 class ChromaVectorStore(BaseVectorStore):
-    """Chroma-based vector store implementation."""
+    """Chroma-based vector store implementation.
 
-    def __init__(self, collection_name: str = "default"):
+    The Chroma client is synchronous, so every call is run in an executor to
+    keep the event loop free. The collection is opened with get-or-create
+    semantics, so a persistent or remote store reattaches to existing data
+    after a restart.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "default",
+        persist_directory: Optional[Union[str, Path]] = None,
+        host: Optional[str] = None,
+        port: int = 8000,
+        ssl: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+        client: Optional[Any] = None,
+        batch_size: Optional[int] = None,
+        distance: str = "cosine"
+    ):
+        """Initialize Chroma vector store.
+
+        Args:
+            collection_name: Name of the collection to open or create
+            persist_directory: Directory for a persistent local client
+            host: Host of a Chroma server; takes precedence over persist_directory
+            port: Port of the Chroma server
+            ssl: Whether to use HTTPS for the Chroma server
+            headers: Extra HTTP headers for the Chroma server (e.g. auth)
+            client: Pre-configured Chroma client to use instead
+            batch_size: Maximum records per add/delete call
+                (default: the backend's maximum batch size)
+            distance: HNSW distance function ('cosine', 'l2' or 'ip')
+        """
         try:
             import chromadb
         except ImportError:
@@ -124,35 +222,64 @@ class ChromaVectorStore(BaseVectorStore):
                 "ChromaDB is required. Install with: pip install chromadb"
             )
 
-        self.client = chromadb.Client()
-        self.collection = self.client.create_collection(
+        if client is not None:
+            self.client = client
+        elif host:
+            self.client = chromadb.HttpClient(
+                host=host, port=port, ssl=ssl, headers=headers
+            )
+        elif persist_directory:
+            self.client = chromadb.PersistentClient(path=str(persist_directory))
+        else:
+            self.client = chromadb.Client()
+
+        self.collection = self.client.get_or_create_collection(
             name=collection_name,
-            metadata={"hnsw:space": "cosine"}
+            metadata={"hnsw:space": distance}
         )
+        self.batch_size = batch_size or self._backend_batch_size()
+
+    def _backend_batch_size(self) -> int:
+        """Get the largest batch the Chroma backend accepts."""
+        try:
+            return int(self.client.get_max_batch_size())
+        except Exception:
+            return 5000
+
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking Chroma call in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(func, *args, **kwargs))
 
     async def add(
         self,
         vectors: List[List[float]],
         documents: List[str],
         metadata: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None,
         **kwargs
     ) -> None:
-        """Add vectors and documents to Chroma."""
+        """Add vectors and documents to Chroma in backend-sized batches."""
         if len(vectors) != len(documents):
             raise ValueError("Number of vectors must match number of documents")
 
         # Prepare IDs and metadata
-        ids = [str(i) for i in range(len(documents))]
+        if ids is None:
+            ids = [uuid.uuid4().hex for _ in documents]
         if not metadata:
             metadata = [{}] * len(documents)
+        metadatas = [meta or None for meta in metadata]
 
         # Add to collection
-        self.collection.add(
-            embeddings=vectors,
-            documents=documents,
-            metadatas=metadata,
-            ids=ids
-        )
+        for i in range(0, len(documents), self.batch_size):
+            end = i + self.batch_size
+            await self._run(
+                self.collection.add,
+                embeddings=vectors[i:end],
+                documents=documents[i:end],
+                metadatas=metadatas[i:end],
+                ids=ids[i:end]
+            )
 
     async def search(
         self,
@@ -161,30 +288,46 @@ class ChromaVectorStore(BaseVectorStore):
         **kwargs
     ) -> List[Dict[str, Any]]:
         """Search for similar vectors in Chroma."""
-        results = self.collection.query(
-            query_embeddings=[query_vector],
+        results = await self.search_batch([query_vector], k=k, **kwargs)
+        return results[0]
+
+    async def search_batch(
+        self,
+        query_vectors: List[List[float]],
+        k: int = 3,
+        **kwargs
+    ) -> List[List[Dict[str, Any]]]:
+        """Search Chroma for several query vectors in a single query call."""
+        results = await self._run(
+            self.collection.query,
+            query_embeddings=query_vectors,
             n_results=k
         )
 
-        # Prepare results in consistent forma
-        formatted_results = []
-        for i in range(len(results["documents"][0])):
-            formatted_results.append({
-                "document": results["documents"][0][i],
-                "metadata": results["metadatas"][0][i],
-                "distance": results["distances"][0][i]
-            })
+        # Prepare results in consistent format
+        batch_results = []
+        for row in range(len(results["documents"])):
+            formatted_results = []
+            for i in range(len(results["documents"][row])):
+                formatted_results.append({
+                    "document": results["documents"][row][i],
+                    "metadata": results["metadatas"][row][i] or {},
+                    "distance": results["distances"][row][i]
+                })
+            batch_results.append(formatted_results)
 
-        return formatted_results
+        return batch_results
 
     async def clear(self) -> None:
-        """Clear the Chroma collection."""
-        self.collection.delete()
-        self.collection = self.client.create_collection(
-            name=self.collection.name,
-            metadata={"hnsw:space": "cosine"}
-        )
+        """Delete all records while keeping the collection and its settings."""
+        while True:
+            batch = await self._run(
+                self.collection.get, limit=self.batch_size, include=[]
+            )
+            if not batch["ids"]:
+                break
+            await self._run(self.collection.delete, ids=batch["ids"])
 
     async def get_document_count(self) -> int:
         """Get the total number of documents in the store."""
-        return self.collection.count()  # ChromaDB's collection.count() returns number of documents
\ No newline at end of file
+        return await self._run(self.collection.count)
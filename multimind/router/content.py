@@ -0,0 +1,290 @@
+"""
+Content-aware routing: send easy prompts to a small model tier.
+"""
+
+import math
+import random
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+from ..models.base import BaseLLM
+from .stats import RouterStats
+from .strategy import RoutingDecision, RoutingStrategy, LatencyAwareStrategy
+
+# Phrases suggesting reasoning-heavy tasks that need a large model
+HARD_KEYWORDS = (
+    "analyze", "analyse", "architecture", "debug", "derive", "design",
+    "explain why", "implement", "optimize", "proof", "prove", "reason",
+    "refactor", "step by step", "theorem", "trade-off", "tradeoff"
+)
+
+# Phrases suggesting short, well-defined tasks a small model handles well
+EASY_KEYWORDS = (
+    "classify", "define", "extract", "fix the typo", "format", "greet",
+    "hello", "list", "rephrase", "spell", "summarize", "summarise",
+    "thank", "translate"
+)
+
+# Added to a learned threshold so prompts at that difficulty stay below it
+THRESHOLD_MARGIN = 1e-9
+
+_CODE = re.compile(r"```|\bdef |\bclass |\bfunction\b|;\s*$|\{\s*$", re.MULTILINE)
+
+_encoding = None
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken's cl100k_base, or estimate 4 characters per token."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # tiktoken is optional; don't retry the import on every request
+            _encoding = False
+    if _encoding is False:
+        return len(text) // 4 + 1
+    return len(_encoding.encode(text))
+
+@dataclass
+class PromptFeatures:
+    """Cheap features of a prompt used to judge its difficulty."""
+    tokens: int
+    hard_keywords: int
+    easy_keywords: int
+    has_code: bool
+    turns: int
+
+def extract_features(
+    prompt: Optional[str] = None,
+    messages: Optional[List[Dict[str, str]]] = None
+) -> PromptFeatures:
+    """Extract routing features from a prompt or chat messages."""
+    if messages:
+        text = "\n".join(message.get("content", "") for message in messages)
+        turns = len(messages)
+    else:
+        text = prompt or ""
+        turns = 1
+    lowered = text.lower()
+    return PromptFeatures(
+        tokens=count_tokens(text),
+        hard_keywords=sum(keyword in lowered for keyword in HARD_KEYWORDS),
+        easy_keywords=sum(keyword in lowered for keyword in EASY_KEYWORDS),
+        has_code=bool(_CODE.search(text)),
+        turns=turns
+    )
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+class EmbeddingClassifier:
+    """Nearest-centroid difficulty classifier over a local embedding model.
+
+    Example prompts of each class are embedded once; a prompt's difficulty
+    is how much closer it is to the hard centroid than to the easy one,
+    mapped to 0-1.
+    """
+
+    def __init__(self, embedder: BaseLLM, easy_examples: List[str], hard_examples: List[str]):
+        """Initialize embedding classifier.
+
+        Args:
+            embedder: Model providing embeddings (e.g. a local Ollama model)
+            easy_examples: Prompts a small model answers well
+            hard_examples: Prompts that need a large model
+        """
+        if not easy_examples or not hard_examples:
+            raise ValueError("Both easy and hard examples are required")
+        self.embedder = embedder
+        self.easy_examples = easy_examples
+        self.hard_examples = hard_examples
+        self._centroids: Optional[Tuple[List[float], List[float]]] = None
+
+    async def _centroid(self, texts: List[str]) -> List[float]:
+        vectors = await self.embedder.embeddings(texts)
+        return [sum(values) / len(vectors) for values in zip(*vectors)]
+
+    async def difficulty(self, text: str) -> float:
+        """Difficulty of a prompt between 0 (easy) and 1 (hard)."""
+        if self._centroids is None:
+            self._centroids = (
+                await self._centroid(self.easy_examples),
+                await self._centroid(self.hard_examples)
+            )
+        easy, hard = self._centroids
+        vector = await self.embedder.embeddings(text)
+        return min(max((_cosine(vector, hard) - _cosine(vector, easy) + 1) / 2, 0.0), 1.0)
+
+class ContentAwareStrategy(RoutingStrategy):
+    """Routes easy prompts to a small model tier and hard ones to a large tier.
+
+    A prompt's difficulty (0-1) is a logistic score of its token count,
+    task keywords, code and conversation length, optionally blended with
+    an embedding classifier. Prompts scoring below ``threshold`` go to the
+    small tier. Within a tier, ``tier_strategy`` picks the model; if a tier
+    has no available model the other tier is used.
+
+    The threshold is learnable: the router reports how small-tier requests
+    went (``observe`` calls ``record_outcome``; a request the small model
+    did not answer, e.g. because it was retried or hedged elsewhere, counts
+    as a failure). Call ``fit`` (or set ``refit_every``) to raise
+    the threshold as far as the small tier keeps its failure rate under
+    ``max_small_failure_rate``. Since only prompts below the threshold
+    reach the small tier, set ``explore`` to also send a small fraction of
+    harder prompts there, so the threshold can rise as well as fall.
+    """
+
+    request_keys = ("prompt", "messages")
+
+    def __init__(
+        self,
+        small_models: Sequence[str],
+        large_models: Sequence[str],
+        threshold: float = 0.5,
+        classifier: Optional[EmbeddingClassifier] = None,
+        classifier_weight: float = 0.5,
+        tier_strategy: Optional[RoutingStrategy] = None,
+        max_small_failure_rate: float = 0.05,
+        history: int = 1000,
+        refit_every: int = 0,
+        explore: float = 0.0
+    ):
+        """Initialize content-aware strategy.
+
+        Args:
+            small_models: Names of cheap or local models for easy prompts
+            large_models: Names of models for hard prompts
+            threshold: Difficulty below which prompts go to the small tier
+            classifier: Optional embedding classifier blended into the score
+            classifier_weight: Weight (0-1) of the classifier in the score
+            tier_strategy: Strategy choosing within a tier (latency-aware by default)
+            max_small_failure_rate: Target failure rate of the small tier for ``fit``
+            history: Number of logged small-tier outcomes kept for ``fit``
+            refit_every: Refit the threshold after this many outcomes (0 disables)
+            explore: Fraction of prompts above the threshold sent to the small tier
+        """
+        self.small_models = set(small_models)
+        self.large_models = set(large_models)
+        self.threshold = threshold
+        self.classifier = classifier
+        self.classifier_weight = classifier_weight
+        self.tier_strategy = tier_strategy or LatencyAwareStrategy()
+        self.max_small_failure_rate = max_small_failure_rate
+        self.refit_every = refit_every
+        self.explore = explore
+        self.outcomes: Deque[Tuple[float, bool]] = deque(maxlen=history)
+        self._since_fit = 0
+
+    @staticmethod
+    def score(features: PromptFeatures) -> float:
+        """Feature-based difficulty between 0 (easy) and 1 (hard)."""
+        z = (
+            -2.0
+            + 0.6 * math.log1p(features.tokens / 100)
+            + 1.2 * features.hard_keywords
+            - 0.8 * features.easy_keywords
+            + 1.0 * features.has_code
+            + 0.2 * (features.turns - 1)
+        )
+        return 1 / (1 + math.exp(-z))
+
+    async def difficulty(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None
+    ) -> float:
+        """Difficulty of a prompt or conversation between 0 and 1."""
+        difficulty = self.score(extract_features(prompt, messages))
+        if self.classifier is not None:
+            text = messages[-1].get("content", "") if messages else prompt or ""
+            learned = await self.classifier.difficulty(text)
+            weight = self.classifier_weight
+            difficulty = (1 - weight) * difficulty + weight * learned
+        return difficulty
+
+    async def select_model(
+        self,
+        models: List[BaseLLM],
+        stats: Optional[RouterStats] = None,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        **kwargs
+    ) -> Optional[BaseLLM]:
+        """Select a model from the tier matching the prompt's difficulty."""
+        decision = await self.decide(
+            models, stats=stats, prompt=prompt, messages=messages, **kwargs
+        )
+        return decision.model
+
+    async def decide(
+        self,
+        models: List[BaseLLM],
+        stats: Optional[RouterStats] = None,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        **kwargs
+    ) -> RoutingDecision:
+        """Select a model, recording the prompt's difficulty and the tier used."""
+        if not models:
+            return RoutingDecision(None)
+        if prompt is None and not messages:
+            model = await self.tier_strategy.select_model(models, stats=stats, **kwargs)
+            return RoutingDecision(model)
+
+        def name(model: BaseLLM) -> str:
+            return stats.name_of(model) if stats is not None else model.model_name
+
+        small = [model for model in models if name(model) in self.small_models]
+        large = [model for model in models if name(model) in self.large_models]
+        difficulty = await self.difficulty(prompt, messages)
+        easy = difficulty < self.threshold
+        if not easy and self.explore and random.random() < self.explore:
+            easy = True
+        tier = (small if easy else large) or large or small or models
+        model = await self.tier_strategy.select_model(tier, stats=stats, **kwargs)
+        return RoutingDecision(model, difficulty, "small" if tier is small else "large")
+
+    def observe(self, decision: RoutingDecision, success: bool) -> None:
+        """Log the outcome of a request routed to the small tier."""
+        if decision.tier == "small" and decision.difficulty is not None:
+            self.record_outcome(decision.difficulty, success)
+
+    def record_outcome(self, difficulty: float, success: bool) -> None:
+        """Log whether a small-tier request with this difficulty succeeded.
+
+        Count a response that had to be escalated or was rejected by a
+        quality check as a failure.
+        """
+        self.outcomes.append((difficulty, success))
+        self._since_fit += 1
+        if self.refit_every and self._since_fit >= self.refit_every:
+            self.fit()
+
+    def fit(self) -> float:
+        """Learn the threshold from logged small-tier outcomes.
+
+        The threshold becomes the highest logged difficulty at which the
+        small tier's failure rate over all easier prompts stays within
+        ``max_small_failure_rate``. Returns the new threshold.
+        """
+        self._since_fit = 0
+        if not self.outcomes:
+            return self.threshold
+        failures = 0
+        best = None
+        ranked = sorted(self.outcomes)
+        for count, (difficulty, success) in enumerate(ranked, start=1):
+            failures += not success
+            last_of_value = count == len(ranked) or ranked[count][0] != difficulty
+            if last_of_value and failures / count <= self.max_small_failure_rate:
+                best = difficulty
+        if best is None:
+            # Even the easiest logged prompts fail too often: route less to the small tier
+            best = ranked[0][0]
+        # Prompts at the learned difficulty still qualify for the small tier
+        self.threshold = best + THRESHOLD_MARGIN
+        return self.threshold
@@ -0,0 +1,457 @@
+"""
+Routing engine behind the model routers, with a compiled routing table.
+"""
+
+import asyncio
+import time
+from typing import (
+    Any, AsyncGenerator, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+)
+from ..models.base import BaseLLM
+from ..core.circuit_breaker import CircuitBreakerRegistry, circuit_breakers
+from .strategy import ROUTING_ARGS, RoutingDecision, RoutingStrategy
+from .fallback import FallbackHandler
+from .stats import RouterStats
+from .hedging import HedgingPolicy
+
+class RoutingEngine:
+    """Resolves requests to models and runs them with stats, breakers and retries.
+
+    Routes are kept in a table compiled from the registered models, their
+    aliases, the fallback chain, the strategy and the models' health:
+
+    * explicit names and aliases resolve with one dict lookup;
+    * requests without a name reuse the strategy's cached decision, unless
+      they carry arguments the strategy ranks on (``request_keys``);
+    * hedge targets are precomputed per model.
+
+    The table is recompiled when models, the chain or the strategy change,
+    when a model is ejected, probed, restored or measured for the first
+    time, when a circuit breaker changes state, when an ejection or open
+    circuit is due to expire, and at most ``refresh_interval`` seconds
+    after the last compilation so the cached decision follows live latency.
+
+    Every request routed through the engine feeds its latency, time to
+    first token (for streams) and outcome into ``stats`` and the model's
+    circuit breaker. Retryable errors are retried along the fallback chain,
+    and with a hedging policy slow requests are duplicated to the next
+    model in the chain.
+    """
+
+    def __init__(
+        self,
+        strategy: Optional[RoutingStrategy] = None,
+        stats: Optional[RouterStats] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        fallback: Optional[FallbackHandler] = None,
+        refresh_interval: float = 1.0
+    ):
+        """Initialize routing engine.
+
+        Args:
+            strategy: Strategy choosing among available models (None picks
+                the first available model in the fallback chain)
+            stats: Live per-model stats (default: new stats)
+            hedging: Hedging policy (None disables hedging)
+            breakers: Circuit breakers (default: the global registry)
+            fallback: Retry and fallback handler (default: new handler)
+            refresh_interval: Maximum age in seconds of a cached decision
+        """
+        self.models: Dict[str, BaseLLM] = {}
+        self.aliases: Dict[Hashable, str] = {}
+        self.routes: Dict[Hashable, BaseLLM] = {}
+        self.fallback = fallback or FallbackHandler()
+        self.stats = stats or RouterStats()
+        self.hedging = hedging
+        self.breakers = breakers if breakers is not None else circuit_breakers
+        self.refresh_interval = refresh_interval
+        self.compilations = 0
+        self._default: Optional[BaseLLM] = None
+        self._hedge_targets: Dict[str, Optional[BaseLLM]] = {}
+        self._expires_at = 0.0
+        self._stats_version = -1
+        self._breakers_version = -1
+        self.set_strategy(strategy)
+
+    def register_model(self, name: str, model: BaseLLM, aliases: Iterable[Hashable] = ()) -> None:
+        """Register (or replace) a model under a name and optional alias keys."""
+        self.models[name] = model
+        self.stats.register(name, model)
+        self.routes[name] = model
+        for alias in aliases:
+            self.aliases[alias] = name
+        # Earlier aliases follow a replaced model
+        for alias, target in self.aliases.items():
+            if target == name:
+                self.routes[alias] = model
+        self.invalidate()
+
+    def set_strategy(self, strategy: Optional[RoutingStrategy]) -> None:
+        """Set the routing strategy."""
+        self.strategy = strategy
+        self._request_keys = strategy.request_keys if strategy is not None else ()
+        self.invalidate()
+
+    def set_fallback_chain(self, model_names: List[str]) -> None:
+        """Set the fallback chain for model selection."""
+        self.fallback.set_chain(model_names)
+        self.invalidate()
+
+    def set_hedging(self, policy: Optional[HedgingPolicy]) -> None:
+        """Set the hedging policy (None disables hedging)."""
+        self.hedging = policy
+
+    def invalidate(self) -> None:
+        """Recompile the routing table on the next request."""
+        self._expires_at = 0.0
+
+    def is_available(self, name: str) -> bool:
+        """Whether a model is neither ejected nor behind an open circuit."""
+        return self.stats.is_available(name) and self.breakers.get(name).available
+
+    def _stale(self) -> bool:
+        return (
+            self.stats.health_version != self._stats_version
+            or self.breakers.version != self._breakers_version
+            or time.monotonic() >= self._expires_at
+        )
+
+    async def _decide(self, **kwargs) -> RoutingDecision:
+        """Run the strategy over the available models, falling back to the chain."""
+        available = {
+            name: model for name, model in self.models.items()
+            if self.is_available(name)
+        }
+        if self.strategy is not None:
+            decision = await self.strategy.decide(
+                list(available.values()) or self.stats.available(list(self.models.values())),
+                stats=self.stats,
+                **kwargs
+            )
+            if decision.model:
+                return decision
+        for candidates in (available, self.models):
+            for name in self.fallback.fallback_chain:
+                if name in candidates:
+                    return RoutingDecision(candidates[name])
+        return RoutingDecision(None)
+
+    async def compile(self) -> None:
+        """Rebuild the cached decision, hedge targets and expiry from current state."""
+        # Read versions first: changes made while compiling trigger another pass
+        self._stats_version = self.stats.health_version
+        self._breakers_version = self.breakers.version
+        now = time.monotonic()
+        expires_at = now + self.refresh_interval
+
+        hedge_targets = {}
+        for name in self.models:
+            hedge_targets[name] = next(
+                (
+                    self.models[backup] for backup in self.fallback.fallback_chain
+                    if backup != name and backup in self.models and self.is_available(backup)
+                ),
+                None
+            )
+            # Ejections and open circuits expire with time, not on an event
+            model_stats = self.stats.get(name)
+            if model_stats.ejected and model_stats.ejected_until > now:
+                expires_at = min(expires_at, model_stats.ejected_until)
+            retry_after = self.breakers.get(name).retry_after
+            if retry_after > 0:
+                expires_at = min(expires_at, now + retry_after)
+
+        self._default = (await self._decide()).model
+        self._hedge_targets = hedge_targets
+        self._expires_at = expires_at
+        self.compilations += 1
+
+    async def resolve(self, model_name: Optional[Hashable] = None, **kwargs) -> BaseLLM:
+        """Get the model for a request.
+
+        Args:
+            model_name: Registered name or alias (None to let the strategy choose)
+            **kwargs: Request arguments, including ``prompt`` or ``messages``,
+                passed to the strategy when it ranks on them
+
+        Raises:
+            ValueError: If no model can be selected
+        """
+        if model_name is not None:
+            model = self.routes.get(model_name)
+            if model is not None:
+                return model
+        elif self._per_request(kwargs):
+            return (await self._decide_request(**kwargs)).model
+
+        if self._stale():
+            await self.compile()
+        if self._default is None:
+            raise ValueError("No available models in the fallback chain")
+        return self._default
+
+    def _per_request(self, kwargs: Dict[str, Any]) -> bool:
+        """Whether a request carries arguments the strategy ranks on."""
+        return bool(self._request_keys) and any(
+            kwargs.get(key) is not None for key in self._request_keys
+        )
+
+    async def _decide_request(self, **kwargs) -> RoutingDecision:
+        decision = await self._decide(**kwargs)
+        if decision.model is None:
+            raise ValueError("No available models in the fallback chain")
+        return decision
+
+    async def _route(
+        self,
+        model_name: Optional[Hashable],
+        **kwargs
+    ) -> Tuple[BaseLLM, Optional[RoutingDecision]]:
+        """Resolve a request, with the strategy's decision if it was made for this request."""
+        if model_name is None and self._per_request(kwargs):
+            decision = await self._decide_request(**kwargs)
+            return decision.model, decision
+        return await self.resolve(model_name, **kwargs), None
+
+    async def _observed(
+        self,
+        model: BaseLLM,
+        decision: Optional[RoutingDecision],
+        call: Callable[[BaseLLM], Awaitable[Any]],
+        hedge: bool
+    ) -> Any:
+        """Execute a request and report to the strategy whether its chosen model answered."""
+        if decision is None:
+            return await self.execute(model, call, hedge)
+
+        answered = []
+
+        async def tracked(target: BaseLLM) -> Any:
+            result = await call(target)
+            answered.append(target)
+            return result
+
+        try:
+            result = await self.execute(model, tracked, hedge)
+        except Exception:
+            self.strategy.observe(decision, False)
+            raise
+        # Answers from fallbacks or hedges mean the chosen model fell short
+        self.strategy.observe(decision, any(target is model for target in answered))
+        return result
+
+    async def _observed_stream(
+        self,
+        decision: Optional[RoutingDecision],
+        stream: AsyncGenerator[str, None]
+    ) -> AsyncGenerator[str, None]:
+        """Relay a stream and report to the strategy whether it completed."""
+        if decision is None:
+            async for chunk in stream:
+                yield chunk
+            return
+        try:
+            async for chunk in stream:
+                yield chunk
+        except Exception:
+            self.strategy.observe(decision, False)
+            raise
+        self.strategy.observe(decision, True)
+
+    def _model_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Request arguments for the model, without those only used for routing."""
+        return {
+            key: value for key, value in kwargs.items()
+            if key not in ROUTING_ARGS and key not in self._request_keys
+        }
+
+    async def _measured(self, model: BaseLLM, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a request through the model's circuit breaker, recording its outcome."""
+        name = self.stats.name_of(model)
+        breaker = self.breakers.get(name)
+        breaker.acquire()
+        self.stats.begin(name)
+        start = time.perf_counter()
+        try:
+            result = await call()
+        except Exception as e:
+            latency = time.perf_counter() - start
+            self.stats.record_failure(name, latency)
+            breaker.record_failure(e, latency)
+            raise
+        except asyncio.CancelledError:
+            self.stats.abandon(name)
+            breaker.release()
+            raise
+        latency = time.perf_counter() - start
+        self.stats.record_success(name, latency)
+        breaker.record_success(latency)
+        return result
+
+    async def _hedge_target(self, primary: BaseLLM) -> Optional[BaseLLM]:
+        """First available model in the fallback chain other than the primary."""
+        if self._stale():
+            await self.compile()
+        return self._hedge_targets.get(self.stats.name_of(primary))
+
+    async def _hedged(self, primary: BaseLLM, call: Callable[[BaseLLM], Awaitable[Any]]) -> Any:
+        """Run a request on the primary, hedging to a backup after its tail latency."""
+        policy = self.hedging
+        policy.record_request()
+        delay = policy.delay(self.stats.get(primary))
+        backup = await self._hedge_target(primary) if delay is not None else None
+        if backup is None:
+            return await self._measured(primary, lambda: call(primary))
+
+        first = asyncio.ensure_future(self._measured(primary, lambda: call(primary)))
+        tasks = {first: primary}
+        try:
+            done, _ = await asyncio.wait({first}, timeout=delay)
+            if done or not policy.try_hedge():
+                return await first
+
+            second = asyncio.ensure_future(self._measured(backup, lambda: call(backup)))
+            tasks[second] = backup
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in (t for t in (first, second) if t in done):
+                    if task.exception() is None:
+                        if task is second:
+                            policy.stats.hedge_wins += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _dispatch(
+        self,
+        model: BaseLLM,
+        call: Callable[[BaseLLM], Awaitable[Any]],
+        hedge: bool = True
+    ) -> Any:
+        """Run a request on a model, hedged if a hedging policy is set."""
+        if self.hedging is not None and hedge:
+            return await self._hedged(model, call)
+        return await self._measured(model, lambda: call(model))
+
+    async def execute(
+        self,
+        model: BaseLLM,
+        call: Callable[[BaseLLM], Awaitable[Any]],
+        hedge: bool = True
+    ) -> Any:
+        """Run a request, retrying retryable errors along the fallback chain."""
+        return await self.fallback.execute(
+            model,
+            self.models,
+            lambda m: self._dispatch(m, call, hedge),
+            is_available=self.is_available
+        )
+
+    async def _measured_stream(
+        self,
+        model: BaseLLM,
+        stream: AsyncGenerator[str, None]
+    ) -> AsyncGenerator[str, None]:
+        """Relay a stream, recording time to first token, latency and outcome."""
+        name = self.stats.name_of(model)
+        breaker = self.breakers.get(name)
+        breaker.acquire()
+        self.stats.begin(name)
+        start = time.perf_counter()
+        ttft = None
+        finished = False
+        try:
+            async for chunk in stream:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                yield chunk
+            finished = True
+        except Exception as e:
+            latency = time.perf_counter() - start
+            self.stats.record_failure(name, latency)
+            breaker.record_failure(e, latency)
+            finished = True
+            raise
+        finally:
+            if not finished:
+                # Consumer stopped early or was cancelled: no outcome to record
+                self.stats.abandon(name)
+                breaker.release()
+        # Streams are judged slow by their time to first token
+        self.stats.record_success(name, time.perf_counter() - start, ttft)
+        breaker.record_success(ttft if ttft is not None else time.perf_counter() - start)
+
+    async def generate(
+        self,
+        prompt: str,
+        model_name: Optional[Hashable] = None,
+        hedge: bool = True,
+        **kwargs
+    ) -> str:
+        """Generate text using the routed model."""
+        model, decision = await self._route(model_name, prompt=prompt, **kwargs)
+        params = self._model_kwargs(kwargs)
+        return await self._observed(
+            model, decision, lambda target: target.generate(prompt, **params), hedge
+        )
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model_name: Optional[Hashable] = None,
+        hedge: bool = True,
+        **kwargs
+    ) -> str:
+        """Generate a chat completion using the routed model."""
+        model, decision = await self._route(model_name, messages=messages, **kwargs)
+        params = self._model_kwargs(kwargs)
+        return await self._observed(
+            model, decision, lambda target: target.chat(messages, **params), hedge
+        )
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        model_name: Optional[Hashable] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Generate a text stream using the routed model."""
+        model, decision = await self._route(model_name, prompt=prompt, **kwargs)
+        params = self._model_kwargs(kwargs)
+        stream = self._measured_stream(model, model.generate_stream(prompt, **params))
+        async for chunk in self._observed_stream(decision, stream):
+            yield chunk
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model_name: Optional[Hashable] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Generate a chat completion stream using the routed model."""
+        model, decision = await self._route(model_name, messages=messages, **kwargs)
+        params = self._model_kwargs(kwargs)
+        stream = self._measured_stream(model, model.chat_stream(messages, **params))
+        async for chunk in self._observed_stream(decision, stream):
+            yield chunk
+
+    async def embeddings(
+        self,
+        text: Union[str, List[str]],
+        model_name: Optional[Hashable] = None,
+        **kwargs
+    ) -> Union[List[float], List[List[float]]]:
+        """Generate embeddings using the routed model.
+
+        Embedding calls are not recorded in the stats, so they don't skew
+        the latency of completions.
+        """
+        model = await self.resolve(model_name)
+        return await model.embeddings(text, **kwargs)
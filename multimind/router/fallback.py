@@ -2,22 +2,214 @@
 Fallback handler for managing model fallbacks and retries.
 """
 
-from typing import List, Dict, Any, Optional, Type
+import asyncio
+import email.utils
+import logging
+import random
+import time
+from typing import List, Dict, Optional, Callable, Awaitable, TypeVar
 from ..models.base import BaseLLM
+from ..core.circuit_breaker import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP status codes worth retrying, by error category
+RETRYABLE_STATUS = {
+    408: "timeout",
+    429: "rate_limit",
+    500: "server_error",
+    502: "unavailable",
+    503: "unavailable",
+    504: "timeout",
+    529: "unavailable"  # Anthropic "overloaded"
+}
+
+# Exception class names (anywhere in the MRO) of provider SDK and HTTP client
+# errors that are retryable without a status code, e.g. openai.APITimeoutError
+RETRYABLE_NAMES = {
+    "rate_limit": ("RateLimitError", "RateLimitExceeded"),
+    "timeout": ("Timeout", "TimeoutError"),
+    "connection": (
+        "ConnectionError", "APIConnectionError", "ClientConnectionError", "ConnectError"
+    ),
+    "unavailable": ("ServiceUnavailableError", "OverloadedError"),
+    "server_error": ("InternalServerError",)
+}
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of an SDK or HTTP client error, if it carries one."""
+    for attr in ("status_code", "status", "http_status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None) or getattr(response, "status", None)
+    return value if isinstance(value, int) else None
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """Classify an error as retryable.
+
+    Returns:
+        The error category ("rate_limit", "timeout", "connection",
+        "unavailable" or "server_error"), or None if retrying
+        cannot help (e.g. invalid requests or authentication errors)
+    """
+    status = _status_code(error)
+    if status is not None:
+        return RETRYABLE_STATUS.get(status)
+
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return "timeout"
+    if isinstance(error, ConnectionError):
+        return "connection"
+
+    names = [cls.__name__ for cls in type(error).__mro__]
+    for category, patterns in RETRYABLE_NAMES.items():
+        if any(pattern in name for name in names for pattern in patterns):
+            return category
+    return None
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked to wait before retrying, if any.
+
+    Reads a ``retry_after`` attribute or the ``retry-after-ms`` /
+    ``Retry-After`` response headers (in seconds or as an HTTP date).
+    """
+    value = getattr(error, "retry_after", None)
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    headers = getattr(error, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    try:
+        milliseconds = headers.get("retry-after-ms")
+        if milliseconds is not None:
+            return float(milliseconds) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            parsed = email.utils.parsedate_to_datetime(value)
+            return max(parsed.timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, honoring Retry-After."""
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        multiplier: float = 2.0,
+        max_retry_after: float = 60.0
+    ):
+        """Initialize retry policy.
+
+        Args:
+            max_attempts: Maximum attempts per request, including the first
+            base_delay: Backoff ceiling of the first retry in seconds
+            max_delay: Upper bound on the backoff ceiling
+            multiplier: Growth factor of the backoff ceiling per attempt
+            max_retry_after: Give up rather than wait longer than this for
+                a provider's Retry-After
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt: int) -> float:
+        """Random delay before retry number ``attempt`` (1 for the first retry)."""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def delay(self, attempt: int, error: BaseException) -> Optional[float]:
+        """Delay before retrying the same model, or None to give up."""
+        requested = retry_after(error)
+        if requested is not None:
+            if requested > self.max_retry_after:
+                return None
+            return max(requested, self.backoff(attempt))
+        return self.backoff(attempt)
+
+class RetryBudget:
+    """Caps retries at a fraction of requests so they cannot amplify overload.
+
+    Each request deposits ``ratio`` of a retry, and ``min_per_second``
+    retries are added over time so low-traffic clients can still retry.
+    At most ``max_tokens`` retries are saved up.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        """Initialize retry budget.
+
+        Args:
+            ratio: Retries allowed per request
+            min_per_second: Retries allowed per second regardless of traffic
+            max_tokens: Maximum retries that can be saved up
+        """
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.updated = time.monotonic()
+        self.exhausted = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self.updated) * self.min_per_second)
+        self.updated = now
+
+    def record_request(self) -> None:
+        """Deposit a request's share of retries."""
+        self._refill()
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget if available."""
+        self._refill()
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1
+        return True
 
 class FallbackHandler:
-    """Handles model fallbacks and retries."""
+    """Handles model fallbacks and retries.
 
-    def __init__(self, max_retries: int = 3):
+    Retry state is kept per request: ``execute`` calls the selected model
+    and, on a retryable error, moves on to the next available model in the
+    fallback chain without waiting. Once the chain is exhausted it retries
+    the last model after an exponential, jittered backoff (or the
+    provider's Retry-After). All retries draw from a shared budget.
+    Models whose circuit is open are skipped without waiting.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        policy: Optional[RetryPolicy] = None,
+        budget: Optional[RetryBudget] = None
+    ):
         self.fallback_chain: List[str] = []
-        self.max_retries = max_retries
-        self.retry_count = 0
-        self.retryable_errors = {
-            "rate_limit_exceeded",
-            "timeout",
-            "service_unavailable",
-            "internal_server_error"
-        }
+        self.policy = policy or RetryPolicy(max_attempts=max_retries + 1)
+        self.budget = budget or RetryBudget()
+
+    @property
+    def max_retries(self) -> int:
+        """Maximum retries per request."""
+        return self.policy.max_attempts - 1
 
     def set_chain(self, model_names: List[str]) -> None:
         """Set the fallback chain for model selection."""
@@ -31,17 +223,81 @@ class FallbackHandler:
         raise ValueError("No available models in the fallback chain")
 
     async def should_retry(self, error: Exception) -> bool:
-        """Determine if a request should be retried."""
-        if self.retry_count >= self.max_retries:
-            return False
+        """Determine if an error is retryable."""
+        return classify_error(error) is not None
+
+    def next_model(
+        self,
+        current: str,
+        models: Dict[str, BaseLLM],
+        tried: List[str],
+        is_available: Optional[Callable[[str], bool]] = None
+    ) -> Optional[str]:
+        """Next untried, available model after ``current`` in the fallback chain."""
+        chain = self.fallback_chain
+        start = chain.index(current) + 1 if current in chain else 0
+        for name in chain[start:] + chain[:start]:
+            if name in tried or name not in models:
+                continue
+            if is_available is not None and not is_available(name):
+                continue
+            return name
+        return None
+
+    async def execute(
+        self,
+        model: BaseLLM,
+        models: Dict[str, BaseLLM],
+        call: Callable[[BaseLLM], Awaitable[T]],
+        is_available: Optional[Callable[[str], bool]] = None
+    ) -> T:
+        """Call a model, retrying retryable errors along the fallback chain.
+
+        Args:
+            model: Model selected for the request
+            models: Registered models by name
+            call: Request to run against a model
+            is_available: Whether a model name may be used (e.g. not ejected)
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            The last error once it is not retryable, the attempts or the
+            retry budget are used up, or Retry-After asks for too long a wait
+        """
+        names = {id(m): name for name, m in models.items()}
+        current = names.get(id(model), model.model_name)
+        tried = [current]
+        self.budget.record_request()
 
-        error_type = type(error).__name__.lower()
-        if error_type in self.retryable_errors:
-            self.retry_count += 1
-            return True
+        attempt = 0
+        while True:
+            try:
+                return await call(model)
+            except Exception as e:
+                category = classify_error(e)
+                attempt += 1
+                if category is None or attempt >= self.policy.max_attempts:
+                    raise
+                # Open circuits reject without calling upstream, so they cost no budget
+                circuit_open = isinstance(e, CircuitOpenError)
+                if not circuit_open and not self.budget.try_spend():
+                    logger.warning(f"Retry budget exhausted; not retrying {current}: {e}")
+                    raise
 
-        return False
+                following = self.next_model(current, models, tried, is_available)
+                if following is not None:
+                    logger.info(f"{current} failed ({category}); falling back to {following}")
+                    current = following
+                    tried.append(current)
+                    model = models[current]
+                    continue
 
-    def reset(self) -> None:
-        """Reset the retry counter."""
-        self.retry_count = 0
\ No newline at end of file
+                if circuit_open:
+                    raise
+                delay = self.policy.delay(attempt, e)
+                if delay is None:
+                    raise
+                logger.info(f"{current} failed ({category}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
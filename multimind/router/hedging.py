@@ -0,0 +1,82 @@
+"""
+Hedged requests for tail-latency reduction.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional
+from .stats import ModelStats
+
+@dataclass
+class HedgingStats:
+    """Counters of hedged requests."""
+    requests: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    budget_exhausted: int = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        """Fraction of requests that sent a hedge."""
+        return self.hedges / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Get the counters and hedge rate as a dict."""
+        return {**asdict(self), "hedge_rate": self.hedge_rate}
+
+class HedgingPolicy:
+    """When to send a duplicate request to a backup model.
+
+    A hedge is sent once the primary has not answered within its measured
+    ``percentile`` latency, so only the slowest requests are duplicated.
+    Hedges are paid for from a budget that grows by ``budget`` per request
+    (at most ``max_burst`` saved up), which caps extra load at that fraction
+    of traffic even when a primary slows down across the board. Models with
+    fewer than ``min_samples`` measurements are not hedged.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        budget: float = 0.05,
+        min_samples: int = 20,
+        min_delay: float = 0.0,
+        max_burst: float = 10.0
+    ):
+        """Initialize hedging policy.
+
+        Args:
+            percentile: Latency quantile of the primary after which to hedge
+            budget: Maximum hedges as a fraction of requests
+            min_samples: Successful requests needed before a model is hedged
+            min_delay: Lower bound on the hedge delay in seconds
+            max_burst: Maximum number of hedges that can be saved up
+        """
+        if not 0 <= budget <= 1:
+            raise ValueError("budget must be between 0 and 1")
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_burst = max_burst
+        self.stats = HedgingStats()
+        self._tokens = 0.0
+
+    def delay(self, stats: ModelStats) -> Optional[float]:
+        """Seconds to wait for the primary before hedging, or None to not hedge."""
+        if stats.latency.count < self.min_samples:
+            return None
+        return max(stats.percentile(self.percentile), self.min_delay)
+
+    def record_request(self) -> None:
+        """Count a request, adding its share to the hedge budget."""
+        self.stats.requests += 1
+        self._tokens = min(self.max_burst, self._tokens + self.budget)
+
+    def try_hedge(self) -> bool:
+        """Take one hedge from the budget if available."""
+        if self._tokens < 1:
+            self.stats.budget_exhausted += 1
+            return False
+        self._tokens -= 1
+        self.stats.hedges += 1
+        return True
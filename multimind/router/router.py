@@ -2,78 +2,174 @@
 Main router interface for model selection and request routing.
 """
 
-from typing import List, Dict, Any, Optional, Type
+from typing import List, Dict, Optional, AsyncGenerator, Union
 from ..models.base import BaseLLM
-from .strategy import RoutingStrategy
+from ..models.pool import Endpoint, EndpointPool
+from ..core.circuit_breaker import CircuitBreakerRegistry
+from .strategy import RoutingStrategy, LatencyAwareStrategy
 from .fallback import FallbackHandler
+from .stats import RouterStats
+from .hedging import HedgingPolicy
+from .engine import RoutingEngine
 
 class ModelRouter:
-    """Routes requests to appropriate models with strategy and fallback support."""
+    """Routes requests to appropriate models with strategy and fallback support.
 
-    def __init__(self, strategy: Optional[RoutingStrategy] = None):
-        self.models: Dict[str, BaseLLM] = {}
-        self.strategy = strategy or RoutingStrategy()
-        self.fallback = FallbackHandler()
+    Every request routed through the router feeds its latency, time to first
+    token (for streams) and outcome into ``stats``. Strategies rank models on
+    these live measurements, and models that keep failing are ejected from
+    routing until a probe request succeeds.
+
+    Calls are guarded by per-model circuit breakers, shared with the gateway
+    by default: a model whose circuit is open fails fast and the request
+    moves on along the fallback chain.
+
+    With a hedging policy, a request the primary has not answered within its
+    measured tail latency is duplicated to the next model in the fallback
+    chain; the first answer wins and the other request is cancelled.
+
+    The router is a facade over a RoutingEngine, which resolves requests
+    from a compiled routing table; the strategy's decision is cached for up
+    to ``refresh_interval`` seconds or until a model's health changes.
+    """
+
+    def __init__(
+        self,
+        strategy: Optional[RoutingStrategy] = None,
+        stats: Optional[RouterStats] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        refresh_interval: float = 1.0
+    ):
+        self.engine = RoutingEngine(
+            strategy or LatencyAwareStrategy(),
+            stats=stats,
+            hedging=hedging,
+            breakers=breakers,
+            refresh_interval=refresh_interval
+        )
+
+    @property
+    def models(self) -> Dict[str, BaseLLM]:
+        """Registered models by name."""
+        return self.engine.models
+
+    @property
+    def strategy(self) -> Optional[RoutingStrategy]:
+        """Current routing strategy."""
+        return self.engine.strategy
+
+    @property
+    def fallback(self) -> FallbackHandler:
+        """Retry and fallback handler."""
+        return self.engine.fallback
+
+    @property
+    def stats(self) -> RouterStats:
+        """Live per-model stats."""
+        return self.engine.stats
+
+    @property
+    def hedging(self) -> Optional[HedgingPolicy]:
+        """Current hedging policy."""
+        return self.engine.hedging
+
+    @property
+    def breakers(self) -> CircuitBreakerRegistry:
+        """Per-model circuit breakers."""
+        return self.engine.breakers
 
     def register_model(self, name: str, model: BaseLLM) -> None:
         """Register a model with the router."""
-        self.models[name] = model
+        self.engine.register_model(name, model)
+
+    def register_pool(
+        self,
+        name: str,
+        endpoints: List[Union[BaseLLM, Endpoint]],
+        balancing: str = "least_outstanding"
+    ) -> EndpointPool:
+        """Register several endpoints of one model as a single load-balanced model.
+
+        The router keeps stats, breakers and fallbacks per pool; the pool
+        spreads requests over its endpoints.
+        """
+        pool = EndpointPool(endpoints, balancing=balancing)
+        self.register_model(name, pool)
+        return pool
 
     def set_strategy(self, strategy: RoutingStrategy) -> None:
         """Set the routing strategy."""
-        self.strategy = strategy
+        self.engine.set_strategy(strategy)
 
     def set_fallback_chain(self, model_names: List[str]) -> None:
         """Set the fallback chain for model selection."""
-        self.fallback.set_chain(model_names)
+        self.engine.set_fallback_chain(model_names)
+
+    def set_hedging(self, policy: Optional[HedgingPolicy]) -> None:
+        """Set the hedging policy (None disables hedging)."""
+        self.engine.set_hedging(policy)
 
     async def get_model(
         self,
         model_name: Optional[str] = None,
         **kwargs
     ) -> BaseLLM:
-        """Get a model instance based on strategy and fallback."""
-        if model_name and model_name in self.models:
-            return self.models[model_name]
-
-        # Use strategy to select model
-        selected_model = await self.strategy.select_model(
-            list(self.models.values()),
-            **kwargs
-        )
+        """Get a model instance based on strategy and fallback.
 
-        if selected_model:
-            return selected_model
+        Keyword arguments, including the request's ``prompt`` or
+        ``messages``, are passed to the strategy.
+        """
+        return await self.engine.resolve(model_name, **kwargs)
 
-        # Fall back to fallback chain
-        return await self.fallback.get_model(self.models)
+    def is_available(self, name: str) -> bool:
+        """Whether a model is neither ejected nor behind an open circuit."""
+        return self.engine.is_available(name)
 
     async def generate(
         self,
         prompt: str,
         model_name: Optional[str] = None,
+        hedge: bool = True,
         **kwargs
     ) -> str:
-        """Generate text using the appropriate model."""
-        model = await self.get_model(model_name, **kwargs)
-        try:
-            return await model.generate(prompt, **kwargs)
-        except Exception as e:
-            if await self.fallback.should_retry(e):
-                return await self.generate(prompt, **kwargs)
-            raise
+        """Generate text using the appropriate model.
+
+        Retryable errors are retried along the fallback chain. Set
+        ``hedge=False`` to opt out of the router's hedging policy.
+        """
+        return await self.engine.generate(prompt, model_name, hedge, **kwargs)
 
     async def chat(
         self,
         messages: List[Dict[str, str]],
         model_name: Optional[str] = None,
+        hedge: bool = True,
         **kwargs
     ) -> str:
-        """Generate chat completion using the appropriate model."""
-        model = await self.get_model(model_name, **kwargs)
-        try:
-            return await model.chat(messages, **kwargs)
-        except Exception as e:
-            if await self.fallback.should_retry(e):
-                return await self.chat(messages, **kwargs)
-            raise
\ No newline at end of file
+        """Generate chat completion using the appropriate model.
+
+        Retryable errors are retried along the fallback chain. Set
+        ``hedge=False`` to opt out of the router's hedging policy.
+        """
+        return await self.engine.chat(messages, model_name, hedge, **kwargs)
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        model_name: Optional[str] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Generate a text stream using the appropriate model."""
+        async for chunk in self.engine.generate_stream(prompt, model_name, **kwargs):
+            yield chunk
+
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        model_name: Optional[str] = None,
+        **kwargs
+    ) -> AsyncGenerator[str, None]:
+        """Generate a chat completion stream using the appropriate model."""
+        async for chunk in self.engine.chat_stream(messages, model_name, **kwargs):
+            yield chunk
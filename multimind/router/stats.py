@@ -0,0 +1,225 @@
+"""
+Live per-model routing statistics with outlier ejection.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Union
+from ..core.metrics import LatencyHistogram
+from ..models.base import BaseLLM
+
+class ModelStats:
+    """Latency, time-to-first-token and error measurements for one model."""
+
+    def __init__(self, ewma_alpha: float = 0.2, window: int = 100):
+        """Initialize model stats.
+
+        Args:
+            ewma_alpha: Weight of the newest sample in the moving averages
+            window: Number of recent outcomes used for the error rate
+        """
+        self.ewma_alpha = ewma_alpha
+        self.latency = LatencyHistogram()
+        self.ttft = LatencyHistogram()
+        self.ewma_latency: Optional[float] = None
+        self.ewma_ttft: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.ejections = 0
+        self.ejected_until: Optional[float] = None
+        self.probing = False
+
+    def _ewma(self, current: Optional[float], value: float) -> float:
+        if current is None:
+            return value
+        return self.ewma_alpha * value + (1 - self.ewma_alpha) * current
+
+    def record(self, success: bool, latency: float, ttft: Optional[float] = None) -> None:
+        """Record the outcome of one request."""
+        self.requests += 1
+        self.outcomes.append(success)
+        if success:
+            self.consecutive_failures = 0
+            self.latency.add(latency)
+            self.ewma_latency = self._ewma(self.ewma_latency, latency)
+        else:
+            self.errors += 1
+            self.consecutive_failures += 1
+        if ttft is not None:
+            self.ttft.add(ttft)
+            self.ewma_ttft = self._ewma(self.ewma_ttft, ttft)
+
+    @property
+    def error_rate(self) -> float:
+        """Fraction of failed requests among the recent outcomes."""
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    @property
+    def ejected(self) -> bool:
+        """Whether the model is currently ejected from routing."""
+        return self.ejected_until is not None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency at quantile ``q`` (0-1) of successful requests."""
+        return self.latency.quantile(q)
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        """Get the stats as a dict."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "ewma_latency": self.ewma_latency,
+            "ewma_ttft": self.ewma_ttft,
+            **{f"latency_{k}": v for k, v in self.latency.percentiles().items()},
+            **{f"ttft_{k}": v for k, v in self.ttft.percentiles().items()},
+            "ejected": self.ejected,
+            "ejections": self.ejections
+        }
+
+class RouterStats:
+    """Per-model live statistics used by routing strategies.
+
+    Models are ejected from routing after ``consecutive_failures`` failures
+    in a row, or when their recent error rate exceeds ``max_error_rate``
+    over at least ``min_requests`` outcomes. An ejected model is left out for
+    ``base_ejection_time`` seconds, doubling with each repeated ejection up
+    to ``max_ejection_time``. Once that time has passed a single request is
+    let through as a probe: success restores the model, failure ejects it
+    again. If every candidate is ejected, all are used rather than none.
+    """
+
+    def __init__(
+        self,
+        ewma_alpha: float = 0.2,
+        window: int = 100,
+        min_requests: int = 10,
+        max_error_rate: float = 0.5,
+        consecutive_failures: int = 5,
+        base_ejection_time: float = 30.0,
+        max_ejection_time: float = 300.0
+    ):
+        """Initialize router stats.
+
+        Args:
+            ewma_alpha: Weight of the newest sample in the moving averages
+            window: Number of recent outcomes used for the error rate
+            min_requests: Outcomes needed before the error rate can eject
+            max_error_rate: Error rate above which a model is ejected
+            consecutive_failures: Failures in a row that eject a model
+            base_ejection_time: Seconds a model stays ejected the first time
+            max_ejection_time: Upper bound on the ejection time
+        """
+        self.ewma_alpha = ewma_alpha
+        self.window = window
+        self.min_requests = min_requests
+        self.max_error_rate = max_error_rate
+        self.consecutive_failures = consecutive_failures
+        self.base_ejection_time = base_ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.models: Dict[str, ModelStats] = {}
+        self._names: Dict[int, str] = {}
+        # Bumped on every recorded outcome so strategies can cache rankings
+        self.version = 0
+        # Bumped when a model's availability changes (ejection, probe,
+        # restore) or it gets its first measurement, so routing tables
+        # compiled from these stats can be rebuilt
+        self.health_version = 0
+
+    def register(self, name: str, model: BaseLLM) -> None:
+        """Associate a model instance with the name its stats are kept under."""
+        self._names[id(model)] = name
+
+    def name_of(self, model: Union[str, BaseLLM]) -> str:
+        """Get the stats name of a model (its registered name or model_name)."""
+        if isinstance(model, str):
+            return model
+        return self._names.get(id(model), model.model_name)
+
+    def get(self, model: Union[str, BaseLLM]) -> ModelStats:
+        """Get the stats of a model, creating empty stats if needed."""
+        name = self.name_of(model)
+        stats = self.models.get(name)
+        if stats is None:
+            stats = self.models[name] = ModelStats(self.ewma_alpha, self.window)
+        return stats
+
+    def is_available(self, model: Union[str, BaseLLM], now: Optional[float] = None) -> bool:
+        """Whether a model may be routed to (not ejected, or due for a probe)."""
+        stats = self.get(model)
+        if not stats.ejected:
+            return True
+        now = time.monotonic() if now is None else now
+        return now >= stats.ejected_until and not stats.probing
+
+    def available(self, models: List[BaseLLM]) -> List[BaseLLM]:
+        """Filter out ejected models, keeping all of them if none are left."""
+        now = time.monotonic()
+        healthy = [model for model in models if self.is_available(model, now)]
+        return healthy or list(models)
+
+    def begin(self, model: Union[str, BaseLLM]) -> None:
+        """Mark the start of a request; a request to an ejected model is its probe."""
+        stats = self.get(model)
+        if stats.ejected and not stats.probing:
+            stats.probing = True
+            self.health_version += 1
+
+    def abandon(self, model: Union[str, BaseLLM]) -> None:
+        """Mark a request that ended without an outcome (e.g. cancelled)."""
+        stats = self.get(model)
+        if stats.probing:
+            stats.probing = False
+            self.health_version += 1
+
+    def record_success(
+        self,
+        model: Union[str, BaseLLM],
+        latency: float,
+        ttft: Optional[float] = None
+    ) -> None:
+        """Record a successful request, restoring an ejected model."""
+        stats = self.get(model)
+        stats.record(True, latency, ttft)
+        self.version += 1
+        if stats.requests == 1:
+            self.health_version += 1
+        if stats.ejected and stats.probing:
+            stats.ejected_until = None
+            stats.probing = False
+            stats.outcomes.clear()
+            self.health_version += 1
+
+    def record_failure(self, model: Union[str, BaseLLM], latency: float) -> None:
+        """Record a failed request, ejecting the model if it is an outlier."""
+        stats = self.get(model)
+        stats.record(False, latency)
+        self.version += 1
+        if stats.requests == 1:
+            self.health_version += 1
+        if stats.ejected:
+            if stats.probing:
+                self._eject(stats)
+            return
+        if stats.consecutive_failures >= self.consecutive_failures or (
+            len(stats.outcomes) >= self.min_requests and stats.error_rate > self.max_error_rate
+        ):
+            self._eject(stats)
+
+    def _eject(self, stats: ModelStats) -> None:
+        stats.ejections += 1
+        duration = min(
+            self.base_ejection_time * 2 ** (stats.ejections - 1),
+            self.max_ejection_time
+        )
+        stats.ejected_until = time.monotonic() + duration
+        stats.probing = False
+        self.health_version += 1
+
+    def to_dict(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Get the stats of every model as a dict."""
+        return {name: stats.to_dict() for name, stats in self.models.items()}
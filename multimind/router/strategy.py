@@ -3,11 +3,36 @@ Routing strategies for model selection based on cost and latency.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+import time
+from typing import List, Dict, Any, Hashable, Optional, Sequence, Tuple
 from ..models.base import BaseLLM
+from .stats import RouterStats
+
+# Request arguments only used for routing, never passed on to models
+ROUTING_ARGS = ("prompt_tokens", "max_completion_tokens")
+
+@dataclass
+class RoutingDecision:
+    """Model chosen for a request, with what the strategy learns from.
+
+    ``difficulty`` and ``tier`` are set by content-aware strategies.
+    """
+    model: Optional[BaseLLM]
+    difficulty: Optional[float] = None
+    tier: Optional[str] = None
 
 class RoutingStrategy(ABC):
-    """Abstract base class for routing strategies."""
+    """Abstract base class for routing strategies.
+
+    ``request_keys`` names the request arguments a strategy ranks on. When
+    a request carries none of them, the router reuses its cached decision
+    instead of calling ``select_model``. For requests that do, the router
+    calls ``decide`` and reports how the request went to ``observe``.
+    """
+
+    request_keys: Tuple[str, ...] = ()
 
     @abstractmethod
     async def select_model(
@@ -18,37 +43,225 @@ class RoutingStrategy(ABC):
         """Select a model based on the strategy."""
         pass
 
-class CostAwareStrategy(RoutingStrategy):
-    """Selects model based on cost per token."""
+    async def decide(self, models: List[BaseLLM], **kwargs) -> RoutingDecision:
+        """Select a model for a request, keeping what ``observe`` needs."""
+        return RoutingDecision(await self.select_model(models, **kwargs))
+
+    def observe(self, decision: RoutingDecision, success: bool) -> None:
+        """Learn from whether the chosen model answered the request."""
+        pass
+
+async def _expected_latency(
+    model: BaseLLM,
+    stats: Optional[RouterStats],
+    percentile: Optional[float] = None,
+    time_to_first_token: bool = False
+) -> Optional[float]:
+    """Measured latency of a model, falling back to its static estimate.
+
+    The measurement is divided by the recent success rate, giving the
+    expected time until a successful answer when failures are retried.
+    """
+    if stats is not None:
+        model_stats = stats.get(model)
+        if time_to_first_token:
+            histogram, ewma = model_stats.ttft, model_stats.ewma_ttft
+        else:
+            histogram, ewma = model_stats.latency, model_stats.ewma_latency
+        latency = histogram.quantile(percentile) if percentile is not None else ewma
+        if latency is not None:
+            return latency / max(1 - model_stats.error_rate, 0.05)
+    return await model.get_latency()
+
+class ModelProfile:
+    """Static routing inputs of a model, computed once from its async getters.
+
+    Model pricing is linear in tokens, so the cost of any request is
+    ``prompt_tokens * prompt_cost + completion_tokens * completion_cost``.
+    A profile is rebuilt when the model's ``cost_per_token`` or
+    ``avg_latency`` changes.
+    """
+
+    def __init__(
+        self,
+        prompt_cost: float,
+        completion_cost: float,
+        latency: Optional[float],
+        signature: Tuple[Any, Any]
+    ):
+        self.prompt_cost = prompt_cost
+        self.completion_cost = completion_cost
+        self.latency = latency
+        self.signature = signature
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        """Cost of a request with the given token counts."""
+        return prompt_tokens * self.prompt_cost + completion_tokens * self.completion_cost
+
+def _signature(model: BaseLLM) -> Tuple[Any, Any]:
+    return (getattr(model, "cost_per_token", None), getattr(model, "avg_latency", None))
+
+def _measured_latency(
+    profile: ModelProfile,
+    model: BaseLLM,
+    stats: Optional[RouterStats]
+) -> Optional[float]:
+    """Error-adjusted moving-average latency, falling back to the static estimate."""
+    if stats is not None:
+        model_stats = stats.get(model)
+        if model_stats.ewma_latency is not None:
+            return model_stats.ewma_latency / max(1 - model_stats.error_rate, 0.05)
+    return profile.latency
+
+class ScoredStrategy(RoutingStrategy):
+    """Base for strategies that rank models on precomputed scores.
+
+    Per-model cost coefficients and static latency are awaited once and
+    kept in a ``ModelProfile``. The chosen model is memoized per candidate
+    set, request shape and stats version, so a request only re-ranks when
+    the candidates, token counts or measurements have changed, and never
+    awaits model getters once the profiles are known.
+    """
+
+    request_keys = ROUTING_ARGS
+
+    def __init__(
+        self,
+        cache_size: int = 256,
+        nominal_prompt_tokens: int = 1000,
+        nominal_completion_tokens: int = 500
+    ):
+        """Initialize scored strategy.
+
+        Args:
+            cache_size: Maximum number of memoized selections
+            nominal_prompt_tokens: Prompt tokens assumed for requests that
+                don't give ``prompt_tokens``
+            nominal_completion_tokens: Completion tokens assumed for requests
+                that don't give ``max_completion_tokens``
+        """
+        self.cache_size = cache_size
+        self.nominal_prompt_tokens = nominal_prompt_tokens
+        self.nominal_completion_tokens = nominal_completion_tokens
+        self._profiles: Dict[int, ModelProfile] = {}
+        self._selections: "OrderedDict[Hashable, int]" = OrderedDict()
+
+    async def profile(self, model: BaseLLM) -> ModelProfile:
+        """Get the profile of a model, computing it on first use or after a change."""
+        signature = _signature(model)
+        profile = self._profiles.get(id(model))
+        if profile is None or profile.signature != signature:
+            prompt_cost = await model.get_cost(1, 0)
+            completion_cost = await model.get_cost(0, 1)
+            latency = await model.get_latency()
+            profile = self._profiles[id(model)] = ModelProfile(
+                prompt_cost, completion_cost, latency, signature
+            )
+            # Cached selections may have been ranked on the old profile
+            self._selections.clear()
+        return profile
+
+    async def _ensure_profiles(self, models: Sequence[BaseLLM]) -> List[ModelProfile]:
+        profiles = []
+        for model in models:
+            profile = self._profiles.get(id(model))
+            if profile is None or profile.signature != _signature(model):
+                profile = await self.profile(model)
+            profiles.append(profile)
+        return profiles
 
     async def select_model(
         self,
         models: List[BaseLLM],
-        prompt_tokens: int,
-        max_completion_tokens: int,
+        prompt_tokens: Optional[int] = None,
+        max_completion_tokens: Optional[int] = None,
+        stats: Optional[RouterStats] = None,
         **kwargs
     ) -> Optional[BaseLLM]:
-        """Select the model with lowest expected cost."""
+        """Select the model with the lowest score, reusing a memoized choice.
+
+        Requests without token counts are ranked as a nominal request, so
+        models still compare on their per-token prices.
+        """
         if not models:
             return None
+        if prompt_tokens is None:
+            prompt_tokens = self.nominal_prompt_tokens
+        if max_completion_tokens is None:
+            max_completion_tokens = self.nominal_completion_tokens
 
-        min_cost = float('inf')
-        selected_model = None
+        profiles = await self._ensure_profiles(models)
+        key = (
+            tuple(id(model) for model in models),
+            prompt_tokens,
+            max_completion_tokens,
+            self.stats_key(stats)
+        )
+        index = self._selections.get(key)
+        if index is None:
+            index = self.rank(models, profiles, prompt_tokens, max_completion_tokens, stats)
+            if index is None:
+                return None
+            self._selections[key] = index
+            if len(self._selections) > self.cache_size:
+                self._selections.popitem(last=False)
+        else:
+            self._selections.move_to_end(key)
+        return models[index]
 
-        for model in models:
-            cost = await model.get_cost(prompt_tokens, max_completion_tokens)
-            if cost < min_cost:
-                min_cost = cos
-                selected_model = model
+    def stats_key(self, stats: Optional[RouterStats]) -> Hashable:
+        """Part of the memo key that changes when the ranking inputs do."""
+        return None
 
-        return selected_model
+    @abstractmethod
+    def rank(
+        self,
+        models: List[BaseLLM],
+        profiles: List[ModelProfile],
+        prompt_tokens: int,
+        completion_tokens: int,
+        stats: Optional[RouterStats]
+    ) -> Optional[int]:
+        """Index of the best model, or None if none qualifies."""
+        pass
+
+class CostAwareStrategy(ScoredStrategy):
+    """Selects model based on cost per token."""
+
+    def rank(
+        self,
+        models: List[BaseLLM],
+        profiles: List[ModelProfile],
+        prompt_tokens: int,
+        completion_tokens: int,
+        stats: Optional[RouterStats]
+    ) -> Optional[int]:
+        """Select the model with lowest expected cost."""
+        costs = [profile.cost(prompt_tokens, completion_tokens) for profile in profiles]
+        return min(range(len(costs)), key=costs.__getitem__)
 
 class LatencyAwareStrategy(RoutingStrategy):
-    """Selects model based on latency."""
+    """Selects model based on measured latency.
+
+    With router stats, models are ranked by their moving-average latency
+    (or a latency percentile, or time to first token) adjusted for their
+    error rate; models without measurements use their static estimate.
+    """
+
+    def __init__(self, percentile: Optional[float] = None, time_to_first_token: bool = False):
+        """Initialize latency-aware strategy.
+
+        Args:
+            percentile: Rank by this latency quantile (0-1) instead of the average
+            time_to_first_token: Rank by time to first token, for streaming
+        """
+        self.percentile = percentile
+        self.time_to_first_token = time_to_first_token
 
     async def select_model(
         self,
         models: List[BaseLLM],
+        stats: Optional[RouterStats] = None,
         **kwargs
     ) -> Optional[BaseLLM]:
         """Select the model with lowest latency."""
@@ -59,45 +272,78 @@ class LatencyAwareStrategy(RoutingStrategy):
         selected_model = None
 
         for model in models:
-            latency = await model.get_latency()
+            latency = await _expected_latency(
+                model, stats, self.percentile, self.time_to_first_token
+            )
             if latency is not None and latency < min_latency:
                 min_latency = latency
                 selected_model = model
 
         return selected_model
 
-class HybridStrategy(RoutingStrategy):
-    """Combines cost and latency awareness."""
+class HybridStrategy(ScoredStrategy):
+    """Combines cost and latency awareness.
 
-    def __init__(self, cost_weight: float = 0.5, latency_weight: float = 0.5):
-        self.cost_weight = cost_weigh
-        self.latency_weight = latency_weigh
+    Cost and latency are each divided by their largest value among the
+    candidates before weighting, putting both on a 0-1 scale so neither
+    dominates because of its unit.
+    Latency is the measured moving average (adjusted for errors) when
+    router stats are available, otherwise the static estimate; models
+    without any latency are only chosen if no model has one. Since every
+    request updates the averages, a memoized choice is kept until a model's
+    health changes or for at most ``refresh_interval`` seconds.
+    """
 
-    async def select_model(
+    def __init__(
         self,
-        models: List[BaseLLM],
-        prompt_tokens: int,
-        max_completion_tokens: int,
+        cost_weight: float = 0.5,
+        latency_weight: float = 0.5,
+        cache_size: int = 256,
+        refresh_interval: float = 1.0,
         **kwargs
-    ) -> Optional[BaseLLM]:
-        """Select model based on weighted cost and latency."""
-        if not models:
-            return None
-
-        best_score = float('inf')
-        selected_model = None
+    ):
+        super().__init__(cache_size, **kwargs)
+        self.cost_weight = cost_weight
+        self.latency_weight = latency_weight
+        self.refresh_interval = refresh_interval
 
-        for model in models:
-            cost = await model.get_cost(prompt_tokens, max_completion_tokens)
-            latency = await model.get_latency() or float('inf')
+    def stats_key(self, stats: Optional[RouterStats]) -> Hashable:
+        if stats is None:
+            return None
+        now = time.monotonic()
+        epoch = int(now // self.refresh_interval) if self.refresh_interval > 0 else now
+        return (id(stats), stats.health_version, epoch)
 
-            # Normalize and combine scores
-            cost_score = cost * self.cost_weigh
-            latency_score = latency * self.latency_weigh
-            total_score = cost_score + latency_score
+    def rank(
+        self,
+        models: List[BaseLLM],
+        profiles: List[ModelProfile],
+        prompt_tokens: int,
+        completion_tokens: int,
+        stats: Optional[RouterStats]
+    ) -> Optional[int]:
+        """Select model based on weighted, normalized cost and latency."""
+        costs = [profile.cost(prompt_tokens, completion_tokens) for profile in profiles]
+        latencies = [
+            _measured_latency(profile, model, stats)
+            for model, profile in zip(models, profiles)
+        ]
+        known = [latency for latency in latencies if latency is not None]
 
-            if total_score < best_score:
-                best_score = total_score
-                selected_model = model
+        def normalize(value: float, high: float) -> float:
+            return value / high if high > 0 else 0.0
 
-        return selected_model
\ No newline at end of file
+        high_cost = max(costs)
+        high_latency = max(known) if known else 0.0
+        best_score = float('inf')
+        selected = None
+        for index, (cost, latency) in enumerate(zip(costs, latencies)):
+            if latency is None and known:
+                continue
+            score = self.cost_weight * normalize(cost, high_cost)
+            if latency is not None:
+                score += self.latency_weight * normalize(latency, high_latency)
+            if score < best_score:
+                best_score = score
+                selected = index
+        return selected
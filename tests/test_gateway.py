@@ -2,15 +2,21 @@
 Tests for the MultiMind Gateway module
 """
 
+import asyncio
+import json
 import os
+import time
 import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
 from fastapi.testclient import TestClient  # Corrected import statement
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
-from multimind.gateway.api import app, ModelResponse
+from multimind.gateway.api import app, ModelResponse, validate_model_config
 from multimind.gateway.cli import MultiMindCLI
-from multimind.gateway.models import get_model_handler
-from multimind.gateway.config import config
+from multimind.gateway.models import get_model_handler, OllamaHandler, StreamChunk, compare_models
+from multimind.gateway.config import config, ModelConfig
 
 # Test client for FastAPI
 client = TestClient(app)
@@ -149,5 +155,737 @@ def test_error_handling():
     response = client.post("/v1/chat", json={"invalid": "data"})
     assert response.status_code == 422
 
+@pytest_asyncio.fixture
+async def slow_ollama_server():
+    """Local Ollama stub that takes 200ms per chat request"""
+    received = []
+
+    async def chat(request):
+        body = await request.json()
+        received.append(body)
+        await asyncio.sleep(0.2)
+        return web.json_response({
+            "message": {"role": "assistant", "content": f"echo: {body['messages'][-1]['content']}"},
+            "done": True,
+            "done_reason": "stop",
+            "prompt_eval_count": 5,
+            "eval_count": 3
+        })
+
+    app = web.Application()
+    app.router.add_post("/api/chat", chat)
+    server = TestServer(app)
+    await server.start_server()
+    server.received = received
+    yield server
+    await server.close()
+
+@pytest.mark.asyncio
+async def test_ollama_handler_requests_overlap(slow_ollama_server):
+    """Concurrent Ollama chats run in parallel without blocking the event loop"""
+    handler = OllamaHandler(ModelConfig(
+        model_name="mistral",
+        api_base=str(slow_ollama_server.make_url(""))
+    ))
+    messages = [
+        {"role": "system", "content": "Be brief"},
+        {"role": "user", "content": "Hello"}
+    ]
+
+    start = time.perf_counter()
+    responses = await asyncio.gather(*[handler.chat(messages, temperature=0.0) for _ in range(5)])
+    elapsed = time.perf_counter() - start
+    await handler.aclose()
+
+    assert elapsed < 0.6  # serial execution would take at least 1s
+    assert all(r.content == "echo: Hello" for r in responses)
+    assert responses[0].usage["total_tokens"] == 8
+    assert slow_ollama_server.received[0]["messages"] == messages
+    assert slow_ollama_server.received[0]["options"]["temperature"] == 0.0
+
+@pytest.mark.asyncio
+async def test_handler_registry_reuses_handlers():
+    """Handlers are cached and rebuilt only when their config changes"""
+    from multimind.gateway.models import HandlerRegistry
+
+    registry = HandlerRegistry()
+    handler = registry.get("ollama")
+    assert registry.get("Ollama") is handler
+
+    original = config.ollama.model_name
+    config.ollama.model_name = "llama3"
+    try:
+        rebuilt = registry.get("ollama")
+        assert rebuilt is not handler
+        assert rebuilt.config.model_name == "llama3"
+        assert registry.get("ollama") is rebuilt
+    finally:
+        config.ollama.model_name = original
+        await registry.aclose()
+
+    with pytest.raises(ValueError):
+        registry.get("invalid-model")
+
+@pytest.mark.asyncio
+async def test_handler_registry_closes_replaced_handlers_when_idle():
+    """Replaced handlers are closed once their in-flight requests finish"""
+    from multimind.gateway.models import HandlerRegistry
+
+    registry = HandlerRegistry()
+    original = config.ollama.model_name
+    release = asyncio.Event()
+    try:
+        idle = registry.get("ollama")
+        idle.handler.aclose = AsyncMock()
+        config.ollama.model_name = "llama3"
+        busy = registry.get("ollama")
+        await asyncio.sleep(0)
+        idle.handler.aclose.assert_awaited_once()
+
+        async def chat(messages, **kwargs):
+            await release.wait()
+            return MOCK_RESPONSE
+
+        busy.handler.chat = chat
+        busy.handler.aclose = AsyncMock()
+        request = asyncio.ensure_future(busy.chat([{"role": "user", "content": "Hi"}]))
+        await asyncio.sleep(0)
+        config.ollama.model_name = "llama2"
+        registry.get("ollama")
+        await asyncio.sleep(0)
+        busy.handler.aclose.assert_not_awaited()
+
+        release.set()
+        assert await request is MOCK_RESPONSE
+        await asyncio.sleep(0)
+        busy.handler.aclose.assert_awaited_once()
+        assert registry._retired == []
+    finally:
+        config.ollama.model_name = original
+        await registry.aclose()
+
+class DelayedHandler:
+    """Handler stub answering after a fixed delay"""
+
+    def __init__(self, name: str, delay: float, fail: bool = False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.config = ModelConfig(model_name=name, timeout=5)
+
+    async def generate(self, prompt, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return ModelResponse(content=f"{self.name}: {prompt}", model=self.name)
+
+@pytest.fixture
+def delayed_handlers():
+    """Patch the handler factory with handlers of different speeds"""
+    handlers = {
+        "fast": DelayedHandler("fast", 0.05),
+        "slow": DelayedHandler("slow", 0.2),
+        "stuck": DelayedHandler("stuck", 10),
+        "broken": DelayedHandler("broken", 0.01, fail=True)
+    }
+    with patch("multimind.gateway.models.get_model_handler", side_effect=handlers.__getitem__):
+        yield handlers
+
+@pytest.mark.asyncio
+async def test_compare_models_runs_concurrently(delayed_handlers):
+    """Results arrive in completion order with per-model timeouts and errors"""
+    start = time.perf_counter()
+    results = [
+        (model, response)
+        async for model, response in compare_models(
+            ["stuck", "slow", "fast", "broken"], "hi", timeout=0.3
+        )
+    ]
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert [model for model, _ in results] == ["broken", "fast", "slow", "stuck"]
+    responses = dict(results)
+    assert responses["fast"].content == "fast: hi"
+    assert responses["broken"].finish_reason == "error"
+    assert responses["stuck"].finish_reason == "timeout"
+
+@pytest.mark.asyncio
+async def test_compare_models_timeouts_count_as_breaker_failures(delayed_handlers):
+    """A per-model timeout is recorded as a failure, not a cancelled call"""
+    from multimind.core.circuit_breaker import CircuitBreaker, CircuitState, circuit_breakers
+
+    breaker = circuit_breakers.breakers["stuck"] = CircuitBreaker("stuck", min_calls=1)
+    try:
+        async for _ in compare_models(["stuck"], "hi", timeout=0.05):
+            pass
+        assert breaker.state is CircuitState.OPEN
+    finally:
+        circuit_breakers.breakers.pop("stuck")
+
+def test_api_compare_streams_partial_results(delayed_handlers):
+    """Streaming compare emits one event per model as it finishes"""
+    app.dependency_overrides[validate_model_config] = lambda: {"fast": True, "slow": True, "stuck": True}
+    try:
+        response = client.post("/v1/compare", json={
+            "prompt": "hi",
+            "models": ["slow", "stuck", "fast", "offline"],
+            "timeout": 0.3,
+            "stream": True
+        })
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    models = [json.loads(event)["model"] for event in events[:-1]]
+    assert models == ["offline", "fast", "slow", "stuck"]
+
+@pytest_asyncio.fixture
+async def streaming_ollama_server():
+    """Local Ollama stub streaming one NDJSON line per word"""
+    async def chat(request):
+        body = await request.json()
+        assert body["stream"] is True
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        for word in ["Hello", " there"]:
+            await response.write(json.dumps({"message": {"content": word}, "done": False}).encode() + b"\n")
+        await response.write(json.dumps({
+            "message": {"content": ""},
+            "done": True,
+            "done_reason": "stop",
+            "prompt_eval_count": 4,
+            "eval_count": 2
+        }).encode() + b"\n")
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_post("/api/chat", chat)
+    server = TestServer(app)
+    await server.start_server()
+    yield server
+    await server.close()
+
+@pytest.mark.asyncio
+async def test_ollama_handler_chat_stream(streaming_ollama_server):
+    """Streamed chunks arrive incrementally with usage on the final chunk"""
+    handler = OllamaHandler(ModelConfig(
+        model_name="mistral",
+        api_base=str(streaming_ollama_server.make_url(""))
+    ))
+    chunks = [chunk async for chunk in handler.generate_stream("Hi")]
+    await handler.aclose()
+
+    assert "".join(c.content for c in chunks) == "Hello there"
+    assert chunks[-1].finish_reason == "stop"
+    assert chunks[-1].usage["total_tokens"] == 6
+    assert all(c.usage is None for c in chunks[:-1])
+
+def test_api_chat_stream_tracks_usage():
+    """The SSE chat endpoint relays chunks and records usage at stream end"""
+    class StreamingHandler:
+        async def chat_stream(self, messages, **kwargs):
+            for word in ["a", "b"]:
+                yield StreamChunk(content=word, model="stub")
+            yield StreamChunk(content="", model="stub", usage={"total_tokens": 7}, finish_reason="stop")
+
+    app.dependency_overrides[validate_model_config] = lambda: {"openai": True}
+    try:
+        with patch("multimind.gateway.api.get_model_handler", return_value=StreamingHandler()), \
+                patch("multimind.gateway.api.monitor.track_request") as track:
+            response = client.post("/v1/chat/stream", json={
+                "messages": [{"role": "user", "content": "Hello"}],
+                "model": "openai"
+            })
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    events = [line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(event) for event in events[:-1]]
+    assert "".join(c["content"] for c in chunks) == "ab"
+    assert chunks[-1]["finish_reason"] == "stop"
+    assert track.call_args.kwargs["tokens"] == 7
+    assert track.call_args.kwargs["success"] is True
+
+def test_model_status_snapshot_is_immutable_and_reloadable(monkeypatch):
+    """Model status is read from a frozen snapshot refreshed on reload"""
+    from multimind.gateway.config import get_model_status
+
+    snapshot = get_model_status()
+    with pytest.raises(TypeError):
+        snapshot.status["groq"] = True
+    assert get_model_status() is snapshot
+
+    monkeypatch.setenv("GROQ_API_KEY", "test-key")
+    monkeypatch.setenv("GROQ_MODEL_NAME", "llama3-8b")
+    monkeypatch.setenv("RATE_LIMIT_TIMEOUT", "2.5")
+    monkeypatch.setenv("CIRCUIT_SLOW_CALL_SECONDS", "4")
+    monkeypatch.setenv("CACHE_ENABLED", "false")
+    try:
+        reloaded = config.reload()
+        assert config.rate_limit_timeout == 2.5
+        assert config.circuit_slow_call_threshold == 4.0
+        assert config.cache_enabled is False
+        assert get_model_status() is reloaded is not snapshot
+        assert reloaded.status["groq"] is True
+        assert reloaded.models["groq"].model_name == "llama3-8b"
+        assert snapshot.models["groq"].model_name == "mixtral-8x7b-32768"
+    finally:
+        monkeypatch.delenv("GROQ_API_KEY")
+        monkeypatch.delenv("GROQ_MODEL_NAME")
+        for name in ("RATE_LIMIT_TIMEOUT", "CIRCUIT_SLOW_CALL_SECONDS", "CACHE_ENABLED"):
+            monkeypatch.delenv(name)
+        config.reload()
+
+def test_list_models_served_from_snapshot():
+    """Listing models does not re-evaluate the configuration"""
+    with patch.object(type(config), "get_model_config", side_effect=AssertionError("config read")):
+        response = client.get("/v1/models")
+    assert response.status_code == 200
+    assert response.json()["models"]["ollama"]["status"] == "available"
+
+@pytest.mark.asyncio
+async def test_coalescer_shares_one_upstream_call():
+    """Identical concurrent deterministic requests await a single call"""
+    from multimind.gateway.coalescing import RequestCoalescer
+
+    coalescer = RequestCoalescer()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return MOCK_RESPONSE
+
+    messages = [{"role": "user", "content": "Hello"}]
+    key = coalescer.key("chat", "openai", messages, temperature=0, max_tokens=None)
+    assert key == coalescer.key("chat", "OpenAI", [{"role": "User", "content": "Hello"}], temperature=0)
+    assert coalescer.key("chat", "openai", messages, temperature=0.7) is None
+
+    results = await asyncio.gather(*[coalescer.run(key, call) for _ in range(5)])
+    assert calls == 1
+    assert all(r is MOCK_RESPONSE for r in results)
+    assert coalescer.stats.coalesced_requests == 4
+
+    # Completed calls are not cached
+    await coalescer.run(key, call)
+    assert calls == 2
+
+@pytest.mark.asyncio
+async def test_coalescer_propagates_errors_and_survives_cancellation():
+    """Errors reach every waiter; one cancelled waiter does not cancel the call"""
+    from multimind.gateway.coalescing import RequestCoalescer
+
+    coalescer = RequestCoalescer()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    results = await asyncio.gather(
+        coalescer.run("k", failing), coalescer.run("k", failing), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    first = asyncio.ensure_future(coalescer.run("s", slow))
+    second = asyncio.ensure_future(coalescer.run("s", slow))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == "done"
+
+@pytest.mark.asyncio
+async def test_coalescer_fans_out_streams_with_replay():
+    """Late stream subscribers replay earlier chunks, then follow live"""
+    from multimind.gateway.coalescing import RequestCoalescer
+
+    coalescer = RequestCoalescer()
+    started = 0
+
+    async def source():
+        nonlocal started
+        started += 1
+        for word in ["a", "b", "c"]:
+            await asyncio.sleep(0.02)
+            yield word
+
+    async def consume(delay):
+        await asyncio.sleep(delay)
+        return [chunk async for chunk in coalescer.stream("k", source)]
+
+    results = await asyncio.gather(consume(0), consume(0.03))
+    assert results == [["a", "b", "c"], ["a", "b", "c"]]
+    assert started == 1
+
+@pytest.mark.asyncio
+async def test_api_coalesces_identical_chat_requests():
+    """Concurrent identical chats at temperature 0 reach the provider once"""
+    import httpx
+
+    class CountingHandler:
+        calls = 0
+
+        async def chat(self, messages, **kwargs):
+            CountingHandler.calls += 1
+            await asyncio.sleep(0.05)
+            return MOCK_RESPONSE
+
+    body = {"messages": [{"role": "user", "content": "Hi"}], "model": "openai", "temperature": 0}
+    app.dependency_overrides[validate_model_config] = lambda: {"openai": True}
+    try:
+        with patch("multimind.gateway.api.get_model_handler", return_value=CountingHandler()), \
+                patch("multimind.gateway.api.response_cache", None):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                responses = await asyncio.gather(*[http.post("/v1/chat", json=body) for _ in range(4)])
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [r.status_code for r in responses] == [200] * 4
+    assert all(r.json()["content"] == MOCK_RESPONSE.content for r in responses)
+    assert CountingHandler.calls == 1
+
+def test_api_serves_deterministic_requests_from_cache():
+    """Repeated temperature-0 requests hit the response cache"""
+    from multimind.models.cache import ResponseCache
+
+    handler = MagicMock()
+
+    async def chat(messages, **kwargs):
+        return MOCK_RESPONSE
+
+    handler.chat.side_effect = chat
+    cache = ResponseCache()
+    body = {"messages": [{"role": "user", "content": "Hi"}], "model": "ollama", "temperature": 0}
+
+    with patch("multimind.gateway.api.get_model_handler", return_value=handler), \
+            patch("multimind.gateway.api.response_cache", cache):
+        first = client.post("/v1/chat", json=body)
+        second = client.post("/v1/chat", json=body)
+        sampled = client.post("/v1/chat", json={**body, "temperature": 0.7})
+        stream = client.post("/v1/chat/stream", json=body)
+        metrics = client.get("/v1/metrics")
+
+    assert first.json()["content"] == second.json()["content"] == MOCK_RESPONSE.content
+    assert sampled.status_code == 200
+    assert handler.chat.call_count == 2
+    assert MOCK_RESPONSE.content in stream.text
+    assert metrics.json()["cache"]["hits"] == 2
+
+@pytest.mark.asyncio
+async def test_rate_limiter_queues_and_rejects():
+    """Token buckets admit bursts, queue until refill and reject on timeout"""
+    from multimind.gateway.monitoring import ModelMonitor
+
+    limiter = ModelMonitor()
+    limiter.set_rate_limits("m", requests_per_minute=600, tokens_per_minute=6000)
+
+    # Burst up to capacity, then the bucket is empty
+    assert all([await limiter.check_rate_limit("m", 10) for _ in range(600)])
+    assert not await limiter.check_rate_limit("m", 10)
+
+    # 600/min refills one request every 0.1s
+    start = time.perf_counter()
+    assert await limiter.acquire_rate_limit("m", 10, timeout=1)
+    assert 0.05 < time.perf_counter() - start < 0.5
+    assert not await limiter.acquire_rate_limit("m", 10, timeout=0.01)
+
+    # Per-key limits apply on top of model limits and only to that key
+    limiter.set_api_key_rate_limits("key", requests_per_minute=1, tokens_per_minute=1000)
+    assert await limiter.acquire_rate_limit(None, 5, api_key="key", timeout=0)
+    assert not await limiter.acquire_rate_limit(None, 5, api_key="key", timeout=0.01)
+    assert await limiter.acquire_rate_limit(None, 5, api_key="other", timeout=0)
+
+def test_token_bucket_reconciles_actual_usage():
+    """Usage above the estimate puts the bucket into debt"""
+    from multimind.gateway.monitoring import ModelMonitor
+
+    limiter = ModelMonitor()
+    limiter.set_rate_limits("m", requests_per_minute=100, tokens_per_minute=100)
+    limiter.record_tokens("m", 100)
+    assert limiter.rate_limit_wait_time("m", 1) > 0
+    limiter.record_tokens("m", -100)
+    assert limiter.rate_limit_wait_time("m", 1) == 0
+
+def test_api_returns_429_when_rate_limited():
+    """Requests that cannot be admitted in time are rejected with Retry-After"""
+    from multimind.gateway.monitoring import monitor
+
+    body = {"messages": [{"role": "user", "content": "Hi"}], "model": "ollama"}
+    monitor.set_api_key_rate_limits("client-1", requests_per_minute=1, tokens_per_minute=1000)
+    handler = MagicMock()
+
+    async def chat(messages, **kwargs):
+        return MOCK_RESPONSE
+
+    handler.chat.side_effect = chat
+    try:
+        with patch("multimind.gateway.api.get_model_handler", return_value=handler), \
+                patch.object(config, "rate_limit_timeout", 0.01):
+            first = client.post("/v1/chat", json=body, headers={"X-API-Key": "client-1"})
+            second = client.post("/v1/chat", json=body, headers={"Authorization": "Bearer client-1"})
+    finally:
+        monitor.api_key_rate_limits.pop("client-1")
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) >= 1
+
+def test_model_rate_limit_rejection_refunds_api_key():
+    """A request rejected by the model's limit does not drain the key's budget"""
+    from multimind.gateway.monitoring import monitor
+
+    body = {"messages": [{"role": "user", "content": "Hi"}], "model": "ollama", "temperature": 0.5}
+    monitor.set_api_key_rate_limits("client-2", requests_per_minute=2, tokens_per_minute=1000)
+    monitor.set_rate_limits("ollama", requests_per_minute=1, tokens_per_minute=1000)
+    handler = MagicMock()
+
+    async def chat(messages, **kwargs):
+        return MOCK_RESPONSE
+
+    handler.chat.side_effect = chat
+    try:
+        with patch("multimind.gateway.api.get_model_handler", return_value=handler), \
+                patch.object(config, "rate_limit_timeout", 0.01):
+            first = client.post("/v1/chat", json=body, headers={"X-API-Key": "client-2"})
+            second = client.post("/v1/chat", json=body, headers={"X-API-Key": "client-2"})
+        key_wait = monitor.rate_limit_wait_time(None, 1, "client-2")
+    finally:
+        monitor.api_key_rate_limits.pop("client-2")
+        monitor.set_rate_limits("ollama")
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert key_wait == 0
+
+def test_model_rate_limits_come_from_config(monkeypatch):
+    """Models are unlimited unless their limits are configured"""
+    from multimind.gateway.api import apply_rate_limits
+    from multimind.gateway.config import GatewayConfig
+    from multimind.gateway.monitoring import ModelMonitor
+
+    limiter = ModelMonitor()
+    assert limiter.rate_limit_wait_time("m", 10**6) == 0
+
+    monkeypatch.setenv("GROQ_REQUESTS_PER_MINUTE", "30")
+    gateway_config = GatewayConfig()
+    assert gateway_config.groq.requests_per_minute == 30
+    assert gateway_config.groq.tokens_per_minute is None
+    assert gateway_config.openai.requests_per_minute is None
+
+    with patch("multimind.gateway.api.config", gateway_config), \
+            patch("multimind.gateway.api.monitor", limiter):
+        apply_rate_limits()
+    assert limiter.rate_limits == {"groq": {"requests_per_minute": 30, "tokens_per_minute": None}}
+
+def test_latency_histogram_quantiles():
+    """Quantiles stay within the configured relative accuracy in fixed memory"""
+    import random
+    from multimind.core.metrics import LatencyHistogram
+
+    rng = random.Random(0)
+    values = sorted(rng.lognormvariate(-3, 1) for _ in range(20000))
+    histogram = LatencyHistogram(relative_accuracy=0.01, max_buckets=512)
+    for value in values:
+        histogram.add(value)
+
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert histogram.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert len(histogram.buckets) <= 512
+    assert histogram.count == len(values)
+    assert histogram.cumulative_counts([values[-1]])[-1] == len(values)
+
+@pytest.mark.asyncio
+async def test_monitor_reports_latency_percentiles():
+    """Snapshots expose tail latency and are isolated from later updates"""
+    from multimind.gateway.monitoring import ModelMonitor
+
+    monitor = ModelMonitor()
+    await asyncio.gather(*[
+        monitor.track_request("m", tokens=1, cost=0.0, response_time=(i + 1) / 100, success=i % 10 != 0, error="boom")
+        for i in range(100)
+    ])
+
+    snapshot = (await monitor.get_metrics("m"))["metrics"]
+    assert snapshot.total_requests == 100
+    assert snapshot.failed_requests == 10
+    assert snapshot.latency_p50 == pytest.approx(0.5, rel=0.03)
+    assert snapshot.latency_p99 == pytest.approx(0.99, rel=0.03)
+    assert snapshot.avg_response_time > 0
+
+    await monitor.track_request("m", tokens=1, cost=0.0, response_time=5.0, success=False, error="boom")
+    assert snapshot.total_requests == 100
+    assert snapshot.error_count["boom"] == 10
+
+def test_openmetrics_endpoint():
+    """/metrics renders pre-aggregated counters and histograms as OpenMetrics"""
+    from multimind.models.cache import ResponseCache
+
+    handler = MagicMock()
+
+    async def chat(messages, **kwargs):
+        return MOCK_RESPONSE
+
+    handler.chat.side_effect = chat
+    body = {"messages": [{"role": "user", "content": "Hi"}], "model": "ollama", "temperature": 0}
+
+    with patch("multimind.gateway.api.get_model_handler", return_value=handler), \
+            patch("multimind.gateway.api.response_cache", ResponseCache()):
+        client.post("/v1/chat", json=body)
+        client.post("/v1/chat", json=body)
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/openmetrics-text")
+    text = response.text
+    assert text.endswith("# EOF\n")
+    assert 'multimind_gateway_http_requests_total{method="POST",route="/v1/chat",status="200"}' in text
+    assert 'multimind_gateway_model_request_duration_seconds_bucket{model="ollama",le="+Inf"}' in text
+    assert 'multimind_gateway_cache_lookups_total{result="memory_hit"} 1' in text
+    assert "multimind_gateway_cache_hit_ratio 0.5" in text
+    assert "multimind_gateway_http_requests_in_flight 1" in text
+
+def test_openmetrics_writer_histogram_and_escaping():
+    """Histogram buckets are cumulative and label values are escaped"""
+    from multimind.core.metrics import LatencyHistogram
+    from multimind.core.openmetrics import OpenMetricsWriter
+
+    histogram = LatencyHistogram()
+    for value in (0.02, 0.2, 2.0):
+        histogram.add(value)
+
+    writer = OpenMetricsWriter()
+    writer.histogram("latency", "Latency", [({"model": 'a"b'}, histogram)], buckets=[0.1, 1.0])
+    lines = writer.render().splitlines()
+
+    assert lines[:3] == ["# TYPE latency histogram", "# UNIT latency seconds", "# HELP latency Latency"]
+    assert 'latency_bucket{model="a\\"b",le="0.1"} 1' in lines
+    assert 'latency_bucket{model="a\\"b",le="1"} 2' in lines
+    assert 'latency_bucket{model="a\\"b",le="+Inf"} 3' in lines
+    assert 'latency_count{model="a\\"b"} 3' in lines
+    assert lines[-1] == "# EOF"
+
+@pytest.mark.asyncio
+async def test_health_prober_records_rolling_uptime():
+    """Background probes record latency and uptime over the rolling window"""
+    from multimind.core.health import HealthProber, UptimeWindow
+    from multimind.gateway.monitoring import ModelMonitor
+
+    monitor = ModelMonitor()
+    outcomes = [None, RuntimeError("down"), None, None]
+    recorded = asyncio.Event()
+
+    async def probe():
+        error = outcomes.pop(0)
+        if error:
+            raise error
+
+    def on_result(*args):
+        monitor.record_health(*args)
+        if not outcomes:
+            recorded.set()
+
+    prober = HealthProber(lambda: {"m": probe}, on_result, interval=0.01, jitter=0.5)
+    prober.start()
+    await asyncio.wait_for(recorded.wait(), 1)
+    await prober.stop()
+
+    health = monitor.health["m"]
+    assert health.is_healthy and health.latency_ms is not None
+    assert health.uptime_percentage == pytest.approx(75.0)
+    assert not prober.running
+
+    window = UptimeWindow(window=10)
+    window.record(False, now=0)
+    window.record(True, now=5)
+    assert window.uptime_percentage(now=5) == 50.0
+    assert window.uptime_percentage(now=12) == 100.0
+
+@pytest.mark.asyncio
+async def test_ollama_probe_lists_models():
+    """The Ollama probe uses /api/tags and fails for models not pulled"""
+    async def tags(request):
+        return web.json_response({"models": [{"name": "mistral:latest"}]})
+
+    app_ = web.Application()
+    app_.router.add_get("/api/tags", tags)
+    server = TestServer(app_)
+    await server.start_server()
+    try:
+        handler = OllamaHandler(ModelConfig(api_base=str(server.make_url("")), model_name="mistral"))
+        await handler.probe()
+        handler.config.model_name = "llama3"
+        with pytest.raises(ValueError):
+            await handler.probe()
+        await handler.aclose()
+    finally:
+        await server.close()
+
+def test_health_check_serves_cached_status():
+    """/v1/health/check only probes unprobed models or when refresh is set"""
+    from multimind.gateway.monitoring import monitor
+
+    handler = MagicMock()
+    probes = []
+
+    async def probe():
+        probes.append(1)
+
+    handler.probe.side_effect = probe
+    monitor.health.pop("ollama", None)
+    with patch("multimind.gateway.api.get_model_handler", return_value=handler):
+        first = client.post("/v1/health/check?model=ollama")
+        second = client.post("/v1/health/check?model=ollama")
+        cached = client.get("/v1/health?model=ollama")
+        refreshed = client.post("/v1/health/check?model=ollama&refresh=true")
+
+    assert first.json()["ollama"]["is_healthy"]
+    assert second.json() == first.json() == cached.json()
+    assert refreshed.json()["ollama"]["last_check"] != first.json()["ollama"]["last_check"]
+    assert len(probes) == 2
+
+def test_api_returns_503_when_circuit_open():
+    """Failing models trip their breaker and further requests fail fast"""
+    from multimind.core.circuit_breaker import CircuitBreaker, circuit_breakers
+    from multimind.gateway.models import GuardedHandler
+
+    class FailingHandler:
+        config = ModelConfig(model_name="ollama", timeout=5)
+        calls = 0
+
+        async def chat(self, messages, **kwargs):
+            FailingHandler.calls += 1
+            raise ConnectionError("provider down")
+
+    breaker = circuit_breakers.breakers["ollama"] = CircuitBreaker("ollama", window=2, min_calls=2, open_timeout=30)
+    handler = GuardedHandler(FailingHandler(), breaker)
+    body = {"messages": [{"role": "user", "content": "Hi"}], "model": "ollama", "temperature": 0.5}
+    try:
+        with patch("multimind.gateway.api.get_model_handler", return_value=handler):
+            failures = [client.post("/v1/chat", json=body) for _ in range(2)]
+            rejected = client.post("/v1/chat", json=body)
+            metrics = client.get("/v1/metrics")
+            scraped = client.get("/metrics")
+    finally:
+        circuit_breakers.breakers.pop("ollama")
+
+    assert [r.status_code for r in failures] == [500, 500]
+    assert rejected.status_code == 503
+    assert 1 <= int(rejected.headers["Retry-After"]) <= 30
+    assert FailingHandler.calls == 2
+    assert metrics.json()["circuits"]["ollama"]["state"] == "open"
+    assert 'multimind_gateway_circuit_state{model="ollama",state="open"} 1' in scraped.text
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""
+Tests for model implementations
+"""
+
+import asyncio
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from multimind.core.http import ManagedSession
+from multimind.models.base import BaseLLM
+from multimind.models.cache import CachedLLM, MemoryCache, ResponseCache
+from multimind.models.ollama import OllamaModel
+from multimind.models.pool import Endpoint, EndpointPool
+
+@pytest_asyncio.fixture
+async def ollama_stub():
+    """Local stub of the Ollama API recording client connections"""
+    peers = []
+
+    async def chat(request):
+        peers.append(request.transport.get_extra_info("peername"))
+        body = await request.json()
+        return web.json_response({
+            "message": {"role": "assistant", "content": body["messages"][-1]["content"]},
+            "done": True
+        })
+
+    app = web.Application()
+    app.router.add_post("/api/chat", chat)
+    server = TestServer(app)
+    await server.start_server()
+    server.peers = peers
+    yield server
+    await server.close()
+
+@pytest.mark.asyncio
+async def test_ollama_reuses_pooled_connection(ollama_stub):
+    """Sequential requests share one keep-alive connection"""
+    async with OllamaModel("mistral", base_url=str(ollama_stub.make_url(""))) as model:
+        for i in range(3):
+            response = await model.chat([{"role": "user", "content": f"hi {i}"}])
+            assert response == f"hi {i}"
+
+    assert len(ollama_stub.peers) == 3
+    assert len(set(ollama_stub.peers)) == 1
+
+@pytest.mark.asyncio
+async def test_managed_session_lifecycle():
+    """Sessions are created lazily, reused and recreated after close"""
+    http = ManagedSession()
+    assert http.closed
+
+    session = await http.get()
+    assert await http.get() is session
+
+    await http.aclose()
+    assert session.closed and http.closed
+    assert await http.get() is not session
+    await http.aclose()
+
+class CountingLLM(BaseLLM):
+    """LLM stub counting upstream calls"""
+
+    def __init__(self):
+        super().__init__("stub")
+        self.calls = 0
+
+    async def generate(self, prompt, temperature=0.7, max_tokens=None, **kwargs):
+        self.calls += 1
+        return f"{prompt}:{self.calls}"
+
+    async def generate_stream(self, prompt, temperature=0.7, max_tokens=None, **kwargs):
+        self.calls += 1
+        for part in ["a", "b"]:
+            yield part
+
+    async def chat(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        return await self.generate(messages[-1]["content"], temperature, max_tokens)
+
+    async def chat_stream(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        async for part in self.generate_stream(messages[-1]["content"]):
+            yield part
+
+    async def embeddings(self, text, **kwargs):
+        self.calls += 1
+        return [0.1, 0.2]
+
+@pytest.mark.asyncio
+async def test_cached_llm_only_caches_deterministic_calls():
+    """Temperature-0 completions and embeddings are served from the cache"""
+    llm = CountingLLM()
+    cached = CachedLLM(llm)
+
+    assert await cached.generate("hi", temperature=0) == "hi:1"
+    assert await cached.generate("hi", temperature=0) == "hi:1"
+    assert await cached.generate("hi", temperature=0, max_tokens=5) == "hi:2"
+    assert await cached.generate("hi", temperature=0.7) == "hi:3"
+    assert await cached.generate("hi", temperature=0.7) == "hi:4"
+
+    assert await cached.embeddings("text") == await cached.embeddings("text")
+    assert llm.calls == 5
+
+    chunks = [c async for c in cached.chat_stream([{"role": "user", "content": "x"}], temperature=0)]
+    replay = [c async for c in cached.chat_stream([{"role": "user", "content": "x"}], temperature=0)]
+    assert chunks == ["a", "b"] and replay == ["ab"]
+    assert llm.calls == 6
+
+    stats = cached.cache.stats
+    assert stats.hits == 3 and stats.misses == 4
+    assert stats.hit_rate == pytest.approx(3 / 7)
+
+def test_memory_cache_lru_and_ttl(monkeypatch):
+    """Entries are evicted least recently used first and expire after the TTL"""
+    now = [1000.0]
+    monkeypatch.setattr("multimind.models.cache.time.time", lambda: now[0])
+
+    cache = MemoryCache(max_entries=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.evictions == 1
+
+    now[0] += 11
+    assert cache.get("a") is None
+
+@pytest.mark.asyncio
+async def test_response_cache_sqlite_tier(tmp_path):
+    """The SQLite tier survives new cache instances and promotes hits"""
+    path = tmp_path / "cache.db"
+    cache = ResponseCache(path=path)
+    await cache.set("key", {"content": "hello"})
+    cache.close()
+
+    reopened = ResponseCache(path=path)
+    assert await reopened.get("key") == {"content": "hello"}
+    assert await reopened.get("key") == {"content": "hello"}
+    assert reopened.stats.disk_hits == 1 and reopened.stats.memory_hits == 1
+    assert await reopened.get("missing") is None
+    reopened.close()
+
+class SlowLLM(CountingLLM):
+    """LLM stub answering after a delay"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, prompt, temperature=0.7, max_tokens=None, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            return await super().generate(prompt, temperature, max_tokens)
+        finally:
+            self.active -= 1
+
+@pytest.mark.asyncio
+async def test_endpoint_pool_weighted_round_robin():
+    """Requests are spread in proportion to endpoint weights"""
+    heavy, light = CountingLLM(), CountingLLM()
+    pool = EndpointPool(
+        [Endpoint(heavy, weight=3), Endpoint(light, weight=1)],
+        balancing="weighted_round_robin"
+    )
+    for _ in range(8):
+        await pool.generate("hi")
+    assert (heavy.calls, light.calls) == (6, 2)
+    assert pool.to_dict() == {
+        "stub": {"weight": 3, "max_concurrency": None, "outstanding": 0, "requests": 6, "errors": 0},
+        "stub#1": {"weight": 1, "max_concurrency": None, "outstanding": 0, "requests": 2, "errors": 0}
+    }
+
+    with pytest.raises(ValueError):
+        EndpointPool([heavy], balancing="random")
+
+@pytest.mark.asyncio
+async def test_endpoint_pool_least_outstanding_with_caps():
+    """Slow endpoints get fewer requests and caps bound concurrency"""
+    fast, slow = SlowLLM(0.01), SlowLLM(0.05)
+    pool = EndpointPool([Endpoint(fast, max_concurrency=2), Endpoint(slow, max_concurrency=2)])
+
+    await asyncio.gather(*[pool.generate(f"p{i}") for i in range(20)])
+    assert fast.calls + slow.calls == 20
+    assert fast.calls > slow.calls
+    assert fast.peak <= 2 and slow.peak <= 2
+    assert pool.in_flight == 0
+
+    chunks = [c async for c in pool.chat_stream([{"role": "user", "content": "x"}])]
+    assert chunks == ["a", "b"] and pool.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_endpoint_pool_wakeup_survives_cancelled_waiter():
+    """A waiter cancelled after being woken does not strand the others"""
+    pool = EndpointPool([Endpoint(CountingLLM(), max_concurrency=1)])
+    held = await pool.acquire()
+    first = asyncio.ensure_future(pool.acquire())
+    second = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0)
+
+    pool.release(held)
+    first.cancel()
+
+    endpoint = await asyncio.wait_for(second, 1)
+    assert endpoint is held and pool.in_flight == 1
+    pool.release(endpoint)
+    assert pool.in_flight == 0
+
+def test_factory_builds_pools(monkeypatch):
+    """Several endpoints of one model are served through a pool"""
+    from multimind.models.factory import ModelFactory
+
+    monkeypatch.setenv("OLLAMA_HOSTS", "http://gpu-1:11434, http://gpu-2:11434")
+    factory = ModelFactory()
+    pool = factory.get_model("ollama")
+    assert isinstance(pool, EndpointPool)
+    assert [e.llm.base_url for e in pool.endpoints] == ["http://gpu-1:11434", "http://gpu-2:11434"]
+    assert factory.get_model("ollama") is pool
+
+    # Pooled keys alone make a provider available
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setenv("OPENAI_API_KEYS", "sk-a,sk-b")
+    assert "openai" in ModelFactory().available_models()
+
+    weighted = factory.set_pool(
+        "ollama",
+        [{"base_url": "http://a:11434", "weight": 2, "max_concurrency": 4}, {"base_url": "http://b:11434"}],
+        balancing="weighted_round_robin"
+    )
+    assert factory.get_model("ollama", "mistral") is weighted
+    assert weighted.endpoints[0].weight == 2 and weighted.endpoints[0].max_concurrency == 4
+
+    # Explicit endpoints always build a pool, so endpoint options stay out of the model
+    single = factory.get_model(
+        "ollama", "llama2", endpoints=[{"base_url": "http://c:11434", "max_concurrency": 1}]
+    )
+    assert isinstance(single, EndpointPool)
+    assert single.endpoints[0].max_concurrency == 1
+    with pytest.raises(ValueError, match="set_pool"):
+        factory.get_model("ollama", "llama2", endpoints=[{"base_url": "http://d:11434"}])
@@ -0,0 +1,436 @@
+"""
+Tests for the RAG components
+"""
+
+import asyncio
+import json
+import pytest
+from typing import Any, Dict, List
+
+from multimind.rag.batching import SearchBatcher
+from multimind.rag.document import DocumentProcessor
+from multimind.rag.rag import RAG
+from multimind.rag.registry import RAGRegistry
+from multimind.rag.vector_store import BaseVectorStore, ChromaVectorStore, FAISSVectorStore
+
+class MockEmbedder:
+    """Embedder that records every call it receives"""
+
+    def __init__(self):
+        self.calls: List[List[str]] = []
+
+    async def embeddings(self, text, **kwargs):
+        texts = [text] if isinstance(text, str) else list(text)
+        self.calls.append(texts)
+        vectors = [[float(len(t)), 0.0] for t in texts]
+        return vectors[0] if len(texts) == 1 else vectors
+
+class MockVectorStore(BaseVectorStore):
+    """In-memory vector store returning one hit per stored document"""
+
+    def __init__(self):
+        self.documents: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.batch_calls = 0
+
+    async def add(self, vectors, documents, metadata=None, **kwargs) -> None:
+        self.documents.extend(documents)
+        self.metadata.extend(metadata or [{}] * len(documents))
+
+    async def search(self, query_vector, k: int = 3, **kwargs) -> List[Dict[str, Any]]:
+        return [
+            {"document": doc, "metadata": {**meta, "query_length": query_vector[0]}, "distance": float(i)}
+            for i, (doc, meta) in enumerate(zip(self.documents[:k], self.metadata))
+        ]
+
+    async def search_batch(self, query_vectors, k: int = 3, **kwargs):
+        self.batch_calls += 1
+        return await super().search_batch(query_vectors, k=k, **kwargs)
+
+    async def clear(self) -> None:
+        self.documents = []
+        self.metadata = []
+
+    async def get_document_count(self) -> int:
+        return len(self.documents)
+
+    async def save(self, path) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "store.json").write_text(json.dumps([self.documents, self.metadata]))
+
+    async def load(self, path) -> None:
+        self.documents, self.metadata = json.loads((path / "store.json").read_text())
+
+@pytest.mark.asyncio
+async def test_search_batcher_coalesces_concurrent_queries():
+    """Concurrent searches share one embedding call and one batched search"""
+    embedder = MockEmbedder()
+    store = MockVectorStore()
+    await store.add([[0.0, 0.0]] * 3, ["a", "b", "c"])
+    batcher = SearchBatcher(embedder, store, window=0.01)
+
+    results = await asyncio.gather(
+        batcher.search("one", k=1),
+        batcher.search("three", k=3),
+        batcher.search("one", k=2)
+    )
+
+    assert embedder.calls == [["one", "three"]]
+    assert store.batch_calls == 1
+    assert [len(r) for r in results] == [1, 3, 2]
+    assert results[1][0]["metadata"]["query_length"] == 5.0
+
+@pytest.mark.asyncio
+async def test_search_batcher_single_query():
+    """A lone query is flushed after the window with a flat embedding"""
+    embedder = MockEmbedder()
+    store = MockVectorStore()
+    await store.add([[0.0, 0.0]], ["only"])
+    batcher = SearchBatcher(embedder, store, window=0.001)
+
+    results = await batcher.search("hello", k=3)
+
+    assert results[0]["document"] == "only"
+    assert embedder.calls == [["hello"]]
+
+@pytest.mark.asyncio
+async def test_search_batcher_propagates_errors():
+    """Embedding failures are raised to every waiting caller"""
+    class FailingEmbedder:
+        async def embeddings(self, text, **kwargs):
+            raise RuntimeError("embedding failed")
+
+    batcher = SearchBatcher(FailingEmbedder(), MockVectorStore(), window=0.001)
+    results = await asyncio.gather(
+        batcher.search("a"), batcher.search("b"), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+@pytest.mark.asyncio
+async def test_rag_search_with_kwargs_bypasses_batcher(word_tokenizer):
+    """Search arguments such as filters reach the vector store"""
+    class FilteringStore(MockVectorStore):
+        async def search(self, query_vector, k: int = 3, **kwargs):
+            results = await super().search(query_vector, k=k)
+            where = kwargs.get("filter", {})
+            return [r for r in results if all(r["metadata"].get(f) == v for f, v in where.items())]
+
+    store = FilteringStore()
+    rag = RAG(embedder=MockEmbedder(), vector_store=store, batch_window=0.001)
+    await store.add([[0.0, 0.0]] * 2, ["a", "b"], [{"lang": "en"}, {"lang": "fr"}])
+
+    filtered = await rag.search("query", k=2, filter={"lang": "fr"})
+    unfiltered = await rag.search("query", k=2)
+
+    assert [r["document"] for r in filtered] == ["b"]
+    assert [r["document"] for r in unfiltered] == ["a", "b"]
+    assert store.batch_calls == 1
+
+class WordTokenizer:
+    """Offline tokenizer counting whitespace-separated words"""
+
+    def encode(self, text: str) -> List[str]:
+        return text.split()
+
+@pytest.fixture
+def word_tokenizer(monkeypatch):
+    """Avoid downloading tiktoken encodings in tests"""
+    monkeypatch.setattr(
+        "multimind.rag.document.tiktoken.get_encoding", lambda name: WordTokenizer()
+    )
+
+def test_hierarchical_chunking(word_tokenizer):
+    """Child chunks reference the parent chunk they were cut from"""
+    processor = DocumentProcessor(chunk_size=2)
+    text = " ".join(f"w{i}" for i in range(10))
+
+    parents, children = processor.process_document_hierarchical(
+        text, {"source": "doc"}, parent_chunk_size=4, child_chunk_size=2
+    )
+
+    assert [p.text for p in parents] == ["w0 w1 w2 w3", "w4 w5 w6 w7", "w8 w9"]
+    assert len(children) == 5
+    parent_texts = {p.metadata["parent_id"]: p.text for p in parents}
+    for child in children:
+        assert child.text in parent_texts[child.metadata["parent_id"]]
+        assert child.metadata["source"] == "doc"
+
+@pytest.mark.asyncio
+async def test_rag_expands_children_to_parents(word_tokenizer):
+    """Searches return deduplicated parents of the matching children"""
+    rag = RAG(
+        embedder=MockEmbedder(),
+        vector_store=MockVectorStore(),
+        chunk_size=2,
+        parent_chunk_size=4
+    )
+    await rag.add_documents([" ".join(f"w{i}" for i in range(10))])
+
+    results = await rag.search("query", k=2)
+
+    assert [r["document"] for r in results] == ["w0 w1 w2 w3", "w4 w5 w6 w7"]
+    assert [r["child_hits"] for r in results] == [2, 2]
+    assert await rag.vector_store.get_document_count() == 5
+
+class MockRAG:
+    """Minimal stand-in exposing the vector store like RAG does"""
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.vector_store = MockVectorStore()
+        self.model = None
+
+@pytest.mark.asyncio
+async def test_registry_lru_eviction(tmp_path):
+    """Least recently used namespaces are evicted above the limit"""
+    created = []
+
+    def factory(namespace):
+        created.append(namespace)
+        return MockRAG(namespace)
+
+    registry = RAGRegistry(factory, max_loaded=2, idle_timeout=None, storage_dir=tmp_path)
+    tenant_a = await registry.get("tenant-a")
+    await registry.get("tenant-b")
+    assert await registry.get("tenant-a") is tenant_a
+
+    await registry.get("tenant-c")
+    assert registry.loaded() == ["tenant-a", "tenant-c"]
+
+    await registry.get("tenant-b")
+    assert created == ["tenant-a", "tenant-b", "tenant-c", "tenant-b"]
+
+@pytest.mark.asyncio
+async def test_registry_keeps_namespaces_in_use(tmp_path):
+    """A namespace held by a request is not evicted"""
+    registry = RAGRegistry(MockRAG, max_loaded=1, idle_timeout=None, storage_dir=tmp_path)
+    async with registry.use("busy"):
+        await registry.get("other")
+        assert "busy" in registry.loaded()
+    await registry.get("third")
+    assert registry.loaded() == ["third"]
+
+@pytest.mark.asyncio
+async def test_registry_never_evicts_unpersisted_namespaces():
+    """Without storage, evicting would lose documents, so namespaces stay resident"""
+    registry = RAGRegistry(MockRAG, max_loaded=1, idle_timeout=0.0)
+    rag = await registry.get("tenant-a")
+    await rag.vector_store.add([[0.0]], ["doc"])
+
+    await registry.get("tenant-b")
+
+    assert await registry.evict("tenant-a") is False
+    assert await registry.get("tenant-a") is rag
+    assert registry.loaded() == ["tenant-b", "tenant-a"]
+
+@pytest.mark.asyncio
+async def test_registry_request_during_persist_reloads_saved_state(tmp_path):
+    """A namespace acquired while it is being persisted is reloaded, not dropped"""
+    persisting = asyncio.Event()
+    resume = asyncio.Event()
+
+    class SlowStore(MockVectorStore):
+        async def save(self, path) -> None:
+            persisting.set()
+            await resume.wait()
+            await super().save(path)
+
+    class SlowRAG(MockRAG):
+        def __init__(self, namespace):
+            super().__init__(namespace)
+            self.vector_store = SlowStore()
+
+    registry = RAGRegistry(SlowRAG, idle_timeout=None, storage_dir=tmp_path)
+    rag = await registry.get("tenant")
+    await rag.vector_store.add([[0.0]], ["doc"])
+
+    eviction = asyncio.ensure_future(registry.evict("tenant"))
+    await persisting.wait()
+    request = asyncio.ensure_future(registry.get("tenant"))
+    await asyncio.sleep(0)
+    resume.set()
+
+    assert await eviction is True
+    reloaded = await request
+    assert reloaded is not rag
+    assert await reloaded.vector_store.get_document_count() == 1
+    assert registry.loaded() == ["tenant"]
+    assert registry._locks == {}
+
+@pytest.mark.asyncio
+async def test_registry_rejects_invalid_namespace():
+    """Namespaces are restricted to safe names"""
+    registry = RAGRegistry(MockRAG)
+    with pytest.raises(ValueError):
+        await registry.get("../etc")
+
+@pytest.mark.asyncio
+async def test_faiss_store_persists_across_eviction(tmp_path):
+    """FAISS stores are saved on eviction and restored on reload"""
+    pytest.importorskip("faiss")
+
+    class FAISSRAG:
+        def __init__(self, namespace):
+            self.vector_store = FAISSVectorStore(dimension=2)
+
+    registry = RAGRegistry(FAISSRAG, max_loaded=1, idle_timeout=None, storage_dir=tmp_path)
+    rag = await registry.get("tenant")
+    await rag.vector_store.add([[1.0, 0.0], [0.0, 1.0]], ["x", "y"], [{"i": 0}, {"i": 1}])
+
+    await registry.evict("tenant")
+    restored = await registry.get("tenant")
+
+    assert restored is not rag
+    assert await restored.vector_store.get_document_count() == 2
+    results = await restored.vector_store.search([0.0, 1.0], k=1)
+    assert results[0]["document"] == "y"
+    assert results[0]["metadata"] == {"i": 1}
+
+@pytest.mark.asyncio
+async def test_chroma_store_reattaches_to_persistent_collection(tmp_path):
+    """A persistent Chroma store keeps its records across instances"""
+    pytest.importorskip("chromadb")
+
+    store = ChromaVectorStore("docs", persist_directory=tmp_path, batch_size=2)
+    await store.add(
+        [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]],
+        ["x", "y", "z"],
+        [{"i": 0}, {}, {"i": 2}]
+    )
+    await store.add([[0.5, 0.5]], ["w"])
+
+    reopened = ChromaVectorStore("docs", persist_directory=tmp_path)
+    assert await reopened.get_document_count() == 4
+    results = await reopened.search([0.0, 1.0], k=1)
+    assert results[0]["document"] == "y"
+    assert results[0]["metadata"] == {}
+
+    await reopened.clear()
+    assert await reopened.get_document_count() == 0
+
+@pytest.mark.asyncio
+async def test_rag_api_metrics_report_resident_namespaces(monkeypatch):
+    """/metrics reports vector store sizes of resident namespaces only"""
+    from httpx import ASGITransport, AsyncClient
+    from multimind.api import rag_api
+
+    registry = RAGRegistry(MockRAG, idle_timeout=None)
+    monkeypatch.setattr(rag_api, "rag_registry", registry)
+    rag = await registry.get("tenant-a")
+    await rag.vector_store.add([[0.0]], ["doc"])
+
+    async with AsyncClient(transport=ASGITransport(app=rag_api.app), base_url="http://test") as http:
+        response = await http.get("/metrics")
+
+    assert response.status_code == 200
+    assert "multimind_rag_namespaces_loaded 1" in response.text
+    assert 'multimind_rag_vector_store_documents{namespace="tenant-a",store="MockVectorStore"} 1' in response.text
+    assert response.text.endswith("# EOF\n")
+
+@pytest.mark.asyncio
+async def test_rag_api_health_serves_cached_model_status(monkeypatch):
+    """Namespace health probes a model once; /health serves the cached status"""
+    from httpx import ASGITransport, AsyncClient
+    from multimind.api import rag_api
+
+    class StubModel:
+        model_name = "stub-model"
+        calls = 0
+
+        async def generate(self, prompt, **kwargs):
+            StubModel.calls += 1
+            assert kwargs["max_tokens"] == 1
+            return "ok"
+
+    def factory(namespace):
+        rag = MockRAG(namespace)
+        rag.model = StubModel()
+        return rag
+
+    monkeypatch.setattr(rag_api, "rag_registry", RAGRegistry(factory, idle_timeout=None))
+    monkeypatch.setattr(rag_api, "model_health", {})
+    monkeypatch.setenv("API_KEYS", "test-key")
+
+    async with AsyncClient(
+        transport=ASGITransport(app=rag_api.app),
+        base_url="http://test",
+        headers={"X-API-Key": "test-key"}
+    ) as http:
+        first = await http.get("/health/namespace", params={"namespace": "tenant-a"})
+        second = await http.get("/health/namespace", params={"namespace": "tenant-b"})
+        overall = await http.get("/health")
+
+    assert first.status_code == 200
+    assert first.json()["status"] == "healthy"
+    assert first.json()["model"]["uptime_percentage"] == 100.0
+    assert second.json()["model"] == first.json()["model"]
+    assert StubModel.calls == 1
+
+    assert overall.status_code == 200
+    assert overall.json()["status"] == "healthy"
+    assert overall.json()["namespaces"] == {"loaded": 2, "active": 0}
+    assert overall.json()["models"]["stub-model"]["uptime_percentage"] == 100.0
+
+@pytest.mark.asyncio
+async def test_rag_api_authorizes_namespaces_before_loading(monkeypatch):
+    """Namespaces are loaded only for authenticated users granted access to them"""
+    from httpx import ASGITransport, AsyncClient
+    from multimind.api import auth, rag_api
+
+    registry = RAGRegistry(MockRAG, idle_timeout=None)
+    monkeypatch.setattr(rag_api, "rag_registry", registry)
+    monkeypatch.setitem(auth.user_db.users, "tenant-a-user", {
+        "username": "tenant-a-user",
+        "hashed_password": "unused",
+        "scopes": ["rag:read"],
+        "namespaces": ["tenant-a"]
+    })
+    token = auth.create_access_token({"sub": "tenant-a-user"})
+
+    async with AsyncClient(transport=ASGITransport(app=rag_api.app), base_url="http://test") as http:
+        anonymous = await http.get("/health/namespace", params={"namespace": "tenant-b"})
+        other = await http.get(
+            "/health/namespace", params={"namespace": "tenant-b"}, headers={"X-API-Key": token}
+        )
+        own = await http.get(
+            "/health/namespace", params={"namespace": "tenant-a"}, headers={"X-API-Key": token}
+        )
+        overall = await http.get("/health", params={"namespace": "tenant-b"})
+
+    assert anonymous.status_code in (401, 403)
+    assert overall.status_code == 200
+    assert other.status_code == 403
+    assert own.status_code == 200
+    assert registry.loaded() == ["tenant-a"]
+
+@pytest.mark.asyncio
+async def test_rag_api_warns_without_storage_dir(monkeypatch, caplog, tmp_path):
+    """Startup warns that namespaces are never evicted without a storage directory"""
+    from multimind.api import rag_api
+
+    monkeypatch.setattr(rag_api, "rag_registry", RAGRegistry(MockRAG))
+    await rag_api.check_storage_dir()
+    assert "MULTIMIND_RAG_STORAGE_DIR" in caplog.text
+
+    caplog.clear()
+    monkeypatch.setattr(rag_api, "rag_registry", RAGRegistry(MockRAG, storage_dir=tmp_path))
+    await rag_api.check_storage_dir()
+    assert caplog.text == ""
+
+@pytest.mark.asyncio
+async def test_rag_api_clear_drops_parent_chunks(monkeypatch, word_tokenizer):
+    """Clearing a namespace also drops its parent chunks"""
+    from httpx import ASGITransport, AsyncClient
+    from multimind.api import rag_api
+
+    rag = RAG(embedder=MockEmbedder(), vector_store=MockVectorStore(), chunk_size=2, parent_chunk_size=4)
+    await rag.add_documents(["w0 w1 w2 w3 w4"])
+    monkeypatch.setattr(rag_api, "rag_registry", RAGRegistry(lambda namespace: rag, idle_timeout=None))
+    monkeypatch.setenv("API_KEYS", "test-key")
+
+    async with AsyncClient(transport=ASGITransport(app=rag_api.app), base_url="http://test") as http:
+        response = await http.post("/documents/clear", headers={"X-API-Key": "test-key"})
+
+    assert response.status_code == 200
+    assert rag.parents == {}
+    assert await rag.vector_store.get_document_count() == 0
@@ -0,0 +1,465 @@
+"""
+Tests for the model router
+"""
+
+import asyncio
+import pytest
+
+from multimind.core.circuit_breaker import (
+    CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, CircuitState, circuit_breakers
+)
+from multimind.models.base import BaseLLM
+from multimind.router.fallback import RetryBudget, RetryPolicy, classify_error, retry_after
+from multimind.router.hedging import HedgingPolicy
+from multimind.router.router import ModelRouter
+from multimind.router.stats import RouterStats
+from multimind.router.strategy import CostAwareStrategy, HybridStrategy, LatencyAwareStrategy
+
+class StatusError(Exception):
+    """Provider error carrying an HTTP status and headers"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+class APITimeoutError(Exception):
+    """Stand-in for an SDK timeout error without a status code"""
+
+class StubLLM(BaseLLM):
+    """LLM stub with a fixed delay that can be made to fail"""
+
+    def __init__(self, name, delay=0.0, avg_latency=None):
+        super().__init__(name)
+        self.delay = delay
+        self.avg_latency = avg_latency
+        self.failing = False
+        self.errors = []
+        self.calls = 0
+        self.last_kwargs = {}
+
+    async def generate(self, prompt, temperature=0.7, max_tokens=None, **kwargs):
+        self.calls += 1
+        self.last_kwargs = kwargs
+        await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        if self.failing:
+            raise RuntimeError(f"{self.model_name} is down")
+        return f"{self.model_name}:{prompt}"
+
+    async def generate_stream(self, prompt, temperature=0.7, max_tokens=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        for part in ["a", "b"]:
+            yield part
+
+    async def chat(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        return await self.generate(messages[-1]["content"], temperature, max_tokens)
+
+    async def chat_stream(self, messages, temperature=0.7, max_tokens=None, **kwargs):
+        async for part in self.generate_stream(messages[-1]["content"]):
+            yield part
+
+    async def embeddings(self, text, **kwargs):
+        return [0.0]
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Routers share the global breaker registry; start every test closed"""
+    circuit_breakers.breakers.clear()
+    yield
+    circuit_breakers.breakers.clear()
+
+@pytest.mark.asyncio
+async def test_router_routes_on_measured_latency():
+    """Live measurements override static latency estimates"""
+    router = ModelRouter()
+    fast = StubLLM("fast", delay=0.001, avg_latency=5.0)
+    slow = StubLLM("slow", delay=0.05, avg_latency=0.1)
+    router.register_model("fast", fast)
+    router.register_model("slow", slow)
+
+    # Static estimates favour "slow" until it has been measured
+    assert await router.generate("hi") == "slow:hi"
+    await router.generate("hi", model_name="fast")
+    for _ in range(5):
+        await router.generate("hi")
+    assert fast.calls == 6 and slow.calls == 1
+
+    stats = router.stats.get("fast")
+    assert stats.requests == 6
+    assert stats.ewma_latency < router.stats.get("slow").ewma_latency
+    assert stats.percentile(0.95) is not None
+
+    chunks = [chunk async for chunk in router.chat_stream([{"role": "user", "content": "hi"}])]
+    assert chunks == ["a", "b"]
+    assert router.stats.get("fast").ewma_ttft is not None
+
+@pytest.mark.asyncio
+async def test_router_ejects_failing_model_and_probes_recovery():
+    """Failing models are ejected and restored once a probe succeeds"""
+    stats = RouterStats(consecutive_failures=2, base_ejection_time=0.05)
+    router = ModelRouter(strategy=LatencyAwareStrategy(), stats=stats)
+    primary = StubLLM("primary", avg_latency=0.1)
+    backup = StubLLM("backup", delay=0.12, avg_latency=1.0)
+    router.register_model("primary", primary)
+    router.register_model("backup", backup)
+
+    primary.failing = True
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await router.generate("hi", model_name="primary")
+    assert stats.get("primary").ejected
+    assert await router.generate("hi") == "backup:hi"
+
+    # After the ejection time one probe goes through; a failure re-ejects for longer
+    await asyncio.sleep(0.06)
+    with pytest.raises(RuntimeError):
+        await router.generate("hi")
+    assert stats.get("primary").ejections == 2
+    assert await router.generate("hi") == "backup:hi"
+
+    primary.failing = False
+    await asyncio.sleep(0.11)
+    assert await router.generate("hi") == "primary:hi"
+    assert not stats.get("primary").ejected
+
+@pytest.mark.asyncio
+async def test_router_hedges_slow_requests_within_budget():
+    """Requests slower than the primary's p95 are hedged while budget remains"""
+    policy = HedgingPolicy(percentile=0.95, budget=0.5, min_samples=5, max_burst=1)
+    router = ModelRouter(hedging=policy)
+    primary = StubLLM("primary", delay=0.3, avg_latency=0.01)
+    backup = StubLLM("backup", delay=0.01, avg_latency=1.0)
+    router.register_model("primary", primary)
+    router.register_model("backup", backup)
+    router.set_fallback_chain(["primary", "backup"])
+    for _ in range(5):
+        router.stats.record_success("primary", 0.02)
+
+    # The first request has only half a hedge of budget and waits for the primary
+    assert await router.generate("a", model_name="primary") == "primary:a"
+    assert policy.stats.budget_exhausted == 1
+
+    # The second hedges after ~20ms; the backup wins and the primary is cancelled
+    start = asyncio.get_running_loop().time()
+    assert await router.generate("b", model_name="primary") == "backup:b"
+    assert asyncio.get_running_loop().time() - start < 0.2
+    assert policy.stats.to_dict()["hedges"] == 1
+    assert policy.stats.hedge_wins == 1
+    assert policy.stats.hedge_rate == 0.5
+    assert not router.stats.get("primary").probing
+
+    assert await router.generate("c", model_name="primary", hedge=False) == "primary:c"
+    assert policy.stats.requests == 2
+
+def test_error_classification_and_retry_after():
+    """Errors are classified by status code or SDK class name"""
+    assert classify_error(StatusError(429)) == "rate_limit"
+    assert classify_error(StatusError(503)) == "unavailable"
+    assert classify_error(StatusError(400)) is None
+    assert classify_error(StatusError(401)) is None
+    assert classify_error(APITimeoutError()) == "timeout"
+    assert classify_error(ConnectionResetError()) == "connection"
+    assert classify_error(ValueError("bad prompt")) is None
+
+    assert retry_after(StatusError(429, {"retry-after": "2"})) == 2.0
+    assert retry_after(StatusError(429, {"retry-after-ms": "150"})) == 0.15
+    assert retry_after(StatusError(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert retry_after(StatusError(503)) is None
+
+    policy = RetryPolicy(base_delay=1, max_delay=4, max_retry_after=10)
+    assert all(0 <= policy.backoff(attempt) <= min(4, 2 ** (attempt - 1)) for attempt in range(1, 6))
+    assert policy.delay(1, StatusError(429, {"retry-after": "3"})) >= 3
+    assert policy.delay(1, StatusError(429, {"retry-after": "30"})) is None
+
+@pytest.mark.asyncio
+async def test_router_retries_along_fallback_chain():
+    """Retryable errors move to the next model; others are raised at once"""
+    router = ModelRouter()
+    primary = StubLLM("primary", avg_latency=0.1)
+    backup = StubLLM("backup", avg_latency=1.0)
+    router.register_model("primary", primary)
+    router.register_model("backup", backup)
+    router.set_fallback_chain(["primary", "backup"])
+
+    primary.errors = [StatusError(503)]
+    assert await router.generate("hi") == "backup:hi"
+
+    primary.errors = [ValueError("bad prompt")]
+    with pytest.raises(ValueError):
+        await router.generate("hi", model_name="primary")
+    assert backup.calls == 1
+
+    # Without another model, the same model is retried after Retry-After
+    router.set_fallback_chain(["primary"])
+    router.fallback.policy = RetryPolicy(base_delay=0.001)
+    primary.errors = [StatusError(429, {"retry-after-ms": "20"}), APITimeoutError()]
+    start = asyncio.get_running_loop().time()
+    assert await router.generate("hi", model_name="primary") == "primary:hi"
+    assert asyncio.get_running_loop().time() - start >= 0.02
+
+    # Retries stop when the shared budget is empty
+    router.fallback.budget = RetryBudget(ratio=0, min_per_second=0, max_tokens=0)
+    primary.errors = [StatusError(503)]
+    with pytest.raises(StatusError):
+        await router.generate("hi", model_name="primary")
+    assert router.fallback.budget.exhausted == 1
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_half_opens_and_closes():
+    """Breakers open on error or slow-call rate and close after a trial call"""
+    breaker = CircuitBreaker("m", failure_rate_threshold=0.5, window=4, min_calls=4, open_timeout=0.05)
+    breaker.record_success(0.01)
+    breaker.record_failure(StatusError(400))  # client errors do not count
+    breaker.record_failure(StatusError(503))
+    assert breaker.state is CircuitState.CLOSED
+    breaker.record_failure(APITimeoutError())
+    assert breaker.state is CircuitState.OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.acquire()
+    assert info.value.status_code == 503 and 0 < info.value.retry_after <= 0.05
+
+    await asyncio.sleep(0.06)
+    assert breaker.state is CircuitState.HALF_OPEN
+    breaker.acquire()
+    assert not breaker.available  # one trial call at a time
+    breaker.release()
+    breaker.acquire()
+    breaker.record_failure(StatusError(503))
+    assert breaker.state is CircuitState.OPEN
+
+    await asyncio.sleep(0.06)
+    breaker.acquire()
+    breaker.record_success(0.01)
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.to_dict()["opened"] == 2 and breaker.rejected == 1
+
+    slow = CircuitBreaker("s", slow_call_threshold=0.1, slow_call_rate_threshold=0.5, window=2, min_calls=2)
+    slow.record_success(0.2)
+    slow.record_success(0.3)
+    assert slow.state is CircuitState.OPEN
+
+@pytest.mark.asyncio
+async def test_router_skips_models_with_open_circuit():
+    """Open circuits fail fast and requests move along the fallback chain"""
+    router = ModelRouter(breakers=CircuitBreakerRegistry(window=2, min_calls=2, open_timeout=60))
+    primary = StubLLM("primary", avg_latency=0.1)
+    backup = StubLLM("backup", avg_latency=1.0)
+    router.register_model("primary", primary)
+    router.register_model("backup", backup)
+    router.set_fallback_chain(["primary", "backup"])
+    primary.errors = [StatusError(503), StatusError(503)]
+    for _ in range(2):
+        assert await router.generate("hi", model_name="primary") == "backup:hi"
+    assert router.breakers.get("primary").state is CircuitState.OPEN
+    assert not router.is_available("primary")
+
+    # Neither selected nor called while open, even when named explicitly
+    assert await router.generate("hi") == "backup:hi"
+    assert await router.generate("hi", model_name="primary") == "backup:hi"
+    assert primary.calls == 2
+
+    router.set_fallback_chain(["primary"])
+    with pytest.raises(CircuitOpenError):
+        await router.generate("hi", model_name="primary")
+
+class CountingLLM(StubLLM):
+    """Stub counting calls to its cost and latency getters"""
+
+    def __init__(self, name, cost_per_token, avg_latency):
+        super().__init__(name, avg_latency=avg_latency)
+        self.cost_per_token = cost_per_token
+        self.lookups = 0
+
+    async def get_cost(self, prompt_tokens, completion_tokens):
+        self.lookups += 1
+        return await super().get_cost(prompt_tokens, completion_tokens)
+
+    async def get_latency(self):
+        self.lookups += 1
+        return await super().get_latency()
+
+@pytest.mark.asyncio
+async def test_scored_strategies_memoize_and_normalize():
+    """Profiles are computed once and cost/latency are compared on one scale"""
+    cheap = CountingLLM("cheap", cost_per_token=0.000002, avg_latency=2.0)
+    fast = CountingLLM("fast", cost_per_token=0.00003, avg_latency=0.5)
+    models = [cheap, fast]
+
+    cost = CostAwareStrategy()
+    assert await cost.select_model(models, prompt_tokens=100, max_completion_tokens=50) is cheap
+    # Without token counts, models are ranked on a nominal request
+    assert await cost.select_model(models) is cheap
+    lookups = cheap.lookups
+    for _ in range(5):
+        assert await cost.select_model(models, prompt_tokens=200, max_completion_tokens=50) is cheap
+    assert cheap.lookups == lookups
+
+    # Raw dollars are tiny next to seconds; normalized, the weights decide
+    assert await HybridStrategy(0.5, 0.5).select_model(models, 100, 50) is cheap
+    assert await HybridStrategy(0.1, 0.9).select_model(models, 100, 50) is fast
+
+    # Measurements replace the static estimate and invalidate the memo
+    stats = RouterStats()
+    hybrid = HybridStrategy(0.1, 0.9)
+    assert await hybrid.select_model(models, 100, 50, stats=stats) is fast
+    stats.record_success("fast", 5.0)
+    assert await hybrid.select_model(models, 100, 50, stats=stats) is cheap
+
+    # Later measurements only re-rank once the refresh interval has passed
+    hybrid = HybridStrategy(0.1, 0.9, refresh_interval=3600)
+    stats.record_success("cheap", 1.0)
+    assert await hybrid.select_model(models, 100, 50, stats=stats) is cheap
+    stats.record_success("cheap", 20.0)
+    stats.record_success("fast", 0.1)
+    assert await hybrid.select_model(models, 100, 50, stats=stats) is cheap
+    assert len(hybrid._selections) == 1
+    assert await HybridStrategy(0.1, 0.9, refresh_interval=0).select_model(
+        models, 100, 50, stats=stats
+    ) is fast
+
+    # Changing a model's pricing rebuilds its profile
+    fast.cost_per_token = 0.000001
+    assert await cost.select_model(models, prompt_tokens=200, max_completion_tokens=50) is fast
+
+@pytest.mark.asyncio
+async def test_cost_routing_without_token_counts():
+    """Requests without token counts are ranked on price, and counts stay with the router"""
+    fast = CountingLLM("fast", cost_per_token=0.00003, avg_latency=0.5)
+    cheap = CountingLLM("cheap", cost_per_token=0.000002, avg_latency=2.0)
+    router = ModelRouter(CostAwareStrategy(), breakers=CircuitBreakerRegistry())
+    router.register_model("fast", fast)
+    router.register_model("cheap", cheap)
+    router.set_fallback_chain(["fast", "cheap"])
+
+    assert await router.generate("hello") == "cheap:hello"
+    assert await router.generate("hello", prompt_tokens=10, max_completion_tokens=5) == "cheap:hello"
+    assert cheap.last_kwargs == {}
+
+class StubEmbedder(StubLLM):
+    """Embeds prompts by whether they mention proofs"""
+
+    async def embeddings(self, text, **kwargs):
+        def embed(t):
+            return [1.0, 0.0] if "proof" in t else [0.0, 1.0]
+        return [embed(t) for t in text] if isinstance(text, list) else embed(text)
+
+@pytest.mark.asyncio
+async def test_content_aware_strategy_routes_by_difficulty():
+    """Easy prompts go to the small tier, hard ones to the large tier"""
+    from multimind.router.content import ContentAwareStrategy, EmbeddingClassifier, extract_features
+
+    features = extract_features(messages=[
+        {"role": "system", "content": "You are helpful"},
+        {"role": "user", "content": "Refactor this:\n```\ndef f(): pass\n```"}
+    ])
+    assert features.turns == 2 and features.has_code and features.hard_keywords == 1
+
+    strategy = ContentAwareStrategy(["local"], ["large"])
+    router = ModelRouter(strategy=strategy)
+    local = StubLLM("local", avg_latency=1.0)
+    large = StubLLM("large", avg_latency=0.5)
+    router.register_model("local", local)
+    router.register_model("large", large)
+
+    assert await router.generate("Translate 'hello' to French") == "local:Translate 'hello' to French"
+    hard = "Prove step by step that the algorithm terminates and analyze its complexity"
+    assert await router.generate(hard) == f"large:{hard}"
+    assert await router.chat([{"role": "user", "content": "Summarize: hi"}]) == "local:Summarize: hi"
+
+    # Small-tier outcomes are logged with the difficulty the routing used
+    assert [success for _, success in strategy.outcomes] == [True, True]
+    local.failing = True
+    with pytest.raises(RuntimeError):
+        await router.generate("Translate 'bye' to French")
+    difficulty, success = strategy.outcomes[-1]
+    assert success is False
+    assert difficulty == await strategy.difficulty("Translate 'bye' to French")
+    local.failing = False
+
+    # A tier without available models falls back to the other tier
+    assert await strategy.select_model([large], prompt="hello") is large
+
+    classifier = EmbeddingClassifier(StubEmbedder("embed"), ["hi there"], ["a proof"])
+    assert await classifier.difficulty("write a proof") == 1.0
+    assert await classifier.difficulty("hi") == 0.0
+
+@pytest.mark.asyncio
+async def test_content_aware_threshold_learns_from_outcomes():
+    """The threshold moves to where the small tier stops succeeding"""
+    from multimind.router.content import ContentAwareStrategy
+
+    strategy = ContentAwareStrategy(["local"], ["large"], threshold=0.5, max_small_failure_rate=0.1)
+    for difficulty in (0.1, 0.2, 0.3, 0.6, 0.7):
+        strategy.record_outcome(difficulty, True)
+    strategy.record_outcome(0.8, False)
+    strategy.record_outcome(0.9, False)
+    assert 0.7 < strategy.fit() < 0.8
+
+    strategy.outcomes.clear()
+    strategy.refit_every = 3
+    for difficulty in (0.1, 0.2, 0.3):
+        strategy.record_outcome(difficulty, False)
+    assert strategy.threshold < 0.2
+
+@pytest.mark.asyncio
+async def test_engine_caches_decisions_until_state_changes():
+    """The compiled table is reused until health changes or it expires"""
+    from multimind.router.engine import RoutingEngine
+
+    stats = RouterStats(consecutive_failures=1, base_ejection_time=0.05)
+    engine = RoutingEngine(LatencyAwareStrategy(), stats=stats, refresh_interval=60)
+    primary = StubLLM("primary", avg_latency=0.1)
+    backup = StubLLM("backup", avg_latency=1.0)
+    engine.register_model("primary", primary, aliases=["p"])
+    engine.register_model("backup", backup)
+    engine.set_fallback_chain(["primary", "backup"])
+
+    assert await engine.resolve("p") is primary
+    assert engine.compilations == 0
+    for _ in range(3):
+        assert await engine.resolve() is primary
+    assert engine.compilations == 1
+
+    # A first measurement and an ejection each force a recompile
+    primary.failing = True
+    with pytest.raises(RuntimeError):
+        await engine.generate("hi", model_name="primary", hedge=False)
+    assert await engine.resolve() is backup
+    assert engine.compilations == 2
+
+    # The table expires with the ejection, letting a probe through
+    await asyncio.sleep(0.06)
+    assert await engine.resolve() is primary
+    assert engine.compilations == 3
+
+    # Replacing a model re-points its aliases
+    replacement = StubLLM("primary-2", avg_latency=0.1)
+    engine.register_model("primary", replacement)
+    assert await engine.resolve("p") is replacement
+
+@pytest.mark.asyncio
+async def test_core_router_is_a_facade_over_the_engine():
+    """Factory-created models are routed and measured through the engine"""
+    from multimind.core.router import ModelRouter as CoreRouter
+
+    class FactoryStub(StubLLM):
+        def __init__(self, model_name, **kwargs):
+            super().__init__(model_name)
+
+    router = CoreRouter()
+    router.factory.register_model_class("ollama", FactoryStub)
+    router.set_fallback_chain(["ollama"])
+
+    assert await router.generate("hi") == "mistral:hi"
+    assert await router.generate("hi", provider="ollama", model_name="llama3") == "llama3:hi"
+    model = await router.get_model("ollama", "llama3")
+    assert await router.get_model("ollama", "llama3") is model
+    assert router.engine.stats.get("ollama:llama3").requests == 1
+    assert router.engine.stats.get("ollama:mistral").requests == 1
+
+    pool = router.set_endpoints("ollama", [{"base_url": "a"}, {"base_url": "b"}])
+    assert await router.get_model("ollama") is pool
+    assert await router.chat([{"role": "user", "content": "x"}], provider="ollama") == "mistral:x"